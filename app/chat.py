@@ -1,19 +1,28 @@
 # app/chat.py
 
 from __future__ import annotations
-from typing import Any, Dict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+import json
 import time
 
 from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import ollama
 
-from app.rules import evaluate_health
+from app import llm
+from app.llm import cache as llm_cache
+from app.llm import scheduler as llm_scheduler
+from app.llm.scheduler import Priority, QueueFull
+from app.rules import cached_evaluate_health
 from app.rag.retriever import retrieve
+from app.rag.topics import retrieval_query, retrieval_topics
 from app.safety import (
     is_forbidden_question,
     check_missing_data,
     response_mentions_unknown_terms,
+    StreamingTermsCheck,
     DISCLAIMER_TEXT,
 )
 from app.intent.classifier import classify_intent
@@ -22,6 +31,7 @@ from app.logging.events import log_event, make_event
 from app.auth.security import decode_token
 from app.chat_store import repo
 from app.auth.database import SessionLocal
+from app.wearables.trend_states import with_stored_history
 
 
 def decode_token_from_header(header: str, expected_type: str) -> int:
@@ -56,7 +66,41 @@ def require_auth(authorization: str = Header(None)) -> int:
     return decode_token_from_header(authorization, expected_type="access")
 
 
-def process_chat(user_id: int, payload: ChatRequest, chat_context: Dict[str, Any] = None):
+CHAT_MODEL = "llama3"
+# Deterministic generation settings
+CHAT_OPTIONS = {
+    "temperature": 0.0,
+    "top_p": 0.1,
+    "num_predict": 220,
+}
+FALLBACK_TEXT = f"I don’t have enough information to answer that safely.\n\n{DISCLAIMER_TEXT}"
+
+
+@dataclass
+class ChatTurn:
+    """Everything process_chat works out before generation, shared with the streaming path."""
+    start: float
+    user_id: int
+    question: str
+    health_state: Dict[str, Any]
+    facts: Dict[str, Any]
+    intent_result: Any = None
+    system_prompt: str = ""
+    user_prompt: str = ""
+    db: Any = None
+    chat: Any = None
+    chat_history_ok: bool = False
+    memory_ok: bool = False
+    reply: Optional[str] = None  # set when the turn is answered without the LLM
+
+    def messages(self) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self.user_prompt},
+        ]
+
+
+def prepare_chat(user_id: int, payload: ChatRequest, chat_context: Dict[str, Any] = None) -> ChatTurn:
     start = time.monotonic()
     question = (payload.question or "").strip()
 
@@ -93,8 +137,11 @@ def process_chat(user_id: int, payload: ChatRequest, chat_context: Dict[str, Any
 
     chat_history_ok = bool(consent_map.get("chat_history")) if consent_map else False
     memory_ok = bool(consent_map.get("memory_personalization")) if consent_map else False
-    # 1) Deterministic facts are the source of truth
-    facts = evaluate_health(payload.health_state)
+    # 1) Deterministic facts are the source of truth; trends use the user's stored readings
+    health_state = with_stored_history(db, user_id, payload.health_state, consent_map) if db else payload.health_state
+    # Explanations stay interned ids; only the prompt adapter reads their text.
+    facts = cached_evaluate_health(health_state, lazy_explanations=True)
+    turn = ChatTurn(start=start, user_id=user_id, question=question, health_state=payload.health_state, facts=facts)
 
     # 2) Hard block: forbidden medical advice topics
     if is_forbidden_question(question):
@@ -110,15 +157,15 @@ def process_chat(user_id: int, payload: ChatRequest, chat_context: Dict[str, Any
                 latency_ms=latency_ms,
             )
         )
-        return {
-            "reply": (
-                "I can’t help with diagnosis or medication decisions. "
-                "Please consult a qualified healthcare professional."
-            )
-        }
+        turn.reply = (
+            "I can’t help with diagnosis or medication decisions. "
+            "Please consult a qualified healthcare professional."
+        )
+        return turn
 
     # 3) Classify intent (deterministic)
     intent_result = classify_intent(question, payload.health_state)
+    turn.intent_result = intent_result
 
     # 4) If user asks about an area but facts don’t contain that signal → refuse
     missing, msg = check_missing_data(question, facts)
@@ -135,10 +182,13 @@ def process_chat(user_id: int, payload: ChatRequest, chat_context: Dict[str, Any
                 latency_ms=latency_ms,
             )
         )
-        return {"reply": msg}
+        turn.reply = msg
+        return turn
 
     # 5) Retrieve references (for explanation only; cannot override facts)
-    refs = retrieve(question + " " + str(facts), top_k=2)
+    # Search only docs on the topics in play, with a compact query instead of the full facts.
+    topics = retrieval_topics(question, intent_result, facts)
+    refs = retrieve(retrieval_query(question, facts, topics), top_k=2, topics=topics)
 
     # 5b) Retrieve chat summaries and user memory
     chat_summaries = []
@@ -152,7 +202,7 @@ def process_chat(user_id: int, payload: ChatRequest, chat_context: Dict[str, Any
     clarifier = _clarifying_question(intent_result)
 
     # 6) Build prompts via adapter
-    system_prompt, user_prompt = build_prompt(
+    turn.system_prompt, turn.user_prompt = build_prompt(
         question=question,
         facts=facts,
         intent_result=intent_result,
@@ -161,59 +211,160 @@ def process_chat(user_id: int, payload: ChatRequest, chat_context: Dict[str, Any
         user_memory_snippets=user_memory_snippets,
         clarifier=clarifier,
     )
+    turn.db, turn.chat = db, chat
+    turn.chat_history_ok, turn.memory_ok = chat_history_ok, memory_ok
+    return turn
 
-    # 7) Deterministic generation settings
-    resp = ollama.chat(
-        model="llama3",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        options={
-            "temperature": 0.0,
-            "top_p": 0.1,
-            "num_predict": 220,
-        },
-    )
 
-    text = (resp.get("message", {}) or {}).get("content", "").strip()
+def finish_chat(turn: ChatTurn, text: str, ttft_ms: Optional[float] = None) -> str:
+    """Post-check the generated text, log the turn and persist summary/memory; returns the reply."""
+    text = text.strip()
     if not text:
-        text = f"I don’t have enough information to answer that safely.\n\n{DISCLAIMER_TEXT}"
+        text = FALLBACK_TEXT
 
     # 8) Post-check for off-limits terms; fall back if needed
-    if response_mentions_unknown_terms(text, facts):
-        text = f"I don’t have enough information to answer that safely.\n\n{DISCLAIMER_TEXT}"
+    if response_mentions_unknown_terms(text, turn.facts):
+        text = FALLBACK_TEXT
 
-    latency_ms = (time.monotonic() - start) * 1000
+    intent_result = turn.intent_result
+    latency_ms = (time.monotonic() - turn.start) * 1000
     log_event(
         make_event(
             intent=intent_result.intent,
             intent_confidence=intent_result.confidence,
-            question=question,
-            health_state=payload.health_state,
+            question=turn.question,
+            health_state=turn.health_state,
             missing_fields=intent_result.missing_fields or [],
             safety={"medication_refusal": intent_result.intent == "SAFETY_MEDICATION", "diagnosis_refusal": intent_result.intent == "DIAGNOSIS_REQUEST"},
             latency_ms=latency_ms,
+            ttft_ms=ttft_ms,
         )
     )
 
     # 9) Persist chat message + summary + memory (without raw values)
+    db, chat = turn.db, turn.chat
     if db and chat:
         try:
-            if chat_history_ok:
-                repo.upsert_chat_summary(db, chat, summary_text=_make_safe_chat_summary(facts, intent_result))
-            if memory_ok:
+            if turn.chat_history_ok:
+                repo.upsert_chat_summary(db, chat, summary_text=_make_safe_chat_summary(turn.facts, intent_result))
+            if turn.memory_ok:
                 repo.add_user_memory(
                     db,
-                    user_id=user_id,
+                    user_id=turn.user_id,
                     kind="missing_field_pattern" if intent_result.missing_fields else "topic_pattern",
-                    content=_make_user_memory_entry(intent_result, facts),
+                    content=_make_user_memory_entry(intent_result, turn.facts),
                 )
         except Exception:
             # persistence errors shouldn't break chat
             pass
 
-    return {"reply": text}
+    return text
+
+
+def process_chat(user_id: int, payload: ChatRequest, chat_context: Dict[str, Any] = None):
+    """
+    Blocking pipeline for scripts and other synchronous callers; endpoints use
+    process_chat_async. Generation queues on the LLM scheduler as background work, so it
+    yields to interactive requests and may raise QueueFull.
+    """
+    turn = prepare_chat(user_id, payload, chat_context)
+    if turn.reply is not None:
+        return {"reply": turn.reply}
+
+    # 7) Deterministic generation settings
+    text = llm.scheduled_chat_sync(
+        turn.messages(), CHAT_MODEL, CHAT_OPTIONS, user=user_id, priority=Priority.BACKGROUND
+    )
+    return {"reply": finish_chat(turn, text)}
+
+
+async def process_chat_async(
+    user_id: int,
+    payload: ChatRequest,
+    chat_context: Dict[str, Any] = None,
+    priority: Priority = Priority.INTERACTIVE,
+):
+    """
+    process_chat without blocking the event loop: DB reads/writes, retrieval and logging run
+    in the threadpool, and generation awaits the pooled async Ollama client (app/llm),
+    queued by the LLM scheduler at `priority`. Raises QueueFull when the queue is full.
+    """
+    turn = await run_in_threadpool(prepare_chat, user_id, payload, chat_context)
+    if turn.reply is not None:
+        return {"reply": turn.reply}
+
+    # Identical prompts (same facts, question and context) are answered from the reply cache.
+    text = await llm.cached_chat(turn.messages(), CHAT_MODEL, CHAT_OPTIONS, user=user_id, priority=priority)
+    return {"reply": await run_in_threadpool(finish_chat, turn, text)}
+
+
+def busy_error(exc: QueueFull) -> HTTPException:
+    """429 for a request the LLM scheduler could not queue."""
+    return HTTPException(
+        status_code=429,
+        detail={"error": "busy", "message": "The assistant is busy. Please try again shortly."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _replay(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+async def stream_chat(turn: ChatTurn) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for a prepared turn: `token` events carry text as it is generated,
+    `replace` tells the client to discard what it has shown and display the safe fallback
+    (the incremental post-check tripped), and `done` carries the final reply.
+    """
+    if turn.reply is not None:
+        yield _sse("done", {"reply": turn.reply})
+        return
+
+    check = StreamingTermsCheck(turn.facts)
+    ttft_ms = None
+    key = llm.prompt_key(CHAT_MODEL, turn.messages(), CHAT_OPTIONS)
+    cached = await llm_cache.lookup(key)
+    if cached is not None:
+        stream = _replay(cached)
+    else:
+        # Identical requests generating right now (streamed or not) share one generation.
+        stream = llm.SINGLE_FLIGHT.stream(
+            key, lambda: llm.scheduled_stream(turn.messages(), CHAT_MODEL, CHAT_OPTIONS, user=turn.user_id)
+        )
+    try:
+        async for piece in stream:
+            if ttft_ms is None:
+                ttft_ms = (time.monotonic() - turn.start) * 1000
+            safe = check.feed(piece)
+            if check.tripped:
+                break
+            if safe:
+                yield _sse("token", {"text": safe})
+    except QueueFull as exc:
+        # Admission was checked before the response started; this is the rare lost race.
+        yield _sse("error", {"detail": "busy", "retry_after": exc.retry_after})
+        return
+    except Exception:
+        yield _sse("error", {"detail": "Generation failed"})
+        return
+    finally:
+        await stream.aclose()
+
+    tail = check.finish()
+    if tail:
+        yield _sse("token", {"text": tail})
+    if cached is None and not check.tripped:
+        await llm_cache.store(key, check.text)
+    text = FALLBACK_TEXT if check.tripped else check.text
+    reply = await run_in_threadpool(finish_chat, turn, text, ttft_ms)
+    if check.tripped or reply != text.strip():
+        yield _sse("replace", {"text": reply})
+    yield _sse("done", {"reply": reply})
 
 
 @router.post("/twin/chat")
@@ -225,11 +376,45 @@ async def chat_with_twin(request: Request, user_id: int = Depends(require_auth),
         payload = ChatRequest.model_validate(body)
         ctx = chat_context or {}
         ctx["db"] = ctx.get("db") or db
-        return process_chat(user_id, payload, ctx)
+        return await process_chat_async(user_id, payload, ctx)
+    except QueueFull as exc:
+        raise busy_error(exc)
     finally:
         db.close()
 
 
+@router.post("/twin/chat/stream")
+async def chat_with_twin_stream(request: Request, user_id: int = Depends(require_auth)):
+    """Like /twin/chat, but streams the reply as Server-Sent Events (see stream_chat)."""
+    db = SessionLocal()
+    try:
+        body = await request.json()
+        payload = ChatRequest.model_validate(body)
+        # Consent and prompt building run before the response starts, so errors keep their status.
+        turn = await run_in_threadpool(prepare_chat, user_id, payload, {"db": db})
+        if turn.reply is None:
+            llm_scheduler.SCHEDULER.check_admission()
+    except QueueFull as exc:
+        db.close()
+        raise busy_error(exc)
+    except Exception:
+        db.close()
+        raise
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event in stream_chat(turn):
+                yield event
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 def _make_safe_chat_summary(facts: Dict[str, Any], intent_result):
     parts = []
     for sig in facts.get("signals", []):
@@ -249,9 +434,8 @@ def _make_user_memory_entry(intent_result, facts: Dict[str, Any]) -> str:
 
 @router.post("/twin/summary")
 def twin_summary(payload: SummaryRequest, authorization: str = Header(None)):
-    # optional auth; if provided, validate to tie to user identity for future history
-    if authorization:
-        decode_token_from_header(authorization, expected_type="access")
+    # optional auth; if provided, validate it and use the user's stored trend history
+    user_id = decode_token_from_header(authorization, expected_type="access") if authorization else None
     combined = {}
     for section in (payload.labs, payload.activity, payload.sleep, payload.periods, payload.other):
         if section:
@@ -260,7 +444,15 @@ def twin_summary(payload: SummaryRequest, authorization: str = Header(None)):
     extra_fields = getattr(payload, "__pydantic_extra__", None)
     if extra_fields:
         combined.update(extra_fields)
+    if user_id is not None:
+        # Signed-in users get trends from their stored readings for the scopes they granted
+        from app.consent.repo import get_consent_map
+        db = SessionLocal()
+        try:
+            combined = with_stored_history(db, user_id, combined, get_consent_map(db, user_id))
+        finally:
+            db.close()
     return {
-        "summary": evaluate_health(combined),
+        "summary": cached_evaluate_health(combined),
         "disclaimer": DISCLAIMER_TEXT,
     }
@@ -3,13 +3,15 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Header, Query
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.auth.database import SessionLocal, engine
 from app.auth.security import decode_token
 from app.chat_store.models import Base
 from app.chat_store import repo
-from app.chat import process_chat  # to reuse logic
+from app.chat import busy_error, process_chat_async  # to reuse logic
 from app.chat import ChatRequest
+from app.llm import QueueFull
 
 
 Base.metadata.create_all(bind=engine)
@@ -60,9 +62,8 @@ def get_messages(chat_id: int, authorization: str = Header(None), db: Session =
     ]
 
 
-@router.post("/{chat_id}/messages")
-def post_message(chat_id: int, payload: ChatRequest, authorization: str = Header(None), db: Session = Depends(get_db)):
-    user_id = require_user(authorization)
+def _open_turn(db: Session, chat_id: int, user_id: int, payload: ChatRequest):
+    """Load the chat and check consent; returns (chat, consent_map)."""
     chat = repo.get_chat(db, chat_id, user_id)
     if not chat:
         raise HTTPException(status_code=404, detail="Chat not found")
@@ -84,20 +85,32 @@ def post_message(chat_id: int, payload: ChatRequest, authorization: str = Header
                 "message": "Please grant consent to continue."
             }
         )
-    # re-use chat_with_twin; it requires chat_id in payload? we will pass via wrapper
-    # add chat_id to request context by attaching to payload health_state? we pass separately through dependency
-    # store user message
+    return chat, consent_map
+
+
+def _close_turn(db: Session, chat, user_id: int, payload: ChatRequest, consent_map, reply):
+    # The user message is stored with the reply, so a request turned away (429) leaves no trace.
     if consent_map.get("chat_history"):
         repo.add_message(db, chat, user_id, role="user", content=payload.question)
-    reply = process_chat(
-        user_id=user_id,
-        payload=payload,
-        chat_context={"chat": chat, "db": db, "user_id": user_id, "consent_map": consent_map},
-    )
-    if consent_map.get("chat_history"):
         repo.add_message(db, chat, user_id, role="twin", content=reply["reply"])
     # auto title if missing
     if not chat.title:
         chat.title = payload.question[:50]
         db.commit()
+
+
+@router.post("/{chat_id}/messages")
+async def post_message(chat_id: int, payload: ChatRequest, authorization: str = Header(None), db: Session = Depends(get_db)):
+    user_id = require_user(authorization)
+    # DB work runs in the threadpool so a slow generation never blocks the event loop.
+    chat, consent_map = await run_in_threadpool(_open_turn, db, chat_id, user_id, payload)
+    try:
+        reply = await process_chat_async(
+            user_id=user_id,
+            payload=payload,
+            chat_context={"chat": chat, "db": db, "user_id": user_id, "consent_map": consent_map},
+        )
+    except QueueFull as exc:
+        raise busy_error(exc)
+    await run_in_threadpool(_close_turn, db, chat, user_id, payload, consent_map, reply)
     return reply
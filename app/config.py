@@ -12,3 +12,29 @@ FITBIT_CLIENT_SECRET = env("FITBIT_CLIENT_SECRET", "")
 FITBIT_REDIRECT_URI = env("FITBIT_REDIRECT_URI", "")
 FITBIT_AUTH_SCOPES = env("FITBIT_AUTH_SCOPES", "activity heartrate sleep profile")
 ENCRYPTION_KEY = env("ENCRYPTION_KEY")  # must be 32 urlsafe-base64 bytes for Fernet
+FACTS_CACHE_SIZE = int(env("FACTS_CACHE_SIZE", "1024"))
+FACTS_CACHE_TTL_SECONDS = float(env("FACTS_CACHE_TTL_SECONDS", "300"))
+TREND_STATE_MAX_POINTS = int(env("TREND_STATE_MAX_POINTS", "365"))  # stored readings per user signal
+RAG_EMBED_MODEL = env("RAG_EMBED_MODEL", "nomic-embed-text")
+RAG_CACHE_DIR = env("RAG_CACHE_DIR", ".cache/rag")
+RAG_QUERY_CACHE_SIZE = int(env("RAG_QUERY_CACHE_SIZE", "512"))
+RAG_QUERY_CACHE_PERSIST = env("RAG_QUERY_CACHE_PERSIST", "0") == "1"
+RAG_CHUNK_TOKENS = int(env("RAG_CHUNK_TOKENS", "120"))
+RAG_INDEX = env("RAG_INDEX", "auto")  # exact | ivf | auto (ivf once the corpus reaches RAG_ANN_MIN_ROWS)
+RAG_ANN_MIN_ROWS = int(env("RAG_ANN_MIN_ROWS", "2000"))
+RAG_IVF_NPROBE = int(env("RAG_IVF_NPROBE", "8"))
+RAG_RETRIEVAL = env("RAG_RETRIEVAL", "hybrid")  # dense | lexical | hybrid
+RAG_LEXICAL_MAX_TERMS = int(env("RAG_LEXICAL_MAX_TERMS", "3"))
+RAG_QUANTIZE = env("RAG_QUANTIZE", "none")  # none | float16 | int8
+RAG_RESCORE_FACTOR = int(env("RAG_RESCORE_FACTOR", "4"))
+RAG_WATCH_INTERVAL = float(env("RAG_WATCH_INTERVAL", "0"))  # seconds between docs scans; 0 disables
+RAG_ADMIN_TOKEN = env("RAG_ADMIN_TOKEN", "")
+OLLAMA_HOST = env("OLLAMA_HOST")  # None: the ollama client default (http://localhost:11434)
+LLM_MAX_CONNECTIONS = int(env("LLM_MAX_CONNECTIONS", "16"))
+LLM_TIMEOUT_SECONDS = float(env("LLM_TIMEOUT_SECONDS", "120"))
+LLM_CACHE_SIZE = int(env("LLM_CACHE_SIZE", "256"))  # 0 disables the reply cache
+LLM_CACHE_TTL_SECONDS = float(env("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_DB = env("LLM_CACHE_DB", "")  # SQLite file for a persistent tier; empty keeps replies in memory only
+LLM_CACHE_VERSION = env("LLM_CACHE_VERSION", "1")  # bump to drop cached replies, e.g. after re-pulling a model
+LLM_CONCURRENCY = int(env("LLM_CONCURRENCY", "2"))  # generations sent to Ollama at once, per worker
+LLM_QUEUE_SIZE = int(env("LLM_QUEUE_SIZE", "32"))  # waiting generations before requests get 429
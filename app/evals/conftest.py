@@ -1,7 +1,28 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Ensure project root is on path for imports
 ROOT_DIR = Path(__file__).resolve().parents[2]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
+
+
+@pytest.fixture
+def chat_sandbox(monkeypatch, tmp_path):
+    """
+    Isolate the chat pipeline: events go to a temp log, retrieval returns nothing, and the
+    reply cache, single-flight table and LLM scheduler start empty. Returns the log path.
+    """
+    from app import chat, llm
+
+    log_path = tmp_path / "events.jsonl"
+    flight = llm.SingleFlight()
+    monkeypatch.setattr("app.logging.events.LOG_PATH", log_path)
+    monkeypatch.setattr(chat, "retrieve", lambda *args, **kwargs: [])
+    monkeypatch.setattr("app.llm.cache.RESPONSE_CACHE", llm.ResponseCache())
+    monkeypatch.setattr("app.llm.cache.SINGLE_FLIGHT", flight)
+    monkeypatch.setattr("app.llm.SINGLE_FLIGHT", flight)
+    monkeypatch.setattr("app.llm.scheduler.SCHEDULER", llm.LLMScheduler())
+    return log_path
@@ -0,0 +1,123 @@
+"""
+Retrieval quality and latency benchmark for app/rag. Runs offline: the docs in
+app/rag/docs are chunked as in production and embedded with a deterministic hashed
+bag-of-words stand-in instead of Ollama, then each retriever configuration answers the
+labeled questions in rag_eval_set.json.
+    python -m app.evals.rag_bench --k 3
+Reports recall@k, MRR@k and p50/p99 search latency (query embedding excluded).
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+from app.rag.bm25 import tokenize
+from app.rag.chunker import chunk_markdown
+from app.rag.index import DocIndex
+from app.rag.loader import DOCS_DIR, _front_matter_tags
+
+EVAL_SET_PATH = Path(__file__).resolve().parent / "rag_eval_set.json"
+HASH_DIM = 512
+
+
+def hash_embed(text: str, dim: int = HASH_DIM) -> np.ndarray:
+    """Deterministic signed feature hashing of tokens and token bigrams."""
+    tokens = [t[:-1] if len(t) > 3 and t.endswith("s") else t for t in tokenize(text)]
+    features = tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in features:
+        h = int.from_bytes(hashlib.md5(feature.encode("utf-8")).digest()[:8], "little")
+        vector[h % dim] += 1.0 if (h >> 63) & 1 else -1.0
+    return vector
+
+
+def load_corpus(embed: Callable[[str], Any] = hash_embed) -> List[Dict[str, Any]]:
+    docs = []
+    for file in sorted(DOCS_DIR.glob("*.md")):
+        title = file.stem.replace("_", " ").title()
+        tags, content = _front_matter_tags(file.read_text())
+        for chunk in chunk_markdown(file.stem, title, content):
+            chunk["tags"] = frozenset({file.stem, *tags})
+            chunk["embedding"] = embed(f"{title}\n{chunk['text']}")
+            docs.append(chunk)
+    return docs
+
+
+def configurations() -> Dict[str, Dict[str, Any]]:
+    """Name -> DocIndex settings and query mode."""
+    return {
+        "brute": {"index": {"kind": "exact", "quantize": "none"}, "mode": "dense"},
+        "ann": {"index": {"kind": "ivf", "quantize": "none"}, "mode": "dense"},
+        "bm25": {"index": {"kind": "exact", "quantize": "none"}, "mode": "lexical"},
+        "hybrid": {"index": {"kind": "exact", "quantize": "none"}, "mode": "hybrid"},
+        "quantized": {"index": {"kind": "exact", "quantize": "int8"}, "mode": "dense"},
+    }
+
+
+def evaluate(
+    docs: Sequence[Dict[str, Any]],
+    cases: Sequence[Dict[str, Any]],
+    k: int = 3,
+    repeat: int = 20,
+    embed: Callable[[str], Any] = hash_embed,
+) -> Dict[str, Dict[str, float]]:
+    queries = [(case["question"], embed(case["question"]), set(case["expected"])) for case in cases]
+    report = {}
+    for name, config in configurations().items():
+        index = DocIndex(**config["index"])
+        index.build(docs)
+        mode = config["mode"]
+
+        def search(question, q_emb):
+            if mode == "lexical":
+                return index.lexical_top_k(question, k)
+            if mode == "hybrid":
+                return index.hybrid_top_k(question, q_emb, k)
+            return index.top_k(q_emb, k)
+
+        hits, reciprocal, latencies = 0, 0.0, []
+        for question, q_emb, expected in queries:
+            parents = [index.parents[i] for i in search(question, q_emb)]
+            rank = next((r for r, p in enumerate(parents, start=1) if p in expected), None)
+            hits += rank is not None
+            reciprocal += 1.0 / rank if rank else 0.0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                search(question, q_emb)
+                latencies.append((time.perf_counter() - start) * 1e6)
+        latencies.sort()
+        report[name] = {
+            "recall": hits / len(queries),
+            "mrr": reciprocal / len(queries),
+            "p50_us": statistics.median(latencies),
+            "p99_us": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))],
+        }
+    return report
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.evals.rag_bench")
+    parser.add_argument("--k", type=int, default=3, help="Results per question")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed searches per question")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    cases = json.loads(EVAL_SET_PATH.read_text(encoding="utf-8"))
+    report = evaluate(load_corpus(), cases, k=args.k, repeat=args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{'config':>10} | {f'recall@{args.k}':>9} | {f'mrr@{args.k}':>7} | {'p50 us':>8} | {'p99 us':>8}")
+    for name, row in report.items():
+        print(f"{name:>10} | {row['recall']:>9.3f} | {row['mrr']:>7.3f} | {row['p50_us']:>8.1f} | {row['p99_us']:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
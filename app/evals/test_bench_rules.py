@@ -0,0 +1,35 @@
+import json
+
+from scripts import bench_rules
+from scripts.bench_rules import BASELINE_PATH, compare, missing_cases
+
+
+def test_compare_flags_only_cases_past_threshold():
+    baseline = {"a": 100.0, "b": 100.0, "c": 0.0}
+    results = {"a": 125.0, "b": 125.1, "c": 50.0, "d": 10.0}
+    assert compare(results, baseline, 0.25) == ["b"]
+    assert compare(results, baseline, 0.5) == []
+    assert compare({"a": 90.0}, baseline, 0.0) == []
+
+
+def test_missing_cases_lists_unbaselined_runs():
+    assert missing_cases({"a": 1.0, "c": 1.0, "d": 1.0}, {"a": 2.0, "c": 0.0}) == ["c", "d"]
+
+
+def test_committed_baseline_covers_every_case():
+    baseline = json.loads(BASELINE_PATH.read_text())["cases"]
+    assert missing_cases({name: 1.0 for name, _ in bench_rules.cases()}, baseline) == []
+
+
+def test_check_fails_without_baseline(tmp_path):
+    args = ["--filter", "classify_intent/short", "--rounds", "1", "--min-time", "0.001"]
+    missing = str(tmp_path / "missing.json")
+    assert bench_rules.main(args + ["--baseline", missing]) == 0
+    assert bench_rules.main(args + ["--baseline", missing, "--check"]) == 1
+
+    slow = tmp_path / "slow.json"
+    slow.write_text(json.dumps({"cases": {"classify_intent/short": 1e6}}))
+    assert bench_rules.main(args + ["--baseline", str(slow), "--check"]) == 0
+    fast = tmp_path / "fast.json"
+    fast.write_text(json.dumps({"cases": {"classify_intent/short": 1e-6}}))
+    assert bench_rules.main(args + ["--baseline", str(fast), "--check"]) == 1
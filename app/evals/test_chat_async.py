@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from app import chat, llm
+
+
+def _payload(question="How is my glucose trending?"):
+    return chat.ChatRequest(question=question, health_state={"fasting_glucose": 118})
+
+
+def test_process_chat_async_matches_blocking_pipeline(monkeypatch, chat_sandbox):
+    fake_reply = "Your fasting glucose is in the prediabetes range."
+    seen = []
+
+    async def fake_chat(messages, model, options=None):
+        seen.append((messages, model, options))
+        return fake_reply
+
+    monkeypatch.setattr("app.llm.client.chat", fake_chat)
+    monkeypatch.setattr("app.llm.client.chat_sync", lambda messages, model, options=None: fake_reply)
+    reply = asyncio.run(chat.process_chat_async(1, _payload()))
+    assert reply == chat.process_chat(1, _payload()) == {"reply": fake_reply}
+    messages, model, options = seen[0]
+    assert [m["role"] for m in messages] == ["system", "user"]
+    assert (model, options) == (chat.CHAT_MODEL, chat.CHAT_OPTIONS)
+
+
+def test_concurrent_chats_overlap_generation(monkeypatch, chat_sandbox):
+
+    async def slow_chat(messages, model, options=None):
+        await asyncio.sleep(0.2)
+        return "Your fasting glucose is steady."
+
+    monkeypatch.setattr("app.llm.client.chat", slow_chat)
+    monkeypatch.setattr("app.llm.scheduler.SCHEDULER", llm.LLMScheduler(concurrency=8))
+    # Distinct facts per request, so nothing is coalesced or cached.
+    payloads = [chat.ChatRequest(question="How is my glucose?", health_state={"fasting_glucose": 90 + i}) for i in range(8)]
+
+    async def run():
+        began = time.perf_counter()
+        replies = await asyncio.gather(*(chat.process_chat_async(i, p) for i, p in enumerate(payloads)))
+        return replies, time.perf_counter() - began
+
+    replies, elapsed = asyncio.run(run())
+    assert len(replies) == 8
+    assert elapsed < 8 * 0.2 / 2
+
+
+def test_client_is_pooled_per_event_loop():
+    async def clients():
+        first, second = llm.get_client(), llm.get_client()
+        await llm.aclose()
+        return first, second
+
+    a, b = asyncio.run(clients())
+    c, _ = asyncio.run(clients())
+    assert a is b
+    assert c is not a
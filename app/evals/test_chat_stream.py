@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+
+from app import chat
+from app.safety import StreamingTermsCheck
+
+
+def _events(stream):
+    async def collect():
+        return [block async for block in stream]
+
+    events = []
+    for block in asyncio.run(collect()):
+        event, data = block.strip().split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def _turn(question="How is my glucose trending?"):
+    payload = chat.ChatRequest(question=question, health_state={"fasting_glucose": 118})
+    return chat.prepare_chat(1, payload)
+
+
+def _fake_stream(monkeypatch, pieces):
+    async def fake_stream(messages, model, options=None):
+        for piece in pieces:
+            yield piece
+
+    monkeypatch.setattr("app.llm.client.chat_stream", fake_stream)
+
+
+def test_streaming_check_releases_clean_text():
+    check = StreamingTermsCheck({"signals": []})
+    shown = "".join(check.feed(piece) for piece in ["Your glucose ", "is in the ", "prediabetes range."])
+    shown += check.finish()
+    assert shown == "Your glucose is in the prediabetes range."
+    assert not check.tripped
+
+
+@pytest.mark.parametrize(
+    "pieces, flag",
+    [(["Ask about your me", "dic", "ation"], "medication"), (["can", "cer"], "cancer"), (["a big dose"], "dose")],
+)
+def test_streaming_check_never_releases_part_of_a_red_flag(pieces, flag):
+    check = StreamingTermsCheck({"signals": []})
+    pieces = ["Hello there. ", *pieces, " more"]
+    shown = "".join(check.feed(piece) for piece in pieces) + check.finish()
+    full = "".join(pieces)
+    assert check.tripped
+    assert full.startswith(shown) and len(shown) <= full.index(flag)
+
+
+def test_stream_chat_emits_tokens_and_logs_ttft(monkeypatch, chat_sandbox):
+    turn = _turn()
+    _fake_stream(monkeypatch, ["Your fasting ", "glucose is ", "in the prediabetes range."])
+    events = _events(chat.stream_chat(turn))
+    assert [e for e, _ in events][-1] == "done"
+    assert "".join(d["text"] for e, d in events if e == "token") == events[-1][1]["reply"]
+    assert "replace" not in {e for e, _ in events}
+    logged = json.loads(chat_sandbox.read_text().strip())
+    assert 0 <= logged["ttft_ms"] <= logged["latency_ms"]
+
+
+def test_stream_chat_replaces_output_when_check_trips(monkeypatch, chat_sandbox):
+    turn = _turn()
+    _fake_stream(monkeypatch, ["Your glucose is high. ", "Change your medi", "cation dose now.", "never sent"])
+    events = _events(chat.stream_chat(turn))
+    shown = "".join(d["text"] for e, d in events if e == "token")
+    assert "medi" not in shown and "never sent" not in shown
+    assert events[-2] == ("replace", {"text": chat.FALLBACK_TEXT})
+    assert events[-1] == ("done", {"reply": chat.FALLBACK_TEXT})
+
+
+def test_stream_chat_answers_blocked_questions_without_the_llm(monkeypatch, chat_sandbox):
+    turn = _turn(question="What dose of insulin should I take?")
+    monkeypatch.setattr("app.llm.client.chat_stream", lambda *args, **kwargs: pytest.fail("LLM should not be called"))
+    events = _events(chat.stream_chat(turn))
+    assert len(events) == 1 and events[0][0] == "done"
+    assert "medication decisions" in events[0][1]["reply"]
@@ -4,7 +4,11 @@ from app.main import app
 
 
 # stub LLM
-chat_module.ollama.chat = lambda **kwargs: {"message": {"content": "stubbed reply"}}
+async def _stub_llm_chat(messages, model, options=None):
+    return "stubbed reply"
+
+
+chat_module.llm.client.chat = _stub_llm_chat
 
 client = TestClient(app)
 
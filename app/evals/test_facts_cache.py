@@ -0,0 +1,56 @@
+import threading
+
+from app.rules import evaluate_health
+from app.rules.cache import FactsCache, cached_evaluate_health, payload_key
+
+
+def test_cache_hits_and_copy_on_read():
+    cache = FactsCache(maxsize=8, ttl=60)
+    payload = {"ldl": 145, "fasting_glucose": 118, "history": {"ldl": [170, 160]}}
+    first = cached_evaluate_health(payload, cache)
+    first["signals"][0]["explanation"]["rule"] = "corrupted"
+    first["risks"].append("corrupted")
+    second = cached_evaluate_health({"history": {"ldl": [170, 160]}, "fasting_glucose": 118, "ldl": 145}, cache)
+    assert second == evaluate_health(payload)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_key_normalization():
+    assert payload_key({"a": 1, "b": 2.5}) == payload_key({"b": 2.5, "a": 1})
+    # The facts echo raw values, so int/float/bool spellings must not share an entry
+    assert payload_key({"ldl": 118}) != payload_key({"ldl": 118.0})
+    assert payload_key({"cycle_irregular": True}) != payload_key({"cycle_irregular": 1})
+    assert payload_key({"ldl": float("nan")}) == payload_key({"ldl": float("nan")})
+
+
+def test_lru_eviction_and_ttl():
+    now = [0.0]
+    cache = FactsCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    for value in (90, 100, 110):
+        cached_evaluate_health({"fasting_glucose": value}, cache)
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
+    now[0] = 11
+    cached_evaluate_health({"fasting_glucose": 110}, cache)
+    assert cache.stats()["expirations"] == 1 and cache.stats()["hits"] == 0
+
+
+def test_threaded_access():
+    cache = FactsCache(maxsize=16, ttl=60)
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(200):
+                payload = {"fasting_glucose": 80 + (i + offset) % 40}
+                assert cached_evaluate_health(payload, cache) == evaluate_health(payload)
+        except AssertionError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = cache.stats()
+    assert not errors
+    assert stats["hits"] + stats["misses"] == 1600 and stats["size"] <= 16
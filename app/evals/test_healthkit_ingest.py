@@ -1,12 +1,9 @@
 from fastapi.testclient import TestClient
-import app.chat as chat_module
 from app.main import app
 from app.auth.database import SessionLocal
 from app.wearables.snapshots import UserHealthStateSnapshot
 import json
 
-chat_module.ollama.chat = lambda **kwargs: {"message": {"content": "stubbed reply"}}
-
 client = TestClient(app)
 
 
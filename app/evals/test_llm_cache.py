@@ -0,0 +1,122 @@
+import asyncio
+
+from app import chat
+from app.llm.cache import ResponseCache, cached_chat, generation_fingerprint, prompt_key
+
+MESSAGES = [{"role": "system", "content": "Explain the facts."}, {"role": "user", "content": "How is my sleep?"}]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_prompt_key_covers_model_messages_and_options():
+    base = prompt_key("llama3", MESSAGES, {"temperature": 0.0})
+    assert base == prompt_key("llama3", [dict(m) for m in MESSAGES], {"temperature": 0.0})
+    assert base != prompt_key("llama3.1", MESSAGES, {"temperature": 0.0})
+    assert base != prompt_key("llama3", MESSAGES[:1], {"temperature": 0.0})
+    assert base != prompt_key("llama3", MESSAGES, {"temperature": 0.2})
+
+
+def test_repeated_prompt_is_served_from_cache(monkeypatch):
+    calls = []
+
+    async def fake_chat(messages, model, options=None):
+        calls.append(model)
+        return "You slept 7 hours on average."
+
+    monkeypatch.setattr("app.llm.client.chat", fake_chat)
+    cache = ResponseCache()
+
+    async def twice():
+        return [await cached_chat(MESSAGES, "llama3", {}, cache=cache) for _ in range(2)]
+
+    assert asyncio.run(twice()) == ["You slept 7 hours on average."] * 2
+    assert calls == ["llama3"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_empty_replies_are_not_cached(monkeypatch):
+    async def empty_chat(messages, model, options=None):
+        return "  "
+
+    monkeypatch.setattr("app.llm.client.chat", empty_chat)
+    cache = ResponseCache()
+    asyncio.run(cached_chat(MESSAGES, "llama3", {}, cache=cache))
+    assert cache.stats()["size"] == 0
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = ResponseCache(ttl=60, clock=clock)
+    cache.put("k", "reply")
+    clock.now += 59
+    assert cache.get("k") == "reply"
+    clock.now += 2
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_sqlite_tier_survives_restart_and_respects_ttl(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "replies.sqlite3")
+    first = ResponseCache(ttl=60, path=path, clock=clock)
+    first.check_generation("gen-a")
+    first.put("k", "reply")
+
+    second = ResponseCache(ttl=60, path=path, clock=clock)
+    second.check_generation("gen-a")
+    assert second.get("k") == "reply"
+    assert second.stats()["disk_hits"] == 1
+
+    clock.now += 61
+    third = ResponseCache(ttl=60, path=path, clock=clock)
+    third.check_generation("gen-a")
+    assert third.get("k") is None
+
+
+def test_generation_change_invalidates_both_tiers(tmp_path):
+    path = str(tmp_path / "replies.sqlite3")
+    old = generation_fingerprint("llama3", "Old disclaimer.")
+    new = generation_fingerprint("llama3", "New disclaimer.")
+    assert old != new != generation_fingerprint("llama3.1", "Old disclaimer.")
+
+    cache = ResponseCache(path=path)
+    assert not cache.check_generation(old)
+    cache.put("k", "reply")
+    assert cache.check_generation(new)
+    assert cache.get("k") is None
+
+    cache.put("k", "reply")
+    restarted = ResponseCache(path=path)
+    assert not restarted.check_generation(new)
+    assert restarted.get("k") == "reply"
+    restarted.invalidate()
+    assert ResponseCache(path=path).get("k") is None
+
+
+def test_stream_chat_replays_cached_reply(monkeypatch, chat_sandbox):
+    streamed = []
+
+    async def fake_stream(messages, model, options=None):
+        streamed.append(model)
+        for piece in ["Your fasting glucose ", "is steady."]:
+            yield piece
+
+    monkeypatch.setattr("app.llm.client.chat_stream", fake_stream)
+
+    async def run():
+        replies = []
+        for _ in range(2):
+            turn = chat.prepare_chat(1, chat.ChatRequest(question="How is my glucose?", health_state={"fasting_glucose": 90}))
+            blocks = [block async for block in chat.stream_chat(turn)]
+            replies.append(blocks[-1])
+        return replies
+
+    first, second = asyncio.run(run())
+    assert first == second and "Your fasting glucose is steady." in first
+    assert streamed == [chat.CHAT_MODEL]
@@ -0,0 +1,213 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import chat
+from app.twin_engine import TwinEngine
+from app.llm.scheduler import LLMScheduler, Priority, QueueFull, scheduled_chat_sync
+
+
+async def _hold(scheduler, order, name, user=None, priority=Priority.INTERACTIVE, seconds=0.01):
+    async with scheduler.slot(user, priority):
+        order.append(name)
+        await asyncio.sleep(seconds)
+
+
+def test_concurrency_limit_is_respected():
+    scheduler = LLMScheduler(concurrency=2, max_queue=10)
+    peak = []
+
+    async def work(i):
+        async with scheduler.slot(user=i):
+            peak.append(scheduler.stats()["active"])
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(work(i) for i in range(6)))
+
+    asyncio.run(run())
+    assert max(peak) == 2
+    stats = scheduler.stats()
+    assert (stats["active"], stats["queue_depth"], stats["admitted"]) == (0, 0, 6)
+    assert stats["wait_ms_p99"] > 0
+
+
+def test_interactive_work_jumps_background_and_users_take_turns():
+    scheduler = LLMScheduler(concurrency=1, max_queue=10)
+    order = []
+
+    async def run():
+        first = asyncio.ensure_future(_hold(scheduler, order, "busy", seconds=0.02))
+        await asyncio.sleep(0)
+        queued = [
+            ("bg", "jobs", Priority.BACKGROUND),
+            ("a1", "alice", Priority.INTERACTIVE),
+            ("a2", "alice", Priority.INTERACTIVE),
+            ("a3", "alice", Priority.INTERACTIVE),
+            ("b1", "bob", Priority.INTERACTIVE),
+        ]
+        tasks = []
+        for name, user, priority in queued:
+            tasks.append(asyncio.ensure_future(_hold(scheduler, order, name, user, priority)))
+            await asyncio.sleep(0)
+        assert scheduler.stats()["queue_depth_by_priority"] == {"interactive": 4, "background": 1}
+        await asyncio.gather(first, *tasks)
+
+    asyncio.run(run())
+    assert order == ["busy", "a1", "b1", "a2", "a3", "bg"]
+
+
+def test_full_queue_rejects_fast_with_retry_after():
+    scheduler = LLMScheduler(concurrency=1, max_queue=1)
+
+    async def run():
+        holder = asyncio.ensure_future(_hold(scheduler, [], "busy", seconds=0.02))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(_hold(scheduler, [], "queued"))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFull) as excinfo:
+            await scheduler.acquire("late")
+        await asyncio.gather(holder, waiter)
+        return excinfo.value
+
+    exc = asyncio.run(run())
+    assert exc.retry_after >= 1
+    assert scheduler.stats()["rejected"] == 1
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = LLMScheduler(concurrency=1, max_queue=5)
+
+    async def run():
+        holder = asyncio.ensure_future(_hold(scheduler, [], "busy", seconds=0.02))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(scheduler.acquire("gone"))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queue_depth"] == 1
+        waiter.cancel()
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queue_depth"] == 0
+        await holder
+
+    asyncio.run(run())
+    assert scheduler.stats()["active"] == 0
+
+
+def test_release_skips_a_waiter_cancelled_before_it_ran():
+    scheduler = LLMScheduler(concurrency=1, max_queue=5)
+
+    async def run():
+        await scheduler.acquire("holder")
+        gone = asyncio.ensure_future(scheduler.acquire("gone"))
+        await asyncio.sleep(0)
+        nxt = asyncio.ensure_future(scheduler.acquire("next"))
+        await asyncio.sleep(0)
+        gone.cancel()
+        # The slot is released before the cancelled acquire() gets to clean up after itself.
+        scheduler.release()
+        await nxt
+        with pytest.raises(asyncio.CancelledError):
+            await gone
+        assert scheduler.stats()["queue_depth"] == 0 and scheduler.stats()["active"] == 1
+        scheduler.release()
+
+    asyncio.run(run())
+    assert scheduler.stats()["active"] == 0
+    assert scheduler.stats()["queue_depth"] == 0
+
+
+@contextmanager
+def _server_loop(scheduler):
+    """A loop running in its own thread that `scheduler` is bound to, like the app's."""
+    loop = asyncio.new_event_loop()
+    server = threading.Thread(target=loop.run_forever, daemon=True)
+    server.start()
+    try:
+        scheduler.bind(loop)
+        yield loop
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        server.join()
+        loop.close()
+
+
+def test_sync_callers_queue_as_background_work(monkeypatch, chat_sandbox):
+    scheduler = LLMScheduler()
+    priorities = []
+    acquire = scheduler.acquire
+
+    async def recording_acquire(user=None, priority=Priority.INTERACTIVE):
+        priorities.append(priority)
+        await acquire(user, priority)
+
+    async def fake_chat(messages, model, options=None):
+        return "Your values look steady."
+
+    monkeypatch.setattr(scheduler, "acquire", recording_acquire)
+    monkeypatch.setattr("app.llm.scheduler.SCHEDULER", scheduler)
+    monkeypatch.setattr("app.llm.client.chat", fake_chat)
+    payload = chat.ChatRequest(question="How is my glucose?", health_state={"fasting_glucose": 90})
+    with _server_loop(scheduler):
+        assert chat.process_chat(1, payload) == {"reply": "Your values look steady."}
+        assert TwinEngine().explain_health({"sleep_hours": 6}) == "Your values look steady."
+    assert priorities == [Priority.BACKGROUND, Priority.BACKGROUND]
+    assert scheduler.stats()["active"] == 0
+
+
+def test_sync_call_queues_on_the_servers_loop(monkeypatch):
+    scheduler = LLMScheduler(concurrency=1)
+    monkeypatch.setattr("app.llm.scheduler.SCHEDULER", scheduler)
+    ran_on = []
+
+    async def fake_chat(messages, model, options=None):
+        ran_on.append(asyncio.get_running_loop())
+        return "ok"
+
+    monkeypatch.setattr("app.llm.client.chat", fake_chat)
+    with _server_loop(scheduler) as loop:
+        assert scheduled_chat_sync([{"role": "user", "content": "hi"}], "llama3") == "ok"
+    assert ran_on == [loop]
+
+
+def test_sync_calls_from_many_threads_without_a_server(monkeypatch):
+    scheduler = LLMScheduler(concurrency=1)
+    monkeypatch.setattr("app.llm.scheduler.SCHEDULER", scheduler)
+
+    def fake_chat_sync(messages, model, options=None):
+        time.sleep(0.02)
+        return messages[0]["content"]
+
+    monkeypatch.setattr("app.llm.client.chat_sync", fake_chat_sync)
+    with ThreadPoolExecutor(3) as pool:
+        replies = list(pool.map(lambda i: scheduled_chat_sync([{"role": "user", "content": str(i)}], "llama3"), range(3)))
+    assert replies == ["0", "1", "2"]
+    # Nothing went through the scheduler, so it never picked up any thread's loop.
+    assert scheduler.loop is None and scheduler.stats()["admitted"] == 0
+
+
+def test_scheduler_refuses_a_second_running_loop():
+    scheduler = LLMScheduler()
+    with _server_loop(scheduler):
+        with pytest.raises(RuntimeError):
+            asyncio.run(scheduler.acquire())
+    asyncio.run(_hold(scheduler, [], "after"))  # the first loop has stopped; a new one may take over
+    assert scheduler.stats()["admitted"] == 1
+
+
+def test_chat_returns_429_when_queue_is_full(monkeypatch, chat_sandbox):
+    from app.main import app
+
+    monkeypatch.setattr("app.consent.repo.get_consent_map", lambda db, user_id: {"glucose_data": True})
+    monkeypatch.setattr("app.llm.scheduler.SCHEDULER", LLMScheduler(concurrency=0, max_queue=0))
+    monkeypatch.setitem(app.dependency_overrides, chat.require_auth, lambda: 1)
+    client = TestClient(app)
+    body = {"question": "How is my glucose?", "health_state": {"fasting_glucose": 90}}
+    for path in ("/twin/chat", "/twin/chat/stream"):
+        r = client.post(path, json=body)
+        assert r.status_code == 429, path
+        assert int(r.headers["Retry-After"]) >= 1
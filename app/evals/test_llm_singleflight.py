@@ -0,0 +1,226 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.llm.cache import ResponseCache, cached_chat
+from app.llm.singleflight import SingleFlight
+
+MESSAGES = [{"role": "user", "content": "How is my sleep?"}]
+
+
+def test_concurrent_identical_calls_share_one_generation(monkeypatch):
+    flight = SingleFlight()
+    monkeypatch.setattr("app.llm.cache.SINGLE_FLIGHT", flight)
+    calls = []
+
+    async def slow_chat(messages, model, options=None):
+        calls.append(model)
+        await asyncio.sleep(0.05)
+        return f"reply from {model}"
+
+    monkeypatch.setattr("app.llm.client.chat", slow_chat)
+
+    async def run():
+        same = [cached_chat(MESSAGES, "llama3", {}, cache=None) for _ in range(5)]
+        other = cached_chat(MESSAGES, "llama3.1", {}, cache=None)
+        return await asyncio.gather(*same, other)
+
+    replies = asyncio.run(run())
+    assert replies == ["reply from llama3"] * 5 + ["reply from llama3.1"]
+    assert sorted(calls) == ["llama3", "llama3.1"]
+    stats = flight.stats()
+    assert (stats["leaders"], stats["coalesced"], stats["in_flight"]) == (2, 4, 0)
+
+
+def test_coalesced_result_is_cached_once(monkeypatch):
+    monkeypatch.setattr("app.llm.cache.SINGLE_FLIGHT", SingleFlight())
+    cache = ResponseCache()
+
+    async def slow_chat(messages, model, options=None):
+        await asyncio.sleep(0.02)
+        return "You slept well."
+
+    monkeypatch.setattr("app.llm.client.chat", slow_chat)
+
+    async def run():
+        await asyncio.gather(*(cached_chat(MESSAGES, "llama3", {}, cache=cache) for _ in range(3)))
+        return await cached_chat(MESSAGES, "llama3", {}, cache=cache)
+
+    assert asyncio.run(run()) == "You slept well."
+    assert cache.stats()["size"] == 1 and cache.stats()["hits"] == 1
+
+
+def test_failure_reaches_every_waiter_and_is_not_remembered():
+    flight = SingleFlight()
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("model unavailable")
+        return "ok"
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("k", flaky) for _ in range(3)), return_exceptions=True)
+        return results, await flight.do("k", flaky)
+
+    results, retry = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert retry == "ok"
+    assert flight.stats()["failures"] == 1
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.03)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_stream_subscribers_share_one_generation_and_late_ones_replay():
+    flight = SingleFlight()
+    started = []
+
+    async def pieces():
+        started.append(1)
+        for piece in ["You ", "slept ", "well."]:
+            await asyncio.sleep(0.01)
+            yield piece
+
+    async def collect(delay):
+        await asyncio.sleep(delay)
+        return [piece async for piece in flight.stream("k", pieces)]
+
+    async def run():
+        return await asyncio.gather(collect(0), collect(0.015), collect(0.015))
+
+    assert asyncio.run(run()) == [["You ", "slept ", "well."]] * 3
+    assert started == [1]
+    assert (flight.stats()["leaders"], flight.stats()["coalesced"], flight.stats()["in_flight"]) == (1, 2, 0)
+
+
+def test_concurrent_identical_streams_share_one_generation(monkeypatch, chat_sandbox):
+    from app import chat
+
+    generations = []
+
+    async def slow_stream(messages, model, options=None):
+        generations.append(model)
+        for piece in ["Your fasting glucose ", "is steady."]:
+            await asyncio.sleep(0.02)
+            yield piece
+
+    monkeypatch.setattr("app.llm.client.chat_stream", slow_stream)
+
+    async def one():
+        turn = chat.prepare_chat(1, chat.ChatRequest(question="How is my glucose?", health_state={"fasting_glucose": 90}))
+        return [block async for block in chat.stream_chat(turn)]
+
+    async def run():
+        return await asyncio.gather(one(), one())
+
+    first, second = asyncio.run(run())
+    assert first == second and "Your fasting glucose is steady." in first[-1]
+    assert generations == [chat.CHAT_MODEL]
+
+
+def _counting_stream(monkeypatch, pieces):
+    reads, closed = [], []
+
+    async def slow_stream(messages, model, options=None):
+        try:
+            for piece in pieces:
+                await asyncio.sleep(0.01)
+                reads.append(piece)
+                yield piece
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr("app.llm.client.chat_stream", slow_stream)
+    return reads, closed
+
+
+def test_tripped_stream_stops_reading_from_the_model(monkeypatch, chat_sandbox):
+    from app import chat
+    from app.llm import scheduler
+
+    reads, closed = _counting_stream(monkeypatch, ["Your glucose is high. ", "Change your medi", "cation dose now."] + ["more "] * 30)
+
+    async def run():
+        turn = chat.prepare_chat(1, chat.ChatRequest(question="How is my glucose?", health_state={"fasting_glucose": 90}))
+        events = [block async for block in chat.stream_chat(turn)]
+        seen = len(reads)
+        await asyncio.sleep(0.1)
+        return events, seen
+
+    events, seen = asyncio.run(run())
+    assert any(block.startswith("event: replace") for block in events)
+    assert len(reads) == seen < 6
+    assert closed == [True]
+    assert scheduler.SCHEDULER.stats()["active"] == 0
+
+
+def test_abandoned_stream_is_cancelled_but_shared_one_is_not(monkeypatch, chat_sandbox):
+    from app.llm import scheduler
+
+    reads, closed = _counting_stream(monkeypatch, [f"{i} " for i in range(30)])
+    flight = SingleFlight()
+
+    def generate():
+        return scheduler.scheduled_stream(MESSAGES, "llama3")
+
+    async def leave_early():
+        stream = flight.stream("k", generate)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    async def run():
+        first = await leave_early()
+        await asyncio.sleep(0.1)
+        abandoned = (len(reads), list(closed), flight.stats()["in_flight"])
+        reads.clear()
+        # A second subscriber keeps the generation alive after the first one leaves.
+        whole = asyncio.ensure_future(_collect(flight.stream("k", generate)))
+        await asyncio.sleep(0)
+        await leave_early()
+        return first, abandoned, await whole
+
+    first, abandoned, whole = asyncio.run(run())
+    assert first == "0 "
+    assert abandoned[0] < 5 and abandoned[1:] == ([True], 0)
+    assert "".join(whole) == "".join(f"{i} " for i in range(30))
+    assert scheduler.SCHEDULER.stats()["active"] == 0
+
+
+async def _collect(stream):
+    return [piece async for piece in stream]
+
+
+def test_join_returns_none_when_idle():
+    assert asyncio.run(SingleFlight().join("k")) is None
+
+
+def test_metrics_endpoint_requires_admin(monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr("app.rag.router.RAG_ADMIN_TOKEN", "secret")
+    client = TestClient(app)
+    assert client.get("/llm/metrics").status_code == 403
+    body = client.get("/llm/metrics", headers={"X-Admin-Token": "secret"}).json()
+    assert {"cache", "singleflight"} <= set(body)
+    assert "coalesced" in body["singleflight"]
@@ -0,0 +1,43 @@
+import numpy as np
+
+from app.rag.ann import ExactSearch, IVFSearch, build_ivf
+from app.rag.index import DocIndex, normalize_rows
+
+
+def _clustered(n=2000, dim=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    rows = centers[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, dim))
+    return normalize_rows(rows.astype(np.float32)), rng
+
+
+def test_ivf_recall_against_exact():
+    matrix, rng = _clustered()
+    exact = ExactSearch(matrix)
+    ivf = IVFSearch.train(matrix, nprobe=8)
+    hits = 0
+    for _ in range(50):
+        q = matrix[rng.integers(matrix.shape[0])] + 0.1 * rng.normal(size=matrix.shape[1]).astype(np.float32)
+        q /= np.linalg.norm(q)
+        hits += len(set(exact.search(q, 10).tolist()) & set(ivf.search(q, 10).tolist()))
+    assert hits / (50 * 10) >= 0.9
+
+
+def test_ivf_is_persisted_and_reloaded(tmp_path):
+    matrix, _ = _clustered(n=300)
+    first = build_ivf(matrix, tmp_path)
+    assert len(list(tmp_path.glob("ivf-*.npz"))) == 1
+    second = build_ivf(matrix, tmp_path)
+    assert np.array_equal(first.order, second.order) and np.array_equal(first.centroids, second.centroids)
+
+
+def test_doc_index_uses_ivf_for_large_corpora():
+    matrix, _ = _clustered(n=400)
+    docs = [{"title": f"D{i}", "parent": f"d{i}", "text": "t", "embedding": row} for i, row in enumerate(matrix)]
+    index = DocIndex(kind="auto", ann_min_rows=100)
+    index.build(docs)
+    assert index.backend.kind == "ivf"
+    assert index.top_k(matrix[7], 1) == [7]
+    small = DocIndex(kind="auto", ann_min_rows=1000)
+    small.build(docs)
+    assert small.backend.kind == "exact"
@@ -0,0 +1,28 @@
+import json
+
+import numpy as np
+
+from app.evals.rag_bench import EVAL_SET_PATH, configurations, evaluate, hash_embed, load_corpus
+from app.rag.loader import DOCS_DIR
+
+
+def test_eval_set_covers_every_doc():
+    cases = json.loads(EVAL_SET_PATH.read_text(encoding="utf-8"))
+    labeled = {stem for case in cases for stem in case["expected"]}
+    assert labeled == {path.stem for path in DOCS_DIR.glob("*.md")}
+
+
+def test_hash_embed_is_deterministic():
+    first = hash_embed("Fasting glucose and sleep")
+    assert np.array_equal(first, hash_embed("Fasting glucose and sleep"))
+    assert not np.array_equal(first, hash_embed("LDL cholesterol"))
+
+
+def test_every_configuration_clears_a_recall_floor():
+    cases = json.loads(EVAL_SET_PATH.read_text(encoding="utf-8"))
+    report = evaluate(load_corpus(), cases, k=3, repeat=1)
+    assert set(report) == set(configurations())
+    for name, row in report.items():
+        assert row["recall"] >= 0.8, name
+        assert 0.0 < row["mrr"] <= row["recall"]
+        assert 0.0 <= row["p50_us"] <= row["p99_us"]
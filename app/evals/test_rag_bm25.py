@@ -0,0 +1,64 @@
+from app.rag import loader, retriever
+from app.rag.bm25 import BM25Index, tokenize
+from app.rag.index import DocIndex
+
+DOCS = [
+    {"title": "Sleep", "parent": "sleep", "text": "Sleep duration of 7-9 hours is optimal.", "embedding": [1.0, 0.0, 0.0]},
+    {"title": "Glucose", "parent": "glucose", "text": "Fasting glucose below 100 is normal.", "embedding": [0.0, 1.0, 0.0]},
+    {"title": "Lipids", "parent": "lipids", "text": "LDL cholesterol and triglycerides.", "embedding": [0.0, 0.0, 1.0]},
+]
+
+
+def _use_index(monkeypatch, docs):
+    index = DocIndex(kind="exact")
+    index.build(docs)
+    monkeypatch.setattr(loader, "INDEX", index)
+    return index
+
+
+def test_bm25_ranks_term_matches():
+    bm25 = BM25Index()
+    bm25.build([f"{d['title']} {d['text']}" for d in DOCS])
+    assert bm25.search("What is my fasting glucose?", 3).tolist() == [1]
+    assert bm25.search("unrelated words", 3).tolist() == []
+    assert "the" not in tokenize("the LDL")
+
+
+def test_short_keyword_query_skips_embedding(monkeypatch):
+    _use_index(monkeypatch, DOCS)
+
+    def no_embedding(text):
+        raise AssertionError("embedding should not be requested")
+
+    monkeypatch.setattr(retriever, "embed_text", no_embedding)
+    assert retriever.retrieve("ldl", top_k=1) == ["Lipids: LDL cholesterol and triglycerides."]
+
+
+def test_embedding_failure_falls_back_to_bm25(monkeypatch):
+    _use_index(monkeypatch, DOCS)
+
+    def offline(text):
+        raise ConnectionError("ollama down")
+
+    monkeypatch.setattr(retriever, "embed_text", offline)
+    out = retriever.retrieve("how many hours of sleep should I get each night to be healthy", top_k=1)
+    assert out == ["Sleep: Sleep duration of 7-9 hours is optimal."]
+
+
+def test_unembedded_rows_are_searchable_lexically(monkeypatch):
+    docs = [dict(d) for d in DOCS]
+    docs[2]["embedding"] = None
+    index = _use_index(monkeypatch, docs)
+    assert index.dense
+    monkeypatch.setattr(retriever, "embed_text", lambda text: [0.0, 1.0, 0.0])
+    out = retriever.retrieve("tell me about my ldl cholesterol triglycerides numbers please", top_k=2, mode="hybrid")
+    assert out[0].startswith("Lipids") and out[1].startswith("Glucose")
+    assert retriever.retrieve("tell me about ldl cholesterol triglycerides today", top_k=1, mode="dense")[0].startswith("Glucose")
+
+
+def test_hybrid_fusion_combines_rankings():
+    index = DocIndex(kind="exact")
+    index.build(DOCS)
+    # Dense prefers glucose, BM25 prefers sleep; both appear, each parent once.
+    rows = index.hybrid_top_k("sleep hours", [0.0, 1.0, 0.0], 3)
+    assert set(rows[:2]) == {0, 1} and len(rows) == len(set(rows))
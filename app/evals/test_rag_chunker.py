@@ -0,0 +1,43 @@
+import numpy as np
+
+from app.rag.chunker import chunk_markdown, count_tokens
+from app.rag.index import DocIndex
+
+DOC = """Title: Lipid Panel
+- LDL: <100 optimal.
+- HDL: >=60 protective.
+
+## Triglycerides
+Fasting triglycerides below 150 are normal.
+
+A second paragraph about triglycerides that is fairly long and keeps going for a while.
+"""
+
+
+def test_chunks_follow_headings_and_keep_parent():
+    chunks = chunk_markdown("lipids", "Lipids", DOC, max_tokens=200)
+    assert [c["heading"] for c in chunks] == ["Lipid Panel", "Triglycerides"]
+    assert all(c["parent"] == "lipids" for c in chunks)
+    assert chunks[0]["text"].startswith("Lipid Panel\n- LDL")
+    assert chunks[0]["id"] != chunks[1]["id"]
+
+
+def test_token_budget_is_respected():
+    long_doc = "# Notes\n" + "\n\n".join(" ".join(f"w{i}" for i in range(30)) for _ in range(10))
+    chunks = chunk_markdown("notes", "Notes", long_doc, max_tokens=40)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        body = chunk["text"].split("\n", 1)[1]
+        assert count_tokens(body) <= 40
+
+
+def test_search_dedupes_by_parent():
+    docs = [
+        {"title": "A", "parent": "a", "text": "a1", "embedding": [1.0, 0.0]},
+        {"title": "A", "parent": "a", "text": "a2", "embedding": [0.99, 0.1]},
+        {"title": "B", "parent": "b", "text": "b1", "embedding": [0.5, 0.5]},
+    ]
+    index = DocIndex()
+    index.build(docs)
+    assert index.search(np.array([1.0, 0.0]), 2) == ["A: a1", "B: b1"]
+    assert index.search(np.array([1.0, 0.0]), 5) == ["A: a1", "B: b1"]
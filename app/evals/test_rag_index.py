@@ -0,0 +1,45 @@
+import numpy as np
+
+from app.rag import loader, retriever
+from app.rag.index import DocIndex
+
+
+def _docs(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {"title": f"Doc {i}", "text": f"text {i}", "embedding": rng.normal(size=dim).tolist()}
+        for i in range(n)
+    ]
+
+
+def test_top_k_matches_brute_force_cosine():
+    docs = _docs(50)
+    index = DocIndex()
+    index.build(docs)
+    assert index.matrix.dtype == np.float32 and index.matrix.flags["C_CONTIGUOUS"]
+    query = np.random.default_rng(1).normal(size=16)
+    cosine = [
+        float(np.dot(query, d["embedding"]) / (np.linalg.norm(query) * np.linalg.norm(d["embedding"])))
+        for d in docs
+    ]
+    expected = sorted(range(len(docs)), key=lambda i: -cosine[i])[:5]
+    assert index.top_k(query, 5) == expected
+    assert index.search(query, 2) == [f"Doc {i}: text {i}" for i in expected[:2]]
+
+
+def test_top_k_larger_than_index_and_empty():
+    index = DocIndex()
+    assert index.search([1.0, 0.0], 3) == []
+    index.build(_docs(2, dim=2))
+    assert len(index.search([1.0, 0.0], 10)) == 2
+
+
+def test_retrieve_uses_loaded_index(monkeypatch):
+    docs = [
+        {"title": "Sleep", "text": "sleep text", "embedding": [1.0, 0.0]},
+        {"title": "Glucose", "text": "glucose text", "embedding": [0.0, 1.0]},
+    ]
+    monkeypatch.setattr(loader, "INDEX", DocIndex())
+    loader.INDEX.build(docs)
+    monkeypatch.setattr(retriever, "embed_text", lambda text: [0.1, 0.9])
+    assert retriever.retrieve("glucose?", top_k=1) == ["Glucose: glucose text"]
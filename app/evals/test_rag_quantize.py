@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.rag.index import DocIndex, normalize_rows
+from app.rag.quantize import quantize
+
+
+def _matrix(n=500, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    return normalize_rows(rng.normal(size=(n, dim)).astype(np.float32)), rng
+
+
+def test_codes_approximate_float32_scores():
+    matrix, rng = _matrix()
+    q = matrix[3]
+    exact = matrix @ q
+    for kind, tol in (("float16", 1e-3), ("int8", 2e-2)):
+        codes = quantize(matrix, kind)
+        assert np.max(np.abs(codes @ q - exact)) < tol
+        assert np.allclose(codes[[1, 2]].decode(), matrix[[1, 2]], atol=tol)
+    assert quantize(matrix, "int8").nbytes < matrix.nbytes / 3
+
+
+def test_rescored_results_match_exact(tmp_path):
+    matrix, rng = _matrix()
+    docs = [{"title": f"D{i}", "parent": f"d{i}", "text": "t", "embedding": row} for i, row in enumerate(matrix)]
+    exact = DocIndex(kind="exact", quantize="none")
+    exact.build(docs)
+    for kind in ("float16", "int8"):
+        index = DocIndex(kind="exact", quantize=kind, cache_dir=tmp_path)
+        index.build(docs)
+        assert isinstance(index.matrix, np.memmap) and index.memory_bytes()["float32"] == 0
+        for _ in range(20):
+            q = rng.normal(size=matrix.shape[1])
+            assert index.top_k(q, 5) == exact.top_k(q, 5)
+        rows = np.arange(0, 500, 7)
+        q = rng.normal(size=matrix.shape[1])
+        assert index.top_k(q, 3, rows) == exact.top_k(q, 3, rows)
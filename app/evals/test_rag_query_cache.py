@@ -0,0 +1,45 @@
+from app.rag import embed
+from app.rag.embed import EmbeddingCache, embed_text
+
+
+def _counting(monkeypatch):
+    calls = []
+
+    def fake(text, model):
+        calls.append((model, text))
+        return [float(len(text)), 0.5]
+
+    monkeypatch.setattr(embed, "_embed", fake)
+    return calls
+
+
+def test_repeat_queries_skip_the_model(monkeypatch):
+    calls = _counting(monkeypatch)
+    cache = EmbeddingCache(maxsize=4)
+    first = embed_text("How is my  sleep?", "m", cache=cache)
+    first.append(99.0)
+    assert embed_text("  How is my sleep? ", "m", cache=cache) == [16.0, 0.5]
+    embed_text("How is my sleep?", "other-model", cache=cache)
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2 and abs(stats["hit_rate"] - 1 / 3) < 1e-9
+
+
+def test_lru_eviction_and_bypass(monkeypatch):
+    calls = _counting(monkeypatch)
+    cache = EmbeddingCache(maxsize=2)
+    for text in ("a", "b", "c", "a"):
+        embed_text(text, "m", cache=cache)
+    assert cache.stats()["evictions"] == 2 and len(calls) == 4
+    embed_text("c", "m", cache=None)
+    assert len(calls) == 5
+
+
+def test_disk_backing_survives_restart(tmp_path, monkeypatch):
+    calls = _counting(monkeypatch)
+    cache = EmbeddingCache(maxsize=4, persist_dir=str(tmp_path))
+    embed_text("glucose trend", "m", cache=cache)
+    cache.flush()
+    restarted = EmbeddingCache(maxsize=4, persist_dir=str(tmp_path))
+    assert embed_text("glucose trend", "m", cache=restarted) == [13.0, 0.5]
+    assert len(calls) == 1 and restarted.stats()["disk_hits"] == 1
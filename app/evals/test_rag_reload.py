@@ -0,0 +1,130 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.rag import loader, retriever, router as rag_router
+from app.rag.index import DocIndex
+from app.rag.store import EmbeddingStore
+
+
+def _setup(tmp_path, monkeypatch):
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    (docs_dir / "sleep.md").write_text("Title: Sleep\n- Aim for 7-9 hours of sleep.")
+    (docs_dir / "glucose.md").write_text("Title: Glucose\n- Fasting glucose under 100 is normal.")
+    calls = []
+
+    def embed(text, model, cache=None):
+        calls.append(text)
+        return [float(len(text)), 1.0]
+
+    monkeypatch.setattr(loader, "DOCS_DIR", docs_dir)
+    monkeypatch.setattr(loader, "embed_text", embed)
+    monkeypatch.setattr(loader, "INDEX", DocIndex(kind="exact"))
+    monkeypatch.setattr(loader, "DOCS", [])
+    monkeypatch.setattr(loader, "LOADED_KEY", None)
+    monkeypatch.setattr(loader, "_SHARED_ROOT", None)
+    monkeypatch.setattr(loader, "_SHARED_STAT", None)
+    store = EmbeddingStore(tmp_path / "store", "m")
+    return docs_dir, calls, store
+
+
+def test_reload_embeds_only_changed_files_and_swaps(tmp_path, monkeypatch):
+    docs_dir, calls, store = _setup(tmp_path, monkeypatch)
+    assert loader.reload_docs(store, root=str(tmp_path))
+    before = loader.INDEX
+    assert len(calls) == 2
+    assert not loader.reload_docs(store, root=str(tmp_path))
+
+    (docs_dir / "lipids.md").write_text("Title: Lipids\n- LDL under 100 is optimal.")
+    assert loader.reload_docs(store, root=str(tmp_path))
+    assert len(calls) == 3
+    assert loader.INDEX is not before and len(before) == 2 and len(loader.INDEX) == 3
+    assert retriever.retrieve("ldl", top_k=1, mode="lexical")[0].startswith("Lipids")
+
+
+def test_queries_during_reload_see_a_complete_index(tmp_path, monkeypatch):
+    docs_dir, calls, store = _setup(tmp_path, monkeypatch)
+    loader.load_docs(store)
+    for i in range(20):
+        (docs_dir / f"extra_{i}.md").write_text(f"Title: Extra {i}\n- sleep note {i}")
+    sizes = []
+    done = threading.Event()
+
+    def query():
+        while not done.is_set():
+            sizes.append(len(loader.INDEX))
+            retriever.retrieve("sleep", top_k=2, mode="lexical")
+
+    reader = threading.Thread(target=query)
+    reader.start()
+    loader.reload_docs(store, root=str(tmp_path))
+    done.set()
+    reader.join()
+    assert set(sizes) <= {2, 22}
+
+
+WORKER_RELOAD = """
+import sys
+from pathlib import Path
+from app.rag import loader
+from app.rag.store import EmbeddingStore
+loader.DOCS_DIR = Path(sys.argv[1])
+loader.embed_text = lambda text, model, cache=None: [float(len(text)), 1.0]
+assert loader.reload_docs(EmbeddingStore(sys.argv[2], "m"), root=sys.argv[3])
+"""
+
+
+def test_reload_in_another_worker_reaches_this_one(tmp_path, monkeypatch):
+    docs_dir, calls, store = _setup(tmp_path, monkeypatch)
+    loader.load_shared(store, root=str(tmp_path))
+    first_key = loader.LOADED_KEY
+    assert not loader.sync_shared()
+
+    # Another worker process handles the admin reload and publishes a new snapshot.
+    (docs_dir / "lipids.md").write_text("Title: Lipids\n- LDL under 100 is optimal.")
+    repo_root = Path(__file__).resolve().parents[2]
+    subprocess.run(
+        [sys.executable, "-c", WORKER_RELOAD, str(docs_dir), str(tmp_path / "store"), str(tmp_path)],
+        cwd=repo_root,
+        check=True,
+    )
+    assert loader.LOADED_KEY == first_key and len(loader.INDEX) == 2
+
+    # This worker notices on its next query, without embedding anything itself.
+    assert retriever.retrieve("ldl", top_k=1, mode="lexical")[0].startswith("Lipids")
+    assert loader.LOADED_KEY != first_key and len(loader.INDEX) == 3
+    assert len(calls) == 2
+
+    # Later queries only stat the pointer.
+    def no_attach(*args):
+        raise AssertionError("snapshot attached again")
+
+    monkeypatch.setattr(loader, "attach", no_attach)
+    assert retriever.retrieve("ldl", top_k=1, mode="lexical")[0].startswith("Lipids")
+
+
+def test_watcher_detects_changes(tmp_path, monkeypatch):
+    docs_dir, calls, store = _setup(tmp_path, monkeypatch)
+    monkeypatch.setattr(loader, "reload_docs", lambda: True)
+    watcher = loader.DocsWatcher(interval=0)
+    assert not watcher.check()
+    (docs_dir / "new.md").write_text("Title: New\n- text")
+    assert watcher.check()
+
+
+def test_reload_endpoint_requires_admin_token(monkeypatch):
+    from app.main import app
+
+    started = []
+    monkeypatch.setattr(loader, "reload_docs_async", lambda: started.append(True))
+    client = TestClient(app)
+    monkeypatch.setattr(rag_router, "RAG_ADMIN_TOKEN", "")
+    assert client.post("/rag/reload", headers={"X-Admin-Token": "anything"}).status_code == 403
+    monkeypatch.setattr(rag_router, "RAG_ADMIN_TOKEN", "secret")
+    assert client.post("/rag/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.post("/rag/reload", headers={"X-Admin-Token": "secret"}).status_code == 200
+    assert started == [True]
@@ -0,0 +1,44 @@
+import numpy as np
+
+from app.rag import loader
+from app.rag.index import DocIndex
+from app.rag.store import EmbeddingStore
+
+
+def _fake_embed(calls):
+    def embed(text, model, cache=None):
+        calls.append(text)
+        return [float(len(text)), 1.0, float(text.count("e"))]
+    return embed
+
+
+def test_second_worker_attaches_without_embedding(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(loader, "embed_text", _fake_embed(calls))
+    monkeypatch.setattr(loader, "INDEX", DocIndex(kind="exact"))
+    monkeypatch.setattr(loader, "_SHARED_ROOT", None)
+    loader.load_shared(EmbeddingStore(tmp_path / "store", "m"), root=str(tmp_path))
+    published = list(loader.INDEX.results)
+    assert calls and len([p for p in (tmp_path / "index").iterdir() if p.is_dir()]) == 1
+
+    # A fresh worker with an empty embedding store still needs no embedding calls.
+    calls.clear()
+    monkeypatch.setattr(loader, "INDEX", DocIndex(kind="exact"))
+    loader.load_shared(EmbeddingStore(tmp_path / "other-store", "m"), root=str(tmp_path))
+    worker = loader.INDEX
+    assert calls == []
+    assert isinstance(worker.matrix, np.memmap) and not worker.matrix.flags.writeable
+    assert worker.results == published
+    assert all(chunk["tags"] for chunk in loader.DOCS)
+
+
+def test_partial_corpus_is_not_published(tmp_path, monkeypatch):
+    def offline(text, model, cache=None):
+        raise ConnectionError("ollama down")
+
+    monkeypatch.setattr(loader, "embed_text", offline)
+    monkeypatch.setattr(loader, "INDEX", DocIndex(kind="exact"))
+    monkeypatch.setattr(loader, "_SHARED_ROOT", None)
+    loader.load_shared(EmbeddingStore(tmp_path / "store", "m"), root=str(tmp_path))
+    assert len(loader.INDEX) > 0
+    assert not (tmp_path / "index").exists() or not any((tmp_path / "index").iterdir())
@@ -0,0 +1,50 @@
+import numpy as np
+
+from app.rag import loader
+from app.rag.index import DocIndex
+from app.rag.store import EmbeddingStore
+
+
+def test_store_round_trip_and_model_isolation(tmp_path):
+    store = EmbeddingStore(tmp_path, "model-a")
+    store.put("hello", [1.0, 2.0, 3.0])
+    assert store.get("hello").tolist() == [1.0, 2.0, 3.0]
+    store.save()
+
+    reopened = EmbeddingStore(tmp_path, "model-a")
+    assert len(reopened) == 1 and "hello" in reopened
+    assert reopened.get("hello").dtype == np.float32
+    assert reopened.get("other") is None
+    assert len(EmbeddingStore(tmp_path, "model-b")) == 0
+
+
+def test_corrupt_manifest_starts_empty(tmp_path):
+    store = EmbeddingStore(tmp_path, "m")
+    store.put("a", [1.0])
+    store.save()
+    store.manifest_path.write_text("{not json")
+    assert len(EmbeddingStore(tmp_path, "m")) == 0
+
+
+def test_load_docs_only_embeds_new_text(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_embed(text, model, cache=None):
+        calls.append(text)
+        return [float(len(text)), 1.0]
+
+    monkeypatch.setattr(loader, "embed_text", fake_embed)
+    monkeypatch.setattr(loader, "INDEX", DocIndex())
+    loader.load_docs(EmbeddingStore(tmp_path, "m"))
+    first = len(calls)
+    assert first == len(loader.DOCS) > 0
+
+    loader.load_docs(EmbeddingStore(tmp_path, "m"))
+    assert len(calls) == first
+
+    def offline(text, model, cache=None):
+        raise ConnectionError("ollama down")
+
+    monkeypatch.setattr(loader, "embed_text", offline)
+    loader.load_docs(EmbeddingStore(tmp_path, "m"))
+    assert len(loader.DOCS) == first and len(loader.INDEX) == first
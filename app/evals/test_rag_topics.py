@@ -0,0 +1,44 @@
+from app.intent.classifier import classify_intent
+from app.rag import loader, retriever
+from app.rag.index import DocIndex
+from app.rag.topics import retrieval_query, retrieval_topics
+from app.rules import evaluate_health
+
+FACTS = evaluate_health({"fasting_glucose": 118, "ldl": 145, "sleep_hours": 6})
+
+
+def test_topics_from_question_intent_and_facts():
+    question = "How did I sleep?"
+    assert retrieval_topics(question, classify_intent(question, {}), FACTS) == {"sleep"}
+    assert retrieval_topics("Is my cholesterol ok?", None, FACTS) == {"lipids"}
+    # Nothing topical in the question: fall back to the signals in the facts.
+    assert retrieval_topics("Anything I should know?", None, FACTS) == {"glucose", "lipids", "sleep"}
+    assert retrieval_topics("Hello", None, {"signals": []}) is None
+
+
+def test_retrieval_query_is_compact():
+    query = retrieval_query("Is my cholesterol ok?", FACTS, frozenset({"lipids"}))
+    assert query == "Is my cholesterol ok? LDL borderline high"
+    assert "explanation" not in query and "145" not in query and "Glucose" not in query
+    assert len(query) < len(str(FACTS)) / 10
+
+
+def test_retrieve_prefilters_by_topic(monkeypatch):
+    docs = [
+        {"title": "Sleep", "parent": "sleep", "tags": frozenset({"sleep"}), "text": "sleep hours", "embedding": [1.0, 0.0]},
+        {"title": "Lipids", "parent": "lipids", "tags": frozenset({"lipids"}), "text": "ldl levels", "embedding": [0.9, 0.1]},
+    ]
+    index = DocIndex(kind="exact")
+    index.build(docs)
+    monkeypatch.setattr(loader, "INDEX", index)
+    monkeypatch.setattr(retriever, "embed_text", lambda text: [1.0, 0.0])
+    query = "tell me more about what these numbers mean overall"
+    assert retriever.retrieve(query, top_k=1, mode="dense") == ["Sleep: sleep hours"]
+    assert retriever.retrieve(query, top_k=1, mode="dense", topics=frozenset({"lipids"})) == ["Lipids: ldl levels"]
+    # Unknown topics do not filter everything out.
+    assert retriever.retrieve(query, top_k=1, mode="dense", topics=frozenset({"vision"})) == ["Sleep: sleep hours"]
+
+
+def test_front_matter_tags(tmp_path):
+    tags, content = loader._front_matter_tags("Title: Iron\nTags: Nutrition, Blood Health\n- Ferritin")
+    assert tags == ["nutrition", "blood_health"] and content == "Title: Iron\n- Ferritin"
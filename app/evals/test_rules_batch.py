@@ -0,0 +1,93 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from app.rules import TREND_RULES, evaluate_health, evaluate_health_batch
+
+# Payloads used across the existing evals
+EVAL_PAYLOADS = [
+    {"fasting_glucose": 118},
+    {"fasting_glucose": 90},
+    {"fasting_glucose": 118, "history": {"fasting_glucose": [132, 125]}},
+    {"fasting_glucose": 118, "history": {"fasting_glucose": [150, 145, 160]}},
+    {"ldl": 145, "history": {"ldl": [170, 160, 150]}},
+    {"triglycerides": 180, "history": {"triglycerides": [200, 190]}},
+    {"bp_systolic": 118, "bp_diastolic": 76},
+    {"bp_systolic": 150, "bp_diastolic": 95},
+    {"ldl": 170},
+    {"hdl": 35},
+    {"sleep_hours": 8},
+    {"sleep_hours": 4.5},
+    {"activity_minutes": 10},
+    {"vitamin_d": 15},
+    {"bmi": 32},
+    {"cycle_length_days": 40, "periods_missed": 2},
+    {"stress_level": 9},
+    {"sleep_hours": 6},
+    {"bp_systolic": 130, "bp_diastolic": 85},
+    {},
+]
+
+NUMERIC_KEYS = [
+    "fasting_glucose", "bp_systolic", "bp_diastolic", "total_cholesterol", "ldl", "hdl",
+    "triglycerides", "sleep_hours", "activity_minutes", "bmi", "vitamin_d", "vitamin_b12",
+    "ferritin", "cycle_length_days", "periods_missed", "stress_level", "mood_variability",
+]
+
+# Values on, just inside and between every threshold the rules use
+BOUNDARY_VALUES = [
+    0, 2, 3.5, 4, 5, 6.9, 7, 7.5, 9, 9.5, 18.4, 18.5, 20, 21, 24.9, 25, 29.9, 30, 35, 35.5,
+    39.9, 40, 59.9, 60, 60.5, 79.5, 80, 89, 89.5, 90, 99.9, 100, 119.5, 120, 125, 125.5, 126,
+    129, 129.5, 130, 139, 139.5, 140, 150, 159.5, 160, 180, 180.5, 189, 190, 199, 199.5, 200,
+    239, 239.5, 240, 299, 300, 400, 400.5, 499, 499.5, 500, float("nan"),
+]
+
+
+def _random_payloads(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        row = {k: rng.choice(BOUNDARY_VALUES) for k in rng.sample(NUMERIC_KEYS, rng.randint(0, len(NUMERIC_KEYS)))}
+        if rng.random() < 0.3:
+            row["cycle_irregular"] = rng.choice([True, False, None])
+        if rng.random() < 0.4:
+            row["history"] = {k: [rng.choice(BOUNDARY_VALUES[:-1]) for _ in range(rng.randint(0, 5))] for k in TREND_RULES}
+        rows.append(row)
+    return rows
+
+
+def test_batch_matches_scalar_on_eval_payloads():
+    assert evaluate_health_batch(EVAL_PAYLOADS) == [evaluate_health(p) for p in EVAL_PAYLOADS]
+
+
+def test_batch_matches_scalar_on_threshold_sweep():
+    rows = [{key: value} for key, value in itertools.product(NUMERIC_KEYS, BOUNDARY_VALUES)]
+    rows += [{"bp_systolic": s, "bp_diastolic": d} for s, d in itertools.product(BOUNDARY_VALUES, repeat=2)]
+    rows += _random_payloads(2000)
+    batch = evaluate_health_batch(rows)
+    for row, out in zip(rows, batch):
+        # repr comparison keeps NaN values comparable
+        assert repr(out) == repr(evaluate_health(row)), row
+
+
+def test_batch_accepts_numpy_columns():
+    out = evaluate_health_batch(
+        {
+            "fasting_glucose": np.array([90.0, np.nan, 130.0]),
+            "ldl": [None, 150, 200],
+            "history": [{"fasting_glucose": [100, 95]}, None, {}],
+        }
+    )
+    expected = [
+        evaluate_health({"fasting_glucose": 90.0, "history": {"fasting_glucose": [100, 95]}}),
+        evaluate_health({"ldl": 150}),
+        evaluate_health({"fasting_glucose": 130.0, "ldl": 200}),
+    ]
+    assert out == expected
+
+
+def test_batch_surfaces_scalar_errors_for_non_numeric_inputs():
+    with pytest.raises(TypeError):
+        evaluate_health_batch([{"fasting_glucose": 90}, {"fasting_glucose": "high"}])
@@ -0,0 +1,58 @@
+import io
+import json
+
+from app.rules import evaluate_health
+from app.rules.cohort import main, read_csv, score_stream
+
+STATES = [
+    {"user_id": "a", "fasting_glucose": 118, "ldl": 145, "history": {"fasting_glucose": [132, 125]}},
+    {"user_id": "b", "sleep_hours": 6, "activity_minutes": 20},
+    {"user_id": "c", "bp_systolic": 130, "bp_diastolic": 85, "cycle_irregular": True},
+    {"user_id": "d"},
+]
+
+
+def _plain(facts):
+    return json.loads(json.dumps(facts))
+
+
+def test_score_stream_preserves_order_and_matches_engine():
+    out = io.StringIO()
+    stats = score_stream(iter(STATES), out, workers=0, chunk_size=3, id_field="user_id")
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [line["row"] for line in lines] == [0, 1, 2, 3]
+    assert [line["user_id"] for line in lines] == ["a", "b", "c", "d"]
+    for line, raw in zip(lines, STATES):
+        assert line["facts"] == _plain(evaluate_health(raw))
+    assert sum(stats.rows.values()) == len(STATES)
+
+
+def test_bad_rows_are_reported_without_dropping_the_chunk():
+    out = io.StringIO()
+    score_stream(iter([{"fasting_glucose": "high"}, {"fasting_glucose": 90}]), out, workers=0)
+    first, second = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert "error" in first and "facts" not in first
+    assert second["facts"]["signals"][0]["status"] == "normal"
+
+
+def test_csv_values_are_typed():
+    text = 'user_id,fasting_glucose,sleep_hours,cycle_irregular,history\nu1,118,6.5,true,"{""fasting_glucose"": [132]}"\nu2,,7,false,\n'
+    rows = list(read_csv(io.StringIO(text)))
+    assert rows[0] == {
+        "user_id": "u1",
+        "fasting_glucose": 118,
+        "sleep_hours": 6.5,
+        "cycle_irregular": True,
+        "history": {"fasting_glucose": [132]},
+    }
+    assert rows[1] == {"user_id": "u2", "sleep_hours": 7, "cycle_irregular": False}
+
+
+def test_cli_with_process_pool(tmp_path):
+    src = tmp_path / "states.jsonl"
+    src.write_text("\n".join(json.dumps(s) for s in STATES * 5) + "\n")
+    dst = tmp_path / "facts.jsonl"
+    assert main([str(src), "--out", str(dst), "--workers", "2", "--chunk-size", "3", "--max-pending", "2"]) == 0
+    lines = [json.loads(line) for line in dst.read_text().splitlines()]
+    assert [line["row"] for line in lines] == list(range(len(STATES) * 5))
+    assert lines[4]["facts"] == _plain(evaluate_health(STATES[0]))
@@ -0,0 +1,53 @@
+from app.rules import evaluate_health, evaluate_health_delta
+
+BASE = {
+    "fasting_glucose": 118,
+    "ldl": 145,
+    "sleep_hours": 6,
+    "activity_minutes": 20,
+    "bp_systolic": 130,
+    "bp_diastolic": 85,
+    "history": {"fasting_glucose": [132, 125]},
+}
+
+
+def _delta(new_raw, old_raw=BASE):
+    return evaluate_health_delta(old_raw, evaluate_health(old_raw), new_raw)
+
+
+def test_unchanged_payload_reuses_everything():
+    facts, changes = _delta(dict(BASE))
+    assert facts == evaluate_health(BASE)
+    assert changes == []
+
+
+def test_only_changed_signals_are_reported_and_effects_merge():
+    new = {**BASE, "sleep_hours": 8, "activity_minutes": 45}
+    facts, changes = _delta(new)
+    assert facts == evaluate_health(new)
+    assert {c["signal"] for c in changes} <= {"sleep_hours", "activity_minutes"}
+    assert all(c["change"] == "updated" for c in changes)
+
+
+def test_band_change_drops_stale_recommendations():
+    new = {**BASE, "fasting_glucose": 90}
+    facts, changes = _delta(new)
+    assert facts == evaluate_health(new)
+    assert "insulin_resistance" not in facts["risks"]
+    (change,) = changes
+    assert change["previous"]["status"] == "prediabetes_range" and change["current"]["status"] == "normal"
+
+
+def test_added_and_removed_signals():
+    new = {k: v for k, v in BASE.items() if k != "ldl"}
+    new["cycle_irregular"] = True
+    facts, changes = _delta(new)
+    assert facts == evaluate_health(new)
+    assert {(c["signal"], c["change"]) for c in changes} == {("ldl", "removed"), ("cycle_irregular", "added")}
+
+
+def test_history_change_reruns_trend():
+    new = {**BASE, "history": {"fasting_glucose": [100, 105]}}
+    facts, changes = _delta(new)
+    assert facts == evaluate_health(new)
+    assert [c["signal"] for c in changes] == ["fasting_glucose"]
@@ -0,0 +1,68 @@
+import math
+
+from app.rules import evaluate_health
+from app.rules.registry import COMPILED, NO_BAND
+from app.rules.table import RULES
+
+
+def _first_match(rule, values):
+    return next((i for i, band in enumerate(rule.bands) if band.matches(values)), NO_BAND)
+
+
+def test_compiled_lookup_matches_first_matching_band():
+    probes = [-5, 0, 1.5, 4, 5, 7, 18.5, 21, 35, 35.5, 40, 59.9, 60, 99.9, 100, 125, 125.5, 129.5,
+              130, 159.5, 189.5, 199.5, 200, 239.5, 300, 400, 400.5, 499.5, 500, math.nan]
+    for compiled, rule in zip(COMPILED, RULES):
+        if rule.flag_value is not None:
+            continue
+        if len(compiled.keys) == 1:
+            for v in probes:
+                assert compiled.lookup([v]) == _first_match(rule, {rule.id: v}), (rule.id, v)
+        else:
+            for a in probes:
+                for b in probes:
+                    values = dict(zip(compiled.keys, (a, b)))
+                    assert compiled.lookup([a, b]) == _first_match(rule, values), (rule.id, a, b)
+
+
+def test_output_order_follows_table_not_input():
+    out = evaluate_health({"mood_variability": 2, "ldl": 120, "fasting_glucose": 90, "cycle_irregular": True})
+    assert [s["name"] for s in out["signals"]] == ["Fasting Glucose", "LDL", "Cycle Regularity", "Mood Variability"]
+
+
+def test_gap_between_bands_falls_through_to_else():
+    # 129 < LDL < 130 matches none of the closed bands, as in the original if/elif chain
+    out = evaluate_health({"ldl": 129.5})
+    assert out["signals"][0]["status"] == "very_high"
+
+
+def test_cached_explanations_are_not_shared():
+    first = evaluate_health({"fasting_glucose": 90})
+    first["signals"][0]["explanation"]["rule"] = "tampered"
+    second = evaluate_health({"fasting_glucose": 90})
+    assert second["signals"][0]["explanation"]["rule"].startswith("Fasting glucose is normal")
+
+
+def test_lazy_explanations_resolve_to_the_eager_facts():
+    import json
+
+    from app.intent.classifier import classify_intent
+    from app.prompt.adapter import build_prompt
+    from app.rules.cache import FactsCache, cached_evaluate_health
+    from app.rules.explain import resolve_explanations
+
+    raw = {"fasting_glucose": 118, "ldl": 145, "history": {"ldl": [170, 160]}}
+    lazy = evaluate_health(raw, lazy_explanations=True)
+    assert all("explanation" not in s and isinstance(s["explanation_id"], int) for s in lazy["signals"])
+    json.dumps(lazy)
+    intent = classify_intent("How are my labs?", raw)
+    prompts = build_prompt("How are my labs?", lazy, intent, [], [], [], "")
+    assert prompts == build_prompt("How are my labs?", evaluate_health(raw), intent, [], [], [], "")
+
+    eager = evaluate_health(raw)
+    resolved = resolve_explanations(evaluate_health(raw, lazy_explanations=True))
+    assert resolved == eager
+    assert [list(s) for s in resolved["signals"]] == [list(s) for s in eager["signals"]]
+    cache = FactsCache(maxsize=8, ttl=60)
+    assert cached_evaluate_health(raw, cache, lazy_explanations=True) == lazy
+    assert cached_evaluate_health(raw, cache) == eager
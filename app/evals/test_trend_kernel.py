@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from app.rules import evaluate_health
+from app.rules.trends import VECTOR_MIN_POINTS, _compute_trend, _loop_trend, trend_kernel
+
+
+def _series(rng, n):
+    return [round(rng.uniform(80, 200), 1) for _ in range(n)]
+
+
+def test_kernel_matches_loop():
+    rng = random.Random(3)
+    for _ in range(500):
+        series = _series(rng, rng.randint(2, 2000))
+        if rng.random() < 0.3:
+            series = [int(v) for v in series]
+        assert trend_kernel(series, True) == _loop_trend(series, True)
+        assert trend_kernel(series, False) == _loop_trend(series, False)
+
+
+def test_compute_trend_is_path_independent():
+    rng = random.Random(11)
+    for n in (VECTOR_MIN_POINTS - 1, VECTOR_MIN_POINTS, 500):
+        series = _series(rng, n)
+        assert _compute_trend(series[:-1], series[-1], True) == _loop_trend(series, True)
+
+
+def test_window_and_decay():
+    series = [200] * 50 + [100, 101, 102, 103]
+    assert trend_kernel(series, True)["direction"] == "improving"
+    # The last four points alone are rising
+    assert trend_kernel(series, True, window=4)["direction"] == "worsening"
+    # With a steep decay the recent +1 steps outweigh the old drop
+    assert trend_kernel(series, True, decay=0.1)["direction"] == "worsening"
+    with pytest.raises(ValueError):
+        trend_kernel(series, True, window=1)
+    with pytest.raises(ValueError):
+        trend_kernel(series, True, decay=0)
+    assert _compute_trend(series[:-1], series[-1], True, window=4) == trend_kernel(series, True, window=4)
+
+
+def test_long_history_uses_kernel():
+    history = [160 - i * 0.005 for i in range(10000)]
+    out = evaluate_health({"fasting_glucose": 110, "history": {"fasting_glucose": history}})
+    trend = out["signals"][0]["trend"]
+    assert trend["direction"] == "improving"
+    assert trend == trend_kernel(history + [110], True)
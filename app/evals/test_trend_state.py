@@ -0,0 +1,128 @@
+import json
+import random
+
+from fastapi.testclient import TestClient
+
+from app.auth.database import SessionLocal, engine
+from app.auth.security import decode_token
+from app.rules import TrendState, evaluate_health
+from app.main import app
+from app.wearables.adapters import ADAPTERS
+from app.wearables.trend_states import Base, UserTrendState, load_trend_history, record_readings
+
+Base.metadata.create_all(bind=engine)
+
+
+def test_trend_state_matches_history_list():
+    history = [150, 145.5, 160, 152, 149.5]
+    state = TrendState.from_dict(json.loads(json.dumps(TrendState.from_values(history).to_dict())))
+    for key, value in (("fasting_glucose", 118), ("hdl", 41.5)):
+        from_list = evaluate_health({key: value, "history": {key: history}})
+        from_state = evaluate_health({key: value, "history": {key: state}})
+        assert from_state == from_list
+        assert "trend" in from_state["signals"][0] and "sparkline" in from_state["signals"][0]
+
+
+def _trend(out):
+    trend = out["signals"][0]["trend"]
+    return trend["direction"], trend["confidence"]
+
+
+def test_trend_state_direction_and_confidence_match_random_lists():
+    rng = random.Random(7)
+    for _ in range(300):
+        history = [rng.choice((rng.randint(70, 160), round(rng.uniform(70, 160), 1))) for _ in range(rng.randint(1, 120))]
+        state = TrendState.from_values(history)
+        for key, value in (("fasting_glucose", rng.randint(70, 160)), ("hdl", round(rng.uniform(30, 70), 1))):
+            from_list = evaluate_health({key: value, "history": {key: history}})
+            assert _trend(evaluate_health({key: value, "history": {key: state}})) == _trend(from_list)
+
+
+def test_long_history_keeps_lifetime_totals_and_caps_readings():
+    rng = random.Random(5)
+    history = [round(rng.uniform(80, 160), 1) for _ in range(400)]
+    state = TrendState.from_values(history, max_points=365)
+    assert state.count == 400 and state.values == history[-365:]
+    stored = TrendState.from_dict(json.loads(json.dumps(state.to_dict())), max_points=365)
+    for key, value in (("fasting_glucose", 118), ("hdl", 41.5)):
+        out = evaluate_health({key: value, "history": {key: stored}})
+        assert _trend(out) == _trend(evaluate_health({key: value, "history": {key: history}}))
+        assert out["signals"][0]["sparkline"]["values"] == history[-365:] + [value]
+    assert TrendState.from_dict(state.to_dict(), max_points=30).values == history[-30:]
+
+
+def test_rows_without_totals_are_rebuilt_and_last_reading_can_be_dropped():
+    state = TrendState.from_dict({"count": 3, "values": [132, 125, 121]})
+    assert state.to_dict() == TrendState.from_values([132, 125, 121]).to_dict()
+    assert state.drop_last().to_dict() == TrendState.from_values([132, 125]).to_dict()
+    assert TrendState.from_values([121]).drop_last().count == 0
+
+
+def test_record_readings_updates_stored_state():
+    db = SessionLocal()
+    try:
+        db.query(UserTrendState).filter(UserTrendState.user_id == 9001).delete()
+        db.commit()
+        for reading in (132, 125, 121):
+            record_readings(db, 9001, {"fasting_glucose": reading, "steps": 8000})
+        history = load_trend_history(db, 9001)
+        assert list(history) == ["fasting_glucose"]
+        assert history["fasting_glucose"].values == [132, 125, 121]
+        out = evaluate_health({"fasting_glucose": 118, "history": history})
+        assert out == evaluate_health({"fasting_glucose": 118, "history": {"fasting_glucose": [132, 125, 121]}})
+    finally:
+        db.query(UserTrendState).filter(UserTrendState.user_id == 9001).delete()
+        db.commit()
+        db.close()
+
+
+def test_summary_uses_stored_history_with_consent():
+    client = TestClient(app)
+    client.post("/auth/signup", json={"email": "trend-summary@example.com", "password": "StrongPass123"})
+    token = client.post("/auth/login", json={"email": "trend-summary@example.com", "password": "StrongPass123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    db = SessionLocal()
+    db.query(UserTrendState).filter(UserTrendState.user_id == decode_token(token, "access")).delete()
+    db.commit()
+    db.close()
+    client.post("/consent/grant-bulk", headers=headers, json={"scopes": ["wearables_sync", "glucose_data"]})
+    for reading in (132, 125, 121):
+        payload = {"provider": "healthkit", "health_state": {"fasting_glucose": reading}}
+        assert client.post("/wearables/ingest", headers=headers, json=payload).status_code == 200
+
+    body = {"labs": {"fasting_glucose": 118}}
+    summary = client.post("/twin/summary", headers=headers, json=body).json()["summary"]
+    expected = evaluate_health({"fasting_glucose": 118, "history": {"fasting_glucose": [132, 125, 121]}})
+    assert summary["signals"] == expected["signals"]
+    assert "trend" in summary["signals"][0]
+
+    # The chat payload is usually the reading just ingested; it is not counted twice.
+    summary = client.post("/twin/summary", headers=headers, json={"labs": {"fasting_glucose": 121}}).json()["summary"]
+    expected = evaluate_health({"fasting_glucose": 121, "history": {"fasting_glucose": [132, 125]}})
+    assert summary["signals"] == expected["signals"]
+
+    client.post("/consent/revoke", headers=headers, json={"scope": "glucose_data"})
+    summary = client.post("/twin/summary", headers=headers, json=body).json()["summary"]
+    assert "trend" not in summary["signals"][0]
+
+
+def test_sync_records_readings(monkeypatch):
+    client = TestClient(app)
+    client.post("/auth/signup", json={"email": "trend-sync@example.com", "password": "StrongPass123"})
+    token = client.post("/auth/login", json={"email": "trend-sync@example.com", "password": "StrongPass123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    user_id = decode_token(token, "access")
+    client.post("/consent/grant-bulk", headers=headers, json={"scopes": ["wearables_sync", "body_data"]})
+    monkeypatch.setattr(ADAPTERS["fitbit"], "fetch_health_state", lambda *args: {"bmi": 27.5, "weight": 80})
+    db = SessionLocal()
+    try:
+        db.query(UserTrendState).filter(UserTrendState.user_id == user_id).delete()
+        db.commit()
+        r = client.post("/wearables/sync", headers=headers, json={"provider": "fitbit", "signals": ["bmi", "weight"]})
+        assert r.status_code == 200
+        history = load_trend_history(db, user_id)
+        assert list(history) == ["bmi"] and history["bmi"].values == [27.5]
+    finally:
+        db.query(UserTrendState).filter(UserTrendState.user_id == user_id).delete()
+        db.commit()
+        db.close()
@@ -1,10 +1,7 @@
 from fastapi.testclient import TestClient
-import app.chat as chat_module
 from app.main import app
 import httpx
 
-chat_module.ollama.chat = lambda **kwargs: {"message": {"content": "stubbed reply"}}
-
 client = TestClient(app)
 
 
@@ -0,0 +1,40 @@
+from app.llm.client import aclose, chat, chat_stream, chat_sync, get_client
+from app.llm.cache import (
+    RESPONSE_CACHE,
+    ResponseCache,
+    cached_chat,
+    generation_fingerprint,
+    prompt_key,
+)
+from app.llm.scheduler import (
+    SCHEDULER,
+    LLMScheduler,
+    Priority,
+    QueueFull,
+    scheduled_chat,
+    scheduled_chat_sync,
+    scheduled_stream,
+)
+from app.llm.singleflight import SINGLE_FLIGHT, SingleFlight
+
+__all__ = [
+    "aclose",
+    "chat",
+    "chat_stream",
+    "chat_sync",
+    "get_client",
+    "RESPONSE_CACHE",
+    "ResponseCache",
+    "cached_chat",
+    "generation_fingerprint",
+    "prompt_key",
+    "SCHEDULER",
+    "LLMScheduler",
+    "Priority",
+    "QueueFull",
+    "scheduled_chat",
+    "scheduled_chat_sync",
+    "scheduled_stream",
+    "SINGLE_FLIGHT",
+    "SingleFlight",
+]
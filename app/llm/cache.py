@@ -0,0 +1,232 @@
+from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import LLM_CACHE_DB, LLM_CACHE_SIZE, LLM_CACHE_TTL_SECONDS, LLM_CACHE_VERSION
+from app.llm.scheduler import Priority, scheduled_chat
+from app.llm.singleflight import SINGLE_FLIGHT
+
+
+def prompt_key(model: str, messages: List[Dict[str, str]], options: Optional[Dict[str, Any]] = None) -> str:
+    """Hash of the exact generation request: model, prompt messages and options."""
+    canonical = json.dumps(
+        {"model": model, "messages": messages, "options": options or {}},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def generation_fingerprint(model: str, disclaimer: str, version: str = LLM_CACHE_VERSION) -> str:
+    """Identity of everything outside the prompt hash that cached replies depend on."""
+    return hashlib.sha256(f"{model}\n{disclaimer}\n{version}".encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of generated replies keyed by prompt_key. Generation is pinned to
+    temperature 0, so an identical prompt yields an identical reply. With `path` set,
+    replies are also kept in a SQLite file so they survive restarts and are shared by the
+    workers on one host; the memory tier is checked first. Entries are tagged with a
+    generation fingerprint (see check_generation), and invalidate() drops everything.
+    Raw model text is stored; callers still run their post-checks on every hit.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = LLM_CACHE_SIZE,
+        ttl: float = LLM_CACHE_TTL_SECONDS,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.generation = ""
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as db:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses"
+                    " (key TEXT PRIMARY KEY, generation TEXT NOT NULL, reply TEXT NOT NULL, created REAL NOT NULL)"
+                )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per call: cheap for a local file, and safe across threads and workers.
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _remember(self, key: str, created: float, reply: str):
+        with self._lock:
+            self._entries[key] = (created, reply)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, key: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        row = None
+        if self.path:
+            try:
+                with self._connect() as db:
+                    row = db.execute(
+                        "SELECT created, reply FROM responses WHERE key = ? AND generation = ? AND created >= ?",
+                        (key, self.generation, now - self.ttl),
+                    ).fetchone()
+            except sqlite3.Error:
+                row = None
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        self._remember(key, row[0], row[1])
+        return row[1]
+
+    def put(self, key: str, reply: str):
+        created = self._clock()
+        self._remember(key, created, reply)
+        if self.path:
+            try:
+                with self._connect() as db:
+                    db.execute(
+                        "INSERT OR REPLACE INTO responses (key, generation, reply, created) VALUES (?, ?, ?, ?)",
+                        (key, self.generation, reply, created),
+                    )
+            except sqlite3.Error:
+                # The memory tier still has it; a locked or read-only file must not fail the chat.
+                pass
+
+    def invalidate(self):
+        """Drop every cached reply, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            with self._connect() as db:
+                db.execute("DELETE FROM responses")
+
+    def check_generation(self, fingerprint: str) -> bool:
+        """
+        Invalidation hook: call with generation_fingerprint(model, disclaimer) at startup and
+        whenever either changes. Replies cached under another fingerprint are dropped;
+        returns True if anything was invalidated.
+        """
+        with self._lock:
+            changed = bool(self.generation) and fingerprint != self.generation
+            self.generation = fingerprint
+            if changed:
+                self._entries.clear()
+        if self.path:
+            with self._connect() as db:
+                stale = db.execute("DELETE FROM responses WHERE generation != ?", (fingerprint,)).rowcount
+            changed = changed or stale > 0
+        return changed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+RESPONSE_CACHE = ResponseCache(path=LLM_CACHE_DB or None)
+_DEFAULT_CACHE = object()
+
+
+def _resolve(cache) -> Optional[ResponseCache]:
+    cache = RESPONSE_CACHE if cache is _DEFAULT_CACHE else cache
+    return cache if cache is not None and cache.maxsize > 0 else None
+
+
+async def lookup(key: str, cache=_DEFAULT_CACHE) -> Optional[str]:
+    cache = _resolve(cache)
+    if cache is None:
+        return None
+    # The SQLite tier does file I/O, so it runs in the threadpool like other DB work.
+    return await run_in_threadpool(cache.get, key) if cache.path else cache.get(key)
+
+
+async def store(key: str, reply: str, cache=_DEFAULT_CACHE):
+    """Cache a complete reply; empty replies are not cached."""
+    cache = _resolve(cache)
+    if cache is None or not reply.strip():
+        return
+    if cache.path:
+        await run_in_threadpool(cache.put, key, reply)
+    else:
+        cache.put(key, reply)
+
+
+async def cached_chat(
+    messages: List[Dict[str, str]],
+    model: str,
+    options: Optional[Dict[str, Any]] = None,
+    cache=_DEFAULT_CACHE,
+    user: Hashable = None,
+    priority: int = Priority.INTERACTIVE,
+) -> str:
+    """
+    client.chat, answered from RESPONSE_CACHE when the exact same request was generated
+    before; pass cache=None to bypass it. Identical requests that miss while one is already
+    generating wait for that generation instead of queueing another on the model. New
+    generations wait for a scheduler slot as `user` at `priority` (may raise QueueFull).
+    """
+    key = prompt_key(model, messages, options)
+    reply = await lookup(key, cache)
+    if reply is not None:
+        return reply
+
+    async def generate() -> str:
+        text = await scheduled_chat(messages, model, options, user, priority)
+        await store(key, text, cache)
+        return text
+
+    return await SINGLE_FLIGHT.do(key, generate)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+import asyncio
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+import ollama
+
+from app.config import LLM_MAX_CONNECTIONS, LLM_TIMEOUT_SECONDS, OLLAMA_HOST
+
+# One pooled client per event loop: httpx connections belong to the loop that opened them.
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ollama.AsyncClient]" = weakref.WeakKeyDictionary()
+# Blocking callers with no event loop share one thread-safe client.
+_SYNC_CLIENT: Optional[ollama.Client] = None
+_SYNC_LOCK = threading.Lock()
+
+
+def get_client() -> ollama.AsyncClient:
+    """The running loop's ollama.AsyncClient, reusing keep-alive connections across requests."""
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None:
+        client = ollama.AsyncClient(
+            host=OLLAMA_HOST,
+            timeout=LLM_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS),
+        )
+        _CLIENTS[loop] = client
+    return client
+
+
+def get_sync_client() -> ollama.Client:
+    """The shared blocking ollama.Client, for threads that have no event loop to await on."""
+    global _SYNC_CLIENT
+    with _SYNC_LOCK:
+        if _SYNC_CLIENT is None:
+            _SYNC_CLIENT = ollama.Client(
+                host=OLLAMA_HOST,
+                timeout=LLM_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS),
+            )
+        return _SYNC_CLIENT
+
+
+async def aclose():
+    """Close the running loop's client, e.g. on app shutdown."""
+    client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        # ollama.AsyncClient has no close of its own; close the httpx client underneath.
+        await client._client.aclose()
+
+
+async def chat(messages: List[Dict[str, str]], model: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Generate a full reply; returns the message content ("" if the model sent none)."""
+    resp = await get_client().chat(model=model, messages=messages, options=options)
+    return (resp.get("message", {}) or {}).get("content", "")
+
+
+def chat_sync(messages: List[Dict[str, str]], model: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """chat() for blocking code; safe to call from any number of threads."""
+    resp = get_sync_client().chat(model=model, messages=messages, options=options)
+    return (resp.get("message", {}) or {}).get("content", "")
+
+
+async def chat_stream(
+    messages: List[Dict[str, str]], model: str, options: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[str]:
+    """Yield the reply's content pieces as the model generates them."""
+    stream = await get_client().chat(model=model, messages=messages, options=options, stream=True)
+    try:
+        async for chunk in stream:
+            piece = (chunk.get("message", {}) or {}).get("content", "")
+            if piece:
+                yield piece
+    finally:
+        await stream.aclose()
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Header
+
+from app.llm.cache import RESPONSE_CACHE
+from app.llm.scheduler import SCHEDULER
+from app.llm.singleflight import SINGLE_FLIGHT
+from app.rag.router import require_admin
+
+router = APIRouter(prefix="/llm", tags=["llm"])
+
+
+@router.get("/metrics")
+def llm_metrics(x_admin_token: str = Header(None)):
+    """Reply cache, request coalescing and scheduler queue counters for this worker."""
+    require_admin(x_admin_token)
+    return {"cache": RESPONSE_CACHE.stats(), "singleflight": SINGLE_FLIGHT.stats(), "scheduler": SCHEDULER.stats()}
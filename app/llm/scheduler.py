@@ -0,0 +1,216 @@
+from __future__ import annotations
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Hashable, List, Optional
+
+from app.config import LLM_CONCURRENCY, LLM_QUEUE_SIZE
+from app.llm import client
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # a user is waiting on the reply
+    BACKGROUND = 1  # summaries, evals, batch jobs
+
+
+class QueueFull(Exception):
+    """Raised instead of queueing when the scheduler's queue is at its bound."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"LLM queue is full; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class LLMScheduler:
+    """
+    Admission control for the local model: at most `concurrency` generations run at once
+    and at most `max_queue` wait; beyond that acquire() fails fast with QueueFull. Freed
+    slots go to the highest priority first and, within a priority, round-robin across
+    users so one user's burst cannot hold everyone else back. Runs on one event loop.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = LLM_CONCURRENCY,
+        max_queue: int = LLM_QUEUE_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self._clock = clock
+        self._active = 0
+        self._queued = 0
+        # priority -> user -> that user's waiters in arrival order
+        self._queues: Dict[int, "OrderedDict[Hashable, Deque[asyncio.Future]]"] = {p: OrderedDict() for p in Priority}
+        self._waits: Deque[float] = deque(maxlen=1024)
+        self._service: Optional[float] = None  # moving average of seconds a slot is held
+        self.admitted = 0
+        self.rejected = 0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None  # the loop it serves
+
+    def retry_after(self) -> int:
+        """Seconds until a queued request would likely start, for the Retry-After header."""
+        service = self._service or 1.0
+        return max(1, math.ceil((self._queued + 1) * service / max(1, self.concurrency)))
+
+    def check_admission(self):
+        """Fail fast if a new request would be rejected right now (it is not reserved)."""
+        if self._queued >= self.max_queue:
+            self.rejected += 1
+            raise QueueFull(self.retry_after())
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for priority in Priority:
+            users = self._queues[priority]
+            while users:
+                user, waiters = next(iter(users.items()))
+                waiter = waiters.popleft()
+                self._queued -= 1
+                if waiter.done():
+                    # Cancelled while queued, before its acquire() could remove it; skip it
+                    # without sending this user to the back of the line.
+                    if not waiters:
+                        del users[user]
+                    continue
+                del users[user]
+                if waiters:
+                    users[user] = waiters  # back of the line for this user's next request
+                return waiter
+        return None
+
+    def _remove(self, waiter: asyncio.Future, priority: int, user: Hashable):
+        waiters = self._queues[priority].get(user)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            self._queued -= 1
+            if not waiters:
+                del self._queues[priority][user]
+
+    def bind(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Attach the scheduler to `loop` (default: the running one). Its waiters are futures of
+        that loop and its counters are unlocked, so a second loop may only take over once the
+        first has stopped.
+        """
+        loop = loop or asyncio.get_running_loop()
+        if self.loop is not None and self.loop is not loop and self.loop.is_running():
+            raise RuntimeError("LLMScheduler is already serving another running event loop")
+        self.loop = loop
+
+    async def acquire(self, user: Hashable = None, priority: int = Priority.INTERACTIVE):
+        self.bind()
+        if self._active < self.concurrency and not self._queued:
+            self._active += 1
+            self.admitted += 1
+            self._waits.append(0.0)
+            return
+        if self._queued >= self.max_queue:
+            self.rejected += 1
+            raise QueueFull(self.retry_after())
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(user, deque()).append(waiter)
+        self._queued += 1
+        began = self._clock()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # the slot was handed over just as we gave up; pass it on
+            else:
+                self._remove(waiter, priority, user)
+            raise
+        self.admitted += 1
+        self._waits.append(self._clock() - began)
+
+    def release(self, held: Optional[float] = None):
+        if held is not None:
+            self._service = held if self._service is None else 0.8 * self._service + 0.2 * held
+        waiter = self._next_waiter()
+        if waiter is not None:
+            waiter.set_result(None)  # the slot moves straight to the next waiter
+        else:
+            self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self, user: Hashable = None, priority: int = Priority.INTERACTIVE):
+        await self.acquire(user, priority)
+        began = self._clock()
+        try:
+            yield
+        finally:
+            self.release(self._clock() - began)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "concurrency": self.concurrency,
+            "active": self._active,
+            "queue_depth": self._queued,
+            "queue_depth_by_priority": {p.name.lower(): sum(map(len, self._queues[p].values())) for p in Priority},
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_ms_p50": waits[len(waits) // 2] * 1000 if waits else 0.0,
+            "wait_ms_p99": waits[min(len(waits) - 1, int(0.99 * len(waits)))] * 1000 if waits else 0.0,
+            "service_s_avg": self._service or 0.0,
+        }
+
+
+SCHEDULER = LLMScheduler()
+
+
+async def scheduled_chat(
+    messages: List[Dict[str, str]],
+    model: str,
+    options: Optional[Dict[str, Any]] = None,
+    user: Hashable = None,
+    priority: int = Priority.INTERACTIVE,
+) -> str:
+    async with SCHEDULER.slot(user, priority):
+        return await client.chat(messages, model, options)
+
+
+async def scheduled_stream(
+    messages: List[Dict[str, str]],
+    model: str,
+    options: Optional[Dict[str, Any]] = None,
+    user: Hashable = None,
+    priority: int = Priority.INTERACTIVE,
+) -> AsyncIterator[str]:
+    """client.chat_stream holding a scheduler slot until the stream ends."""
+    async with SCHEDULER.slot(user, priority):
+        stream = client.chat_stream(messages, model, options)
+        try:
+            async for piece in stream:
+                yield piece
+        finally:
+            await stream.aclose()
+
+
+def scheduled_chat_sync(
+    messages: List[Dict[str, str]],
+    model: str,
+    options: Optional[Dict[str, Any]] = None,
+    user: Hashable = None,
+    priority: int = Priority.BACKGROUND,
+) -> str:
+    """
+    scheduled_chat for synchronous code (scripts, worker threads). When the server's loop is
+    running the generation is queued there, so the scheduler stays on one loop. Without one
+    (scripts, tests) there is no shared queue to join: the call goes straight to the model
+    on the blocking client. Not for use from a coroutine on the scheduler's own loop.
+    """
+    loop = SCHEDULER.loop
+    if loop is None or not loop.is_running():
+        return client.chat_sync(messages, model, options)
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        raise RuntimeError("scheduled_chat_sync would block the scheduler's event loop; await scheduled_chat")
+    future = asyncio.run_coroutine_threadsafe(scheduled_chat(messages, model, options, user, priority), loop)
+    return future.result()
@@ -0,0 +1,166 @@
+from __future__ import annotations
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+
+class _Broadcast:
+    """Pieces of one in-flight stream so far; every subscriber replays them from the start."""
+
+    def __init__(self):
+        self.pieces: List[str] = []
+        self.subscribers = 0  # callers still reading; at zero the generation is cancelled
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+
+    def _wake(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def push(self, piece: str):
+        self.pieces.append(piece)
+        self._wake()
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.finished, self.error = True, error
+        self._wake()
+
+    async def wait(self):
+        """Until the next piece arrives or the stream ends."""
+        await self._changed.wait()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller starts the work as its
+    own task and later callers await that same task instead of starting another. The task
+    is shielded, so a caller that disconnects does not cancel the work for the others.
+    Streams coalesce the same way: one task pumps the generation and every caller receives
+    all of its pieces. Unlike do(), a stream that every caller has abandoned is cancelled,
+    which closes the model stream and frees its scheduler slot. Keys are forgotten as soon
+    as the work finishes; results are not kept (see cache.py).
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def _forget(self, key: str, task: asyncio.Future):
+        with self._lock:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+                self._streams.pop(key, None)
+            if not task.cancelled() and task.exception() is not None:
+                # Reading the exception also marks it retrieved if every waiter went away.
+                self.failures += 1
+
+    def _leave(self, key: str, task: asyncio.Future, broadcast: _Broadcast):
+        with self._lock:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers or broadcast.finished:
+                return
+            if self._inflight.get(key) is task:
+                # Forget it now, so a request arriving before the cancellation lands starts afresh.
+                del self._inflight[key]
+                self._streams.pop(key, None)
+        task.cancel()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        with self._lock:
+            task = self._inflight.get(key)
+            broadcast = self._streams.get(key)
+            if task is None:
+                task = asyncio.ensure_future(fn())
+                self._inflight[key] = task
+                self.leaders += 1
+                task.add_done_callback(lambda done: self._forget(key, done))
+            else:
+                self.coalesced += 1
+                if broadcast is not None:
+                    broadcast.subscribers += 1  # keep the stream alive for this caller
+        if broadcast is None:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._leave(key, task, broadcast)
+
+    async def join(self, key: str) -> Optional[Any]:
+        """Result of the in-flight call for `key`, or None if nothing is running for it."""
+        with self._lock:
+            task = self._inflight.get(key)
+            if task is None:
+                return None
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _pump(fn: Callable[[], AsyncIterator[str]], broadcast: _Broadcast) -> str:
+        stream = fn()
+        try:
+            async for piece in stream:
+                broadcast.push(piece)
+        except BaseException as exc:
+            broadcast.finish(exc)
+            raise
+        finally:
+            await stream.aclose()
+        broadcast.finish()
+        return "".join(broadcast.pieces)
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        Pieces of the streaming generation for `key`, starting `fn()` only if no call for
+        it is in flight. A caller arriving mid-stream first gets the pieces already made.
+        If a non-streaming call is generating `key`, its whole reply arrives as one piece.
+        """
+        with self._lock:
+            task = self._inflight.get(key)
+            broadcast = self._streams.get(key)
+            if task is None:
+                broadcast = _Broadcast()
+                task = asyncio.ensure_future(self._pump(fn, broadcast))
+                self._inflight[key] = task
+                self._streams[key] = broadcast
+                self.leaders += 1
+                task.add_done_callback(lambda done: self._forget(key, done))
+            else:
+                self.coalesced += 1
+            if broadcast is not None:
+                broadcast.subscribers += 1
+        if broadcast is None:
+            yield await asyncio.shield(task)
+            return
+        try:
+            sent = 0
+            while True:
+                while sent < len(broadcast.pieces):
+                    sent += 1
+                    yield broadcast.pieces[sent - 1]
+                if broadcast.finished:
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+                await broadcast.wait()
+        finally:
+            # Closing early (safety check tripped, client went away) stops an unwatched generation.
+            self._leave(key, task, broadcast)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            calls = self.leaders + self.coalesced
+            return {
+                "in_flight": len(self._inflight),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "failures": self.failures,
+                "coalesce_rate": self.coalesced / calls if calls else 0.0,
+            }
+
+
+SINGLE_FLIGHT = SingleFlight()
@@ -3,7 +3,7 @@ import json
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 LOG_PATH = Path("logs/events.jsonl")
 
@@ -32,6 +32,7 @@ def make_event(
     safety: Dict[str, Any],
     latency_ms: float,
     store_raw_question: bool = False,
+    ttft_ms: Optional[float] = None,
 ) -> Dict[str, Any]:
     fields_present = {k: True for k in health_state.keys()}
     evt = {
@@ -45,6 +46,9 @@ def make_event(
         "safety": safety,
         "latency_ms": round(latency_ms, 2),
     }
+    if ttft_ms is not None:
+        # Streamed replies: time to the first generated token, alongside total latency.
+        evt["ttft_ms"] = round(ttft_ms, 2)
     if store_raw_question:
         evt["question"] = question
     return evt
@@ -2,8 +2,13 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.chat import router as chat_router
-from app.rag.loader import load_docs
+from app import llm
+from app.chat import CHAT_MODEL, router as chat_router
+from app.config import RAG_WATCH_INTERVAL
+from app.llm.router import router as llm_router
+from app.rag.loader import DocsWatcher, load_shared
+from app.rag.router import router as rag_router
+from app.safety import DISCLAIMER_TEXT
 from app.auth.router import router as auth_router
 from app.chat_store.router import router as chat_store_router
 from app.consent.router import router as consent_router
@@ -25,14 +30,27 @@ app.add_middleware(
 
 @app.on_event("startup")
 def startup():
+    # Sync callers (worker threads) queue on this loop from the first request on.
+    llm.scheduler.SCHEDULER.bind()
+    # Replies cached under another model or disclaimer are dropped before serving.
+    llm.RESPONSE_CACHE.check_generation(llm.generation_fingerprint(CHAT_MODEL, DISCLAIMER_TEXT))
     try:
-        load_docs()
+        load_shared()
     except Exception:
         # In restricted environments (e.g., no model available), skip doc loading
         pass
+    if RAG_WATCH_INTERVAL > 0:
+        DocsWatcher(RAG_WATCH_INTERVAL).start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await llm.aclose()
 
 app.include_router(chat_router)
 app.include_router(auth_router)
 app.include_router(chat_store_router)
 app.include_router(consent_router)
 app.include_router(wearables_router)
+app.include_router(rag_router)
+app.include_router(llm_router)
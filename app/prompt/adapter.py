@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Dict, Any, Tuple, List
 from app.intent.schema import IntentResult, Intent
+from app.rules.explain import explanation_of
 from app.safety import DISCLAIMER_TEXT
 
 
@@ -8,8 +9,9 @@ def _summary_snippets(facts: Dict[str, Any]) -> str:
     parts = []
     for sig in facts.get("signals", []):
         line = f"- {sig.get('name')}: {sig.get('value')} ({sig.get('status')}, {sig.get('severity')})"
-        if sig.get("explanation"):
-            line += f" | why: {sig['explanation'].get('why_it_matters', '')}"
+        explanation = explanation_of(sig)
+        if explanation:
+            line += f" | why: {explanation.get('why_it_matters', '')}"
         if sig.get("trend"):
             trend = sig["trend"]
             line += f" | trend: {trend.get('direction')} (conf {trend.get('confidence')})"
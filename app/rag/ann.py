@@ -0,0 +1,118 @@
+from __future__ import annotations
+import hashlib
+import math
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from app.config import RAG_IVF_NPROBE
+
+
+def _ranked(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first, ties broken by position."""
+    n = scores.size
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+    return idx[np.lexsort((idx, -scores[idx]))]
+
+
+class ExactSearch:
+    """Brute-force inner product over every row."""
+
+    kind = "exact"
+
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+
+    def search(self, query: np.ndarray, k: int) -> np.ndarray:
+        """Row indices of up to k best rows for a normalized query, best first."""
+        return _ranked(self.matrix @ query, min(k, self.matrix.shape[0]))
+
+
+class IVFSearch:
+    """
+    Inverted-file ANN index. Rows are clustered with spherical k-means into `nlist` lists;
+    a query scores the centroids, then only the rows in the `nprobe` closest lists.
+    Rows are stored grouped by list (`order`, with `offsets` marking list boundaries).
+    """
+
+    kind = "ivf"
+
+    def __init__(self, matrix: np.ndarray, centroids: np.ndarray, order: np.ndarray, offsets: np.ndarray, nprobe: int = RAG_IVF_NPROBE):
+        self.matrix = matrix
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    @classmethod
+    def train(cls, matrix: np.ndarray, nlist: Optional[int] = None, nprobe: int = RAG_IVF_NPROBE, iters: int = 10, seed: int = 0) -> "IVFSearch":
+        n = matrix.shape[0]
+        nlist = max(1, min(n, nlist or int(math.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        centroids = matrix[rng.choice(n, size=nlist, replace=False)].copy()
+        assign = np.zeros(n, dtype=np.int64)
+        for _ in range(iters):
+            assign = np.argmax(matrix @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, matrix)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Keep the previous centroid for lists that lost all their rows.
+            sums[empty] = centroids[empty]
+            norms[empty] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+        assign = np.argmax(matrix @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=nlist))))
+        return cls(matrix, centroids, order, offsets, nprobe)
+
+    def search(self, query: np.ndarray, k: int) -> np.ndarray:
+        probe = _ranked(self.centroids @ query, min(self.nprobe, self.centroids.shape[0]))
+        candidates = np.concatenate([self.order[self.offsets[p]:self.offsets[p + 1]] for p in probe.tolist()])
+        if not candidates.size:
+            return candidates
+        top = _ranked(self.matrix[candidates] @ query, min(k, candidates.size))
+        return candidates[top]
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, centroids=self.centroids, order=self.order, offsets=self.offsets)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], matrix: np.ndarray, nprobe: int = RAG_IVF_NPROBE) -> "IVFSearch":
+        with np.load(path) as data:
+            index = cls(matrix, data["centroids"], data["order"], data["offsets"], nprobe)
+        if index.order.size != matrix.shape[0] or index.centroids.shape[1] != matrix.shape[1]:
+            raise ValueError("IVF index does not match the embedding matrix")
+        return index
+
+
+def matrix_key(matrix: np.ndarray, nlist: Optional[int] = None) -> str:
+    """Content hash identifying an IVF index trained on `matrix`."""
+    digest = hashlib.sha256(np.ascontiguousarray(matrix).tobytes())
+    digest.update(f"{matrix.shape}:{nlist}".encode("utf-8"))
+    return digest.hexdigest()[:24]
+
+
+def build_ivf(matrix: np.ndarray, cache_dir: Optional[Union[str, Path]] = None, nlist: Optional[int] = None, nprobe: int = RAG_IVF_NPROBE) -> IVFSearch:
+    """Load a persisted IVF index for this exact matrix, or train one (and persist it)."""
+    if cache_dir is None:
+        return IVFSearch.train(matrix, nlist=nlist, nprobe=nprobe)
+    path = Path(cache_dir) / f"ivf-{matrix_key(matrix, nlist)}.npz"
+    try:
+        return IVFSearch.load(path, matrix, nprobe)
+    except (OSError, ValueError, KeyError):
+        pass
+    index = IVFSearch.train(matrix, nlist=nlist, nprobe=nprobe)
+    try:
+        index.save(path)
+    except OSError:
+        pass
+    return index
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from had has have how i if in is it its "
+    "me my of on or so that the their them there these this to was what when which who why "
+    "will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    In-memory BM25 inverted index. Each term's postings hold the row ids that contain it
+    and their precomputed BM25 weights (idf included), so a query is one scatter-add per
+    query term and needs no network or model.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.n = 0
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def build(self, texts: Sequence[str]):
+        self.n = len(texts)
+        counts = [Counter(tokenize(text)) for text in texts]
+        lengths = np.array([sum(c.values()) for c in counts], dtype=np.float32)
+        avgdl = float(lengths.mean()) if self.n and lengths.sum() else 1.0
+        rows: Dict[str, List[int]] = defaultdict(list)
+        tfs: Dict[str, List[int]] = defaultdict(list)
+        for row, c in enumerate(counts):
+            for term, tf in c.items():
+                rows[term].append(row)
+                tfs[term].append(tf)
+        self.postings = {}
+        for term, ids in rows.items():
+            ids_arr = np.asarray(ids, dtype=np.int64)
+            tf = np.asarray(tfs[term], dtype=np.float32)
+            idf = math.log(1 + (self.n - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[ids_arr] / avgdl)
+            self.postings[term] = (ids_arr, (idf * tf * (self.k1 + 1) / (tf + norm)).astype(np.float32))
+
+    def scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(self.n, dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+        return scores
+
+    def search(self, query: str, k: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Row indices of up to k rows matching any query term, best first, optionally within `rows`."""
+        scores = self.scores(query)
+        if rows is not None:
+            allowed = np.zeros(self.n, dtype=bool)
+            allowed[rows] = True
+            scores[~allowed] = 0
+        matched = np.flatnonzero(scores > 0)
+        if not matched.size:
+            return matched
+        order = np.lexsort((matched, -scores[matched]))
+        return matched[order[:k]]
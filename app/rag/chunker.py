@@ -0,0 +1,87 @@
+from __future__ import annotations
+import re
+from typing import Any, Dict, List, Tuple
+
+from app.config import RAG_CHUNK_TOKENS
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*\S)\s*$|^Title:\s*(.*\S)\s*$")
+
+
+def count_tokens(text: str) -> int:
+    """Whitespace word count; a cheap, model-independent stand-in for tokens."""
+    return len(text.split())
+
+
+def _sections(content: str) -> List[Tuple[str, List[str]]]:
+    """(heading, paragraphs) in document order; text before any heading has heading ''."""
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    paragraph: List[str] = []
+
+    def end_paragraph():
+        if paragraph:
+            sections[-1][1].append("\n".join(paragraph))
+            paragraph.clear()
+
+    for line in content.splitlines():
+        match = _HEADING.match(line)
+        if match:
+            end_paragraph()
+            sections.append((match.group(2) or match.group(3), []))
+        elif line.strip():
+            paragraph.append(line.rstrip())
+        else:
+            end_paragraph()
+    end_paragraph()
+    return [(heading, paras) for heading, paras in sections if paras]
+
+
+def _split_oversized(paragraph: str, max_tokens: int) -> List[str]:
+    """Break a paragraph over budget at line boundaries, then at word boundaries."""
+    pieces: List[str] = []
+    for line in paragraph.split("\n"):
+        words = line.split()
+        for start in range(0, len(words), max_tokens):
+            pieces.append(" ".join(words[start:start + max_tokens]))
+    return pieces
+
+
+def _pack(paragraphs: List[str], max_tokens: int) -> List[str]:
+    units: List[str] = []
+    for paragraph in paragraphs:
+        if count_tokens(paragraph) > max_tokens:
+            units.extend(_split_oversized(paragraph, max_tokens))
+        else:
+            units.append(paragraph)
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for unit in units:
+        n = count_tokens(unit)
+        if current and size + n > max_tokens:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(unit)
+        size += n
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def chunk_markdown(doc_id: str, title: str, content: str, max_tokens: int = RAG_CHUNK_TOKENS) -> List[Dict[str, Any]]:
+    """
+    Split one markdown doc into chunks whose bodies hold at most `max_tokens` words. Headings (`#` lines
+    or a `Title:` line) start a new section; within a section whole paragraphs are packed
+    together, and only a paragraph over budget is split. Each chunk keeps its parent doc
+    id and the heading it falls under; the heading is repeated at the top of the text.
+    """
+    chunks = []
+    for heading, paragraphs in _sections(content):
+        for body in _pack(paragraphs, max_tokens):
+            chunks.append({
+                "id": f"{doc_id}#{len(chunks)}",
+                "parent": doc_id,
+                "title": title,
+                "heading": heading,
+                "text": f"{heading}\n{body}" if heading else body,
+            })
+    return chunks
@@ -1,7 +1,142 @@
+from __future__ import annotations
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
 from ollama import embeddings
 
-def embed_text(text: str):
+from app.config import (
+    RAG_CACHE_DIR,
+    RAG_EMBED_MODEL,
+    RAG_QUERY_CACHE_PERSIST,
+    RAG_QUERY_CACHE_SIZE,
+)
+from .store import EmbeddingStore
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU of embeddings keyed by (model, normalized text), optionally backed by a
+    per-model on-disk EmbeddingStore so repeats survive restarts. Disk writes are batched:
+    the store is saved every `persist_every` new vectors and on flush().
+    """
+
+    def __init__(self, maxsize: int = RAG_QUERY_CACHE_SIZE, persist_dir: Optional[str] = None, persist_every: int = 32):
+        self.maxsize = maxsize
+        self.persist_dir = persist_dir
+        self.persist_every = persist_every
+        self._entries: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._stores: Dict[str, EmbeddingStore] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _store(self, model: str) -> Optional[EmbeddingStore]:
+        if self.persist_dir is None:
+            return None
+        if model not in self._stores:
+            self._stores[model] = EmbeddingStore(self.persist_dir, model, name="queries")
+        return self._stores[model]
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = (model, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(vector)
+            store = self._store(model)
+        found = store.get(text) if store is not None else None
+        with self._lock:
+            if found is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        vector = found.tolist()
+        self._remember(key, vector)
+        return list(vector)
+
+    def put(self, model: str, text: str, vector: List[float]):
+        self._remember((model, text), list(vector))
+        with self._lock:
+            store = self._store(model)
+        if store is not None:
+            store.put(text, vector)
+            with self._lock:
+                self._unsaved += 1
+                due = self._unsaved >= self.persist_every
+            if due:
+                self.flush()
+
+    def _remember(self, key: Tuple[str, str], vector: List[float]):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def flush(self):
+        with self._lock:
+            stores = list(self._stores.values())
+            self._unsaved = 0
+        for store in stores:
+            try:
+                store.save()
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+QUERY_CACHE = EmbeddingCache(persist_dir=RAG_CACHE_DIR if RAG_QUERY_CACHE_PERSIST else None)
+_DEFAULT_CACHE = object()
+
+
+def _embed(text: str, model: str) -> List[float]:
     return embeddings(
-        model="nomic-embed-text",
+        model=model,
         prompt=text
-    )["embedding"]
\ No newline at end of file
+    )["embedding"]
+
+
+def embed_text(text: str, model: str = RAG_EMBED_MODEL, cache=_DEFAULT_CACHE):
+    """
+    Embedding for `text`. Repeated texts (after whitespace normalization) are served from
+    QUERY_CACHE without calling the model; pass cache=None to bypass it.
+    """
+    cache = QUERY_CACHE if cache is _DEFAULT_CACHE else cache
+    if cache is None or cache.maxsize <= 0:
+        return _embed(text, model)
+    text = normalize_text(text)
+    vector = cache.get(model, text)
+    if vector is None:
+        vector = _embed(text, model)
+        cache.put(model, text, vector)
+    return vector
@@ -0,0 +1,216 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Union
+
+import numpy as np
+
+from app.config import RAG_ANN_MIN_ROWS, RAG_INDEX, RAG_QUANTIZE, RAG_RESCORE_FACTOR
+from .ann import ExactSearch, _ranked, build_ivf, matrix_key
+from .bm25 import BM25Index
+from .quantize import quantize as quantize_matrix
+
+# Candidates fetched per requested result before deduping chunks by parent doc.
+OVERFETCH = 4
+# Reciprocal rank fusion constant: a row ranked r in a list contributes 1 / (RRF_K + r).
+RRF_K = 60
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row in place; zero rows are left as zeros."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+class DocIndex:
+    """
+    Retrieval view of the loaded chunks: one contiguous float32 matrix of L2-normalized
+    embeddings (a row per chunk), the result string each row returns, formatted once, and
+    the parent doc of each row. Nearest rows come from a search backend (exact scan, or
+    IVF for large corpora; see app/rag/ann.py), and a BM25 index over the same rows
+    answers keyword queries offline. Results keep only the best chunk of each parent doc.
+    Rows without an embedding are reachable through BM25 only. Every query method takes
+    an optional array of allowed rows (see rows_for_topics) to pre-filter by doc topic.
+    With `quantize` set to float16 or int8, scans run over compact codes and the best
+    `rescore_factor` x k candidates are re-ranked with the float32 rows; the float32 matrix
+    is then memory-mapped from cache_dir so only the rescored rows are paged in.
+    """
+
+    def __init__(
+        self,
+        kind: str = RAG_INDEX,
+        ann_min_rows: int = RAG_ANN_MIN_ROWS,
+        cache_dir: Optional[Union[str, Path]] = None,
+        quantize: str = RAG_QUANTIZE,
+        rescore_factor: int = RAG_RESCORE_FACTOR,
+    ):
+        self.kind = kind
+        self.ann_min_rows = ann_min_rows
+        self.cache_dir = cache_dir
+        self.quantize = quantize
+        self.rescore_factor = rescore_factor
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.codes: Any = None
+        self.results: List[str] = []
+        self.parents: List[str] = []
+        self.backend: Any = ExactSearch(self.matrix)
+        self.lexical = BM25Index()
+        self.dense = False
+        self.rows_by_tag: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def spawn(self) -> "DocIndex":
+        """An empty index with the same settings, to build off to the side and swap in."""
+        return DocIndex(self.kind, self.ann_min_rows, self.cache_dir, self.quantize, self.rescore_factor)
+
+    def build(self, docs: Sequence[Dict[str, Any]]):
+        embedded = [doc.get("embedding") is not None for doc in docs]
+        if all(embedded) and docs:
+            matrix = np.ascontiguousarray([doc["embedding"] for doc in docs], dtype=np.float32)
+        elif any(embedded):
+            dim = len(next(doc["embedding"] for doc in docs if doc.get("embedding") is not None))
+            matrix = np.zeros((len(docs), dim), dtype=np.float32)
+            for i, doc in enumerate(docs):
+                if doc.get("embedding") is not None:
+                    matrix[i] = doc["embedding"]
+        else:
+            matrix = np.zeros((len(docs), 0), dtype=np.float32)
+        self.build_rows(normalize_rows(matrix), any(embedded), docs)
+
+    def build_rows(self, matrix: np.ndarray, dense: bool, docs: Sequence[Dict[str, Any]]):
+        """
+        Build from an already L2-normalized matrix (e.g. a read-only memory map) and the
+        chunk metadata; `docs` need no embeddings here.
+        """
+        self.matrix = matrix
+        self.dense = dense
+        self.results = [f"{doc['title']}: {doc['text']}" for doc in docs]
+        self.parents = [doc.get("parent", doc["title"]) for doc in docs]
+        rows_by_tag: Dict[str, List[int]] = {}
+        for i, doc in enumerate(docs):
+            for tag in doc.get("tags", ()):
+                rows_by_tag.setdefault(tag, []).append(i)
+        self.rows_by_tag = {tag: np.asarray(rows, dtype=np.int64) for tag, rows in rows_by_tag.items()}
+        self.lexical.build([f"{doc['title']}\n{doc['text']}" for doc in docs])
+        use_ivf = self.kind == "ivf" or (self.kind == "auto" and len(docs) >= self.ann_min_rows)
+        self.backend = build_ivf(self.matrix, self.cache_dir) if use_ivf and self.dense else ExactSearch(self.matrix)
+        self.codes = None
+        if self.quantize != "none" and self.dense:
+            self.codes = quantize_matrix(self.matrix, self.quantize)
+            self.backend.matrix = self.codes
+            self.matrix = self._spill(self.matrix)
+
+    def _spill(self, matrix: np.ndarray) -> np.ndarray:
+        """Memory-map the float32 rows from cache_dir; keep them in RAM if that fails."""
+        if self.cache_dir is None or isinstance(matrix, np.memmap):
+            return matrix
+        path = Path(self.cache_dir) / f"matrix-{matrix_key(matrix)}.npy"
+        try:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f".{path.name}.tmp")
+                with open(tmp, "wb") as f:
+                    np.save(f, matrix)
+                tmp.replace(path)
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return matrix
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """Resident bytes of the scanned representation and of the float32 rows."""
+        in_ram = not isinstance(self.matrix, np.memmap)
+        return {
+            "scan": self.codes.nbytes if self.codes is not None else self.matrix.nbytes,
+            "float32": self.matrix.nbytes if in_ram else 0,
+        }
+
+    def query_vector(self, query_embedding: Sequence[float]) -> np.ndarray:
+        q = np.asarray(query_embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        return q / norm if norm else q
+
+    def scores(self, query_embedding: Sequence[float]) -> np.ndarray:
+        """Exact cosine score of every row."""
+        return self.matrix @ self.query_vector(query_embedding)
+
+    def _distinct_parents(self, ranked: Sequence[int], top_k: int) -> List[int]:
+        picked: List[int] = []
+        seen = set()
+        for i in ranked:
+            if self.parents[i] not in seen:
+                seen.add(self.parents[i])
+                picked.append(i)
+                if len(picked) == top_k:
+                    break
+        return picked
+
+    def rows_for_topics(self, topics: Optional[FrozenSet[str]]) -> Optional[np.ndarray]:
+        """Sorted rows tagged with any of `topics`; None (no filter) when nothing matches."""
+        if not topics:
+            return None
+        matches = [self.rows_by_tag[t] for t in topics if t in self.rows_by_tag]
+        if not matches:
+            return None
+        return np.unique(np.concatenate(matches))
+
+    def _dense_ranked(self, q: np.ndarray, k: int, rows: Optional[np.ndarray]) -> List[int]:
+        if self.codes is None:
+            if rows is None:
+                return self.backend.search(q, k).tolist()
+            # Topic subsets are small, so they are scanned exactly.
+            return rows[_ranked(self.matrix[rows] @ q, min(k, rows.size))].tolist()
+        fetch = k * self.rescore_factor
+        if rows is None:
+            candidates = self.backend.search(q, fetch)
+        else:
+            candidates = rows[_ranked(self.codes[rows] @ q, min(fetch, rows.size))]
+        if not candidates.size:
+            return []
+        # Re-rank the quantized candidates with full-precision rows, read in row order.
+        candidates = np.sort(candidates)
+        exact = np.asarray(self.matrix[candidates], dtype=np.float32) @ q
+        return candidates[_ranked(exact, min(k, candidates.size))].tolist()
+
+    def top_k(self, query_embedding: Sequence[float], top_k: int, rows: Optional[np.ndarray] = None) -> List[int]:
+        """Row indices of the best `top_k` dense matches from distinct parent docs, best first."""
+        n = len(self.results) if rows is None else rows.size
+        if not n or top_k <= 0 or not self.dense:
+            return []
+        q = self.query_vector(query_embedding)
+        k = min(top_k * OVERFETCH, n)
+        while True:
+            ranked = self._dense_ranked(q, k, rows)
+            picked = self._distinct_parents(ranked, top_k)
+            # Fewer than k rows back means the backend has nothing more to offer.
+            if len(picked) == top_k or k == n or len(ranked) < k:
+                return picked
+            k = min(k * 2, n)
+
+    def lexical_top_k(self, query: str, top_k: int, rows: Optional[np.ndarray] = None) -> List[int]:
+        """Row indices of the best `top_k` BM25 matches from distinct parent docs."""
+        if not len(self.results) or top_k <= 0:
+            return []
+        ranked = self.lexical.search(query, top_k * OVERFETCH, rows).tolist()
+        return self._distinct_parents(ranked, top_k)
+
+    def hybrid_top_k(self, query: str, query_embedding: Sequence[float], top_k: int, rows: Optional[np.ndarray] = None) -> List[int]:
+        """Dense and BM25 rankings merged with reciprocal rank fusion."""
+        n = len(self.results) if rows is None else rows.size
+        if not n or top_k <= 0:
+            return []
+        k = min(top_k * OVERFETCH, n)
+        fused: Dict[int, float] = {}
+        rankings = [self.lexical.search(query, k, rows).tolist()]
+        if self.dense:
+            rankings.append(self._dense_ranked(self.query_vector(query_embedding), k, rows))
+        for ranked in rankings:
+            for rank, i in enumerate(ranked):
+                fused[i] = fused.get(i, 0.0) + 1.0 / (RRF_K + rank + 1)
+        ranked = sorted(fused, key=lambda i: (-fused[i], i))
+        return self._distinct_parents(ranked, top_k)
+
+    def search(self, query_embedding: Sequence[float], top_k: int) -> List[str]:
+        return [self.results[i] for i in self.top_k(query_embedding, top_k)]
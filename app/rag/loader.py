@@ -1,17 +1,231 @@
+import threading
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import RAG_CACHE_DIR, RAG_CHUNK_TOKENS, RAG_EMBED_MODEL, RAG_WATCH_INTERVAL
+from .chunker import chunk_markdown
 from .embed import embed_text
+from .index import DocIndex
+from .shared import CURRENT_NAME, attach, current_key, docs_fingerprint, file_lock, publish
+from .store import EmbeddingStore
+
+DOCS_DIR = Path("app/rag/docs")
 
+# One entry per chunk: id, parent doc id, topic tags (the file stem plus any `Tags:`
+# front-matter), title, heading, text and embedding (None if it could not be embedded).
 DOCS = []
+# Matrix and formatted results for DOCS. Loads build a new index and rebind this name, so
+# readers should look it up once per query (loader.INDEX) rather than import it.
+INDEX = DocIndex(cache_dir=RAG_CACHE_DIR)
+# Fingerprint of the docs INDEX was built from; None until the first load.
+LOADED_KEY: Optional[str] = None
+
+_RELOAD_LOCK = threading.Lock()
+# Snapshot root used by load_shared, and the stat of its CURRENT pointer when we last synced.
+_SHARED_ROOT: Optional[Path] = None
+_SHARED_STAT: Optional[Tuple[int, int, int]] = None
+
+
+def _front_matter_tags(content: str) -> Tuple[List[str], str]:
+    """Topic tags from a leading `Tags: a, b` line, and the content without that line."""
+    lines = content.splitlines()
+    for i, line in enumerate(lines[:5]):
+        if line.lower().startswith("tags:"):
+            tags = [t.strip().lower().replace(" ", "_") for t in line.split(":", 1)[1].split(",")]
+            return [t for t in tags if t], "\n".join(lines[:i] + lines[i + 1:])
+    return [], content
+
+
+def _fingerprint(model: str) -> str:
+    return docs_fingerprint(list(DOCS_DIR.glob("*.md")), model, RAG_CHUNK_TOKENS)
+
 
+def _swap(docs: List[Dict[str, Any]], index: DocIndex, key: str):
+    # Rebinding is atomic: in-flight queries keep the index they already looked up.
+    global DOCS, INDEX, LOADED_KEY
+    DOCS, INDEX, LOADED_KEY = docs, index, key
 
-def load_docs():
-    DOCS.clear()
-    for file in Path("app/rag/docs").glob("*.md"):
-        content = file.read_text()
+
+def _embed_docs(store: EmbeddingStore) -> List[Dict[str, Any]]:
+    docs = []
+    for file in sorted(DOCS_DIR.glob("*.md")):
         title = file.stem.replace("_", " ").title()
-        text = f"{title}\n{content}"
-        DOCS.append({
-            "title": title,
-            "text": content.strip(),
-            "embedding": embed_text(text),
-        })
+        tags, content = _front_matter_tags(file.read_text())
+        tags = frozenset({file.stem, *tags})
+        for chunk in chunk_markdown(file.stem, title, content):
+            chunk["tags"] = tags
+            text = f"{title}\n{chunk['text']}"
+            embedding = store.get(text)
+            if embedding is None:
+                try:
+                    embedding = embed_text(text, store.model, cache=None)
+                    store.put(text, embedding)
+                except Exception:
+                    embedding = None
+            chunk["embedding"] = embedding
+            docs.append(chunk)
+    try:
+        store.save()
+    except OSError:
+        # A read-only cache directory only costs re-embedding on the next start.
+        pass
+    else:
+        # Swap freshly embedded float lists for views into the memory-mapped store.
+        for chunk in docs:
+            if isinstance(chunk["embedding"], list):
+                stored = store.get(f"{chunk['title']}\n{chunk['text']}")
+                if stored is not None:
+                    chunk["embedding"] = stored
+    return docs
+
+
+def load_docs(store: Optional[EmbeddingStore] = None):
+    """
+    Chunk app/rag/docs by heading and paragraph, build a new index and swap it in.
+    Embeddings come from the on-disk store when a chunk's text is unchanged; only new or
+    edited chunks go to the embedding model. A chunk that cannot be embedded (e.g. Ollama
+    is down) is kept with embedding None and stays reachable through the BM25 index.
+    """
+    store = store if store is not None else EmbeddingStore(RAG_CACHE_DIR, RAG_EMBED_MODEL)
+    key = _fingerprint(store.model)
+    docs = _embed_docs(store)
+    index = INDEX.spawn()
+    index.build(docs)
+    _swap(docs, index, key)
+
+
+def _pointer_stat(root: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = (root / "index" / CURRENT_NAME).stat()
+    except OSError:
+        return None
+    # publish() replaces the pointer file, so a new snapshot always brings a new inode.
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def load_shared(store: Optional[EmbeddingStore] = None, root: str = RAG_CACHE_DIR):
+    """
+    Startup entry point for multi-worker servers: attach to the published snapshot of the
+    current docs if there is one, otherwise embed them and publish a snapshot for the
+    other workers. Workers serialize on a file lock so only the first one embeds.
+    Afterwards sync_shared keeps this worker on the latest snapshot any worker publishes.
+    """
+    global _SHARED_ROOT, _SHARED_STAT
+    store = store if store is not None else EmbeddingStore(RAG_CACHE_DIR, RAG_EMBED_MODEL)
+    key = _fingerprint(store.model)
+    with file_lock(Path(root) / "index.lock"):
+        index = INDEX.spawn()
+        docs = attach(index, key, root)
+        if docs is None:
+            docs = _embed_docs(store)
+            index.build(docs)
+            # A partially embedded corpus (model unreachable) is not published, so the next
+            # worker retries the missing chunks instead of inheriting the gap.
+            if all(chunk["embedding"] is not None for chunk in docs):
+                try:
+                    publish(index, docs, key, root)
+                except OSError:
+                    pass
+        _SHARED_ROOT, _SHARED_STAT = Path(root), _pointer_stat(Path(root))
+    _swap(docs, index, key)
+
+
+def sync_shared() -> bool:
+    """
+    Swap in the snapshot another worker published since this one last loaded, e.g. after
+    an admin reload handled elsewhere. Costs one stat() of index/CURRENT when nothing
+    changed; skipped while this worker is reloading itself. Returns whether it swapped.
+    """
+    global _SHARED_STAT
+    root = _SHARED_ROOT
+    if root is None:
+        return False
+    stat = _pointer_stat(root)
+    if stat is None or stat == _SHARED_STAT:
+        return False
+    if not _RELOAD_LOCK.acquire(blocking=False):
+        return False
+    try:
+        key = current_key(root)
+        if key is None or key == LOADED_KEY:
+            _SHARED_STAT = stat
+            return False
+        index = INDEX.spawn()
+        docs = attach(index, key, root)
+        if docs is None:
+            # Caught between a publish and its cleanup; the next query tries again.
+            return False
+        _swap(docs, index, key)
+        _SHARED_STAT = stat
+        return True
+    finally:
+        _RELOAD_LOCK.release()
+
+
+def reload_docs(store: Optional[EmbeddingStore] = None, root: str = RAG_CACHE_DIR) -> bool:
+    """
+    Rebuild the index if the docs changed since the last load; only changed chunks are
+    embedded. Returns whether a new index was swapped in. Concurrent calls run one at a time.
+    """
+    with _RELOAD_LOCK:
+        model = store.model if store is not None else RAG_EMBED_MODEL
+        if LOADED_KEY is not None and _fingerprint(model) == LOADED_KEY:
+            return False
+        load_shared(store, root)
+        return True
+
+
+def reload_docs_async() -> threading.Thread:
+    """Run reload_docs in a daemon thread; queries keep using the current index meanwhile."""
+    thread = threading.Thread(target=reload_docs, name="rag-reload", daemon=True)
+    thread.start()
+    return thread
+
+
+class DocsWatcher:
+    """
+    Polls DOCS_DIR every `interval` seconds and reloads when a file is added, removed or
+    modified (by name, size and mtime). Uses no platform file-watching APIs.
+    """
+
+    def __init__(self, interval: float = RAG_WATCH_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._signature = self._scan()
+
+    @staticmethod
+    def _scan() -> Tuple[Tuple[str, int, int], ...]:
+        entries = []
+        for file in DOCS_DIR.glob("*.md"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            entries.append((file.name, stat.st_size, stat.st_mtime_ns))
+        return tuple(sorted(entries))
+
+    def check(self) -> bool:
+        """Reload now if the directory changed since the last check."""
+        signature = self._scan()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            return reload_docs()
+        except Exception:
+            # A failed reload keeps serving the current index; the next change retries.
+            return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> "DocsWatcher":
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="rag-docs-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
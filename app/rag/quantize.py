@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import Union
+
+import numpy as np
+
+# Rows decoded per step when scoring, so the float32 temporary stays small.
+BLOCK_ROWS = 4096
+
+
+class Float16Codes:
+    """Embeddings stored as float16 (half the memory of float32)."""
+
+    kind = "float16"
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+
+    @classmethod
+    def encode(cls, matrix: np.ndarray) -> "Float16Codes":
+        return cls(np.ascontiguousarray(matrix, dtype=np.float16))
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def __getitem__(self, rows) -> "Float16Codes":
+        return Float16Codes(self.data[rows])
+
+    def decode(self) -> np.ndarray:
+        return self.data.astype(np.float32)
+
+    def __matmul__(self, query: np.ndarray) -> np.ndarray:
+        out = np.empty(self.data.shape[0], dtype=np.float32)
+        for start in range(0, self.data.shape[0], BLOCK_ROWS):
+            out[start:start + BLOCK_ROWS] = self.data[start:start + BLOCK_ROWS].astype(np.float32) @ query
+        return out
+
+
+class Int8Codes:
+    """Embeddings stored as int8 with one float32 scale per row (about a quarter of float32)."""
+
+    kind = "int8"
+
+    def __init__(self, data: np.ndarray, scale: np.ndarray):
+        self.data = data
+        self.scale = scale
+
+    @classmethod
+    def encode(cls, matrix: np.ndarray) -> "Int8Codes":
+        scale = np.abs(matrix).max(axis=1) / 127.0 if matrix.size else np.zeros(matrix.shape[0])
+        scale = scale.astype(np.float32)
+        safe = np.where(scale == 0, 1.0, scale)[:, None]
+        data = np.clip(np.rint(matrix / safe), -127, 127).astype(np.int8)
+        return cls(np.ascontiguousarray(data), scale)
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.scale.nbytes
+
+    def __getitem__(self, rows) -> "Int8Codes":
+        return Int8Codes(self.data[rows], self.scale[rows])
+
+    def decode(self) -> np.ndarray:
+        return self.data.astype(np.float32) * self.scale[:, None]
+
+    def __matmul__(self, query: np.ndarray) -> np.ndarray:
+        out = np.empty(self.data.shape[0], dtype=np.float32)
+        for start in range(0, self.data.shape[0], BLOCK_ROWS):
+            block = self.data[start:start + BLOCK_ROWS].astype(np.float32)
+            out[start:start + BLOCK_ROWS] = (block @ query) * self.scale[start:start + BLOCK_ROWS]
+        return out
+
+
+Codes = Union[Float16Codes, Int8Codes]
+CODECS = {"float16": Float16Codes, "int8": Int8Codes}
+
+
+def quantize(matrix: np.ndarray, kind: str) -> Codes:
+    if kind not in CODECS:
+        raise ValueError(f"Unknown quantization: {kind}")
+    return CODECS[kind].encode(matrix)
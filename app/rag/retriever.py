@@ -1,21 +1,45 @@
 # app/rag/retriever.py
 
+from typing import FrozenSet, List, Optional
+
 import numpy as np
-from .loader import DOCS
+
+from app.config import RAG_LEXICAL_MAX_TERMS, RAG_RETRIEVAL
+from . import loader
+from .bm25 import tokenize
 from .embed import embed_text
+from .index import DocIndex
 
 
-def retrieve(query: str, top_k: int = 3):
-    if not DOCS:
-        return []
+def _rank(index: DocIndex, query: str, top_k: int, mode: str, rows: Optional[np.ndarray]) -> List[int]:
+    # Short keyword questions (and any query when embeddings are unavailable) are answered
+    # by BM25 alone, skipping the query-embedding round trip.
+    if mode == "lexical" or not index.dense:
+        return index.lexical_top_k(query, top_k, rows)
+    if mode == "hybrid" and len(tokenize(query)) <= RAG_LEXICAL_MAX_TERMS:
+        hits = index.lexical_top_k(query, top_k, rows)
+        if hits:
+            return hits
+    try:
+        q_emb = embed_text(query)
+    except Exception:
+        return index.lexical_top_k(query, top_k, rows)
+    if mode == "dense":
+        return index.top_k(q_emb, top_k, rows)
+    return index.hybrid_top_k(query, q_emb, top_k, rows)
 
-    q_emb = embed_text(query)
-    scores = []
 
-    for doc in DOCS:
-        score = float(np.dot(q_emb, doc["embedding"]))
-        formatted = f"{doc['title']}: {doc['text']}"
-        scores.append((score, formatted))
+def retrieve(query: str, top_k: int = 3, mode: str = RAG_RETRIEVAL, topics: Optional[FrozenSet[str]] = None):
+    """
+    Top reference texts for `query`. `topics` restricts the search to docs tagged with
+    those topics (see app/rag/topics.py); if no doc carries them, all docs are searched.
+    """
+    # Pick up a snapshot another worker published, then look the index up once per query,
+    # so a reload swapping in a new index mid-query is harmless.
+    loader.sync_shared()
+    index = loader.INDEX
+    if not len(index):
+        return []
 
-    scores.sort(reverse=True)
-    return [text for _, text in scores[:top_k]]
+    rows = index.rows_for_topics(topics)
+    return [index.results[i] for i in _rank(index, query, top_k, mode, rows)]
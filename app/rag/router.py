@@ -0,0 +1,30 @@
+from __future__ import annotations
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException
+
+from app.config import RAG_ADMIN_TOKEN
+from app.rag import loader
+
+router = APIRouter(prefix="/rag", tags=["rag"])
+
+
+def require_admin(token: str):
+    if not RAG_ADMIN_TOKEN or not token or not hmac.compare_digest(token, RAG_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@router.post("/reload")
+def reload_rag_docs(x_admin_token: str = Header(None)):
+    """Start an incremental reload of app/rag/docs in the background; other workers pick up
+    the published snapshot on their next query."""
+    require_admin(x_admin_token)
+    loader.reload_docs_async()
+    return {"status": "reloading", "loaded_key": loader.LOADED_KEY}
+
+
+@router.get("/status")
+def rag_status(x_admin_token: str = Header(None)):
+    require_admin(x_admin_token)
+    index = loader.INDEX
+    return {"chunks": len(index), "dense": index.dense, "loaded_key": loader.LOADED_KEY}
@@ -0,0 +1,105 @@
+"""
+One RAG index per machine, shared by every worker. The first worker to start chunks and
+embeds the docs, then publishes the normalized embedding matrix (.npy) and the chunk
+metadata (JSON) under RAG_CACHE_DIR/index/<fingerprint>/. Other workers memory-map the
+matrix read-only, so it lives once in the page cache, and make no embedding calls.
+The fingerprint covers the doc files, the embedding model and the chunk budget, so an
+edited corpus gets a fresh snapshot. index/CURRENT names the latest snapshot; workers stat
+it before serving a query and attach to a newer one that another worker published.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .index import DocIndex
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms publish without a lock
+    fcntl = None
+
+_META_FIELDS = ("id", "parent", "title", "heading", "text")
+CURRENT_NAME = "CURRENT"
+
+
+def docs_fingerprint(files: Sequence[Path], model: str, chunk_tokens: int) -> str:
+    digest = hashlib.sha256(f"{model}\0{chunk_tokens}".encode("utf-8"))
+    for file in sorted(files):
+        digest.update(f"\0{file.name}\0".encode("utf-8"))
+        digest.update(file.read_bytes())
+    return digest.hexdigest()[:24]
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Exclusive advisory lock across processes (no-op where fcntl is unavailable)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def publish(index: DocIndex, docs: Sequence[Dict[str, Any]], key: str, root: Union[str, Path]) -> Path:
+    """Write index.matrix and chunk metadata as snapshot `key`, removing older snapshots."""
+    base = Path(root) / "index"
+    target = base / key
+    tmp = base / f".{key}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    np.save(tmp / "matrix.npy", np.ascontiguousarray(index.matrix, dtype=np.float32))
+    meta = {
+        "dense": index.dense,
+        "docs": [{**{f: doc.get(f) for f in _META_FIELDS}, "tags": sorted(doc.get("tags", ()))} for doc in docs],
+    }
+    (tmp / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    pointer = base / f".{CURRENT_NAME}.{os.getpid()}.tmp"
+    pointer.write_text(key, encoding="utf-8")
+    os.replace(pointer, base / CURRENT_NAME)
+    for old in base.iterdir():
+        if old.is_dir() and old.name != key and not old.name.startswith("."):
+            # Workers still mapping an old matrix keep their open file on POSIX.
+            shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+def current_key(root: Union[str, Path]) -> Optional[str]:
+    """Key of the most recently published snapshot, or None if none was published."""
+    try:
+        return (Path(root) / "index" / CURRENT_NAME).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def attach(index: DocIndex, key: str, root: Union[str, Path]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Build `index` from snapshot `key` with the matrix memory-mapped read-only. Returns the
+    chunk metadata (embeddings are views into the map), or None if there is no snapshot.
+    """
+    target = Path(root) / "index" / key
+    try:
+        meta = json.loads((target / "meta.json").read_text(encoding="utf-8"))
+        matrix = np.load(target / "matrix.npy", mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    docs = meta["docs"]
+    if matrix.shape[0] != len(docs):
+        return None
+    for i, doc in enumerate(docs):
+        doc["tags"] = frozenset(doc["tags"])
+        doc["embedding"] = matrix[i] if meta["dense"] else None
+    index.build_rows(matrix, meta["dense"], docs)
+    return docs
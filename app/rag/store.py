@@ -0,0 +1,105 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path: Path, write) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+class EmbeddingStore:
+    """
+    Persistent embeddings for one model, keyed by the sha256 of the embedded text.
+    Vectors live in a float32 .npy file that is memory-mapped on load; a JSON manifest
+    lists the key of each row. New vectors are held in memory until save(), which
+    rewrites both files atomically (matrix first, manifest last), so other workers
+    never see a manifest that points past the end of the matrix.
+    """
+
+    def __init__(self, directory: Union[str, Path], model: str, name: str = "docs"):
+        self.directory = Path(directory)
+        self.model = model
+        stem = f"{name}-{re.sub(r'[^A-Za-z0-9_.-]+', '_', model)}"
+        self.matrix_path = self.directory / f"{stem}.npy"
+        self.manifest_path = self.directory / f"{stem}.json"
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._pending: Dict[str, np.ndarray] = {}
+        self.load()
+
+    def load(self):
+        rows: Dict[str, int] = {}
+        matrix = None
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            matrix = np.load(self.matrix_path, mmap_mode="r")
+            keys = manifest["keys"]
+            if manifest.get("model") != self.model or matrix.ndim != 2 or len(keys) > matrix.shape[0]:
+                raise ValueError("embedding store does not match its manifest")
+            rows = {key: i for i, key in enumerate(keys)}
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing or inconsistent files: start empty and rebuild on the next save.
+            rows, matrix = {}, None
+        with self._lock:
+            self._rows = rows
+            self._matrix = matrix
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._rows) + len(self._pending)
+
+    def __contains__(self, text: str) -> bool:
+        key = text_key(text)
+        with self._lock:
+            return key in self._pending or key in self._rows
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = text_key(text)
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            row = self._rows.get(key)
+            if row is None:
+                return None
+            return np.asarray(self._matrix[row])
+
+    def put(self, text: str, embedding: Sequence[float]):
+        key = text_key(text)
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            if key not in self._rows:
+                self._pending[key] = vector
+
+    def save(self):
+        with self._lock:
+            if not self._pending:
+                return
+            keys: List[str] = list(self._rows) + list(self._pending)
+            parts = [np.asarray(self._matrix[: len(self._rows)])] if self._rows else []
+            parts.append(np.stack(list(self._pending.values())))
+            dims = {p.shape[1] for p in parts}
+            if len(dims) > 1:
+                # The model changed its output size; keep only the new vectors.
+                keys, parts = list(self._pending), parts[-1:]
+            matrix = np.ascontiguousarray(np.concatenate(parts), dtype=np.float32)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self.matrix_path, lambda f: np.save(f, matrix))
+            manifest = json.dumps({"model": self.model, "dim": int(matrix.shape[1]), "keys": keys})
+            _atomic_write(self.manifest_path, lambda f: f.write(manifest.encode("utf-8")))
+            self._pending = {}
+        self.load()
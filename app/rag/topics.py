@@ -0,0 +1,76 @@
+from __future__ import annotations
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from app.intent.schema import Intent, IntentResult
+from app.rules.registry import COMPILED
+
+# Doc topics are the markdown file stems in app/rag/docs (plus any `Tags:` front-matter).
+SIGNAL_TOPICS: Dict[str, Tuple[str, ...]] = {
+    "fasting_glucose": ("glucose",),
+    "blood_pressure": ("blood_pressure",),
+    "total_cholesterol": ("lipids",),
+    "ldl": ("lipids",),
+    "hdl": ("lipids",),
+    "triglycerides": ("lipids",),
+    "sleep_hours": ("sleep",),
+    "activity_minutes": ("activity",),
+    "bmi": ("nutrition", "activity"),
+    "vitamin_d": ("nutrition",),
+    "vitamin_b12": ("nutrition",),
+    "ferritin": ("nutrition",),
+    "cycle_length_days": ("periods", "reproductive_health"),
+    "periods_missed": ("periods", "reproductive_health"),
+    "cycle_irregular": ("periods", "reproductive_health"),
+    "stress_level": ("stress_mood",),
+    "mood_variability": ("stress_mood",),
+}
+
+# Signal names as they appear in the facts -> rule id.
+_RULE_BY_NAME: Dict[str, str] = {c.rule.name: c.rule.id for c in COMPILED}
+
+INTENT_TOPICS: Dict[Intent, Tuple[str, ...]] = {
+    Intent.SLEEP_RECAP: ("sleep",),
+}
+
+_TOPIC_KEYWORDS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(rf"\b(?:{words})", re.I), topic)
+    for topic, words in (
+        ("glucose", "glucose|sugar|a1c"),
+        ("lipids", "ldl|hdl|cholesterol|triglyceride|lipid"),
+        ("blood_pressure", "bp\\b|blood pressure|hypertension|systolic|diastolic"),
+        ("sleep", "sleep|asleep|insomnia"),
+        ("activity", "activity|exercise|workout|steps|walk"),
+        ("nutrition", "bmi|vitamin|ferritin|iron|diet|nutrition|weight"),
+        ("periods", "period|cycle|menstrua"),
+        ("reproductive_health", "cycle|fertility|reproductive|ovulat"),
+        ("stress_mood", "stress|mood|anxi"),
+    )
+]
+
+
+def signal_topics(signal_name: str) -> Tuple[str, ...]:
+    return SIGNAL_TOPICS.get(_RULE_BY_NAME.get(signal_name, ""), ())
+
+
+def retrieval_topics(question: str, intent_result: Optional[IntentResult], facts: Dict[str, Any]) -> Optional[FrozenSet[str]]:
+    """
+    Doc topics worth searching for this turn: topics the question or intent names, else
+    the topics of every signal in the facts. None means no filter.
+    """
+    topics: Set[str] = {topic for pattern, topic in _TOPIC_KEYWORDS if pattern.search(question or "")}
+    if intent_result is not None:
+        topics.update(INTENT_TOPICS.get(intent_result.intent, ()))
+    if not topics:
+        for sig in facts.get("signals", []):
+            topics.update(signal_topics(sig.get("name", "")))
+    return frozenset(topics) or None
+
+
+def retrieval_query(question: str, facts: Dict[str, Any], topics: Optional[FrozenSet[str]] = None) -> str:
+    """The question plus name and status of the relevant signals; no values or explanations."""
+    parts = [question.strip()]
+    for sig in facts.get("signals", []):
+        if topics is None or topics.intersection(signal_topics(sig.get("name", ""))):
+            parts.append(f"{sig.get('name')} {str(sig.get('status', '')).replace('_', ' ')}")
+    return " ".join(p for p in parts if p)
@@ -0,0 +1,16 @@
+from app.rules.engine import evaluate_health
+from app.rules.batch import evaluate_health_batch
+from app.rules.delta import evaluate_health_delta
+from app.rules.cache import FACTS_CACHE, cached_evaluate_health
+from app.rules.registry import TREND_RULES
+from app.rules.trends import TrendState, _compute_trend
+
+__all__ = [
+    "evaluate_health",
+    "evaluate_health_batch",
+    "evaluate_health_delta",
+    "cached_evaluate_health",
+    "FACTS_CACHE",
+    "TREND_RULES",
+    "TrendState",
+]
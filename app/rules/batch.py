@@ -0,0 +1,237 @@
+from __future__ import annotations
+import gc
+from contextlib import contextmanager
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.rules.engine import evaluate_health
+from app.rules.registry import COMPILED, NO_BAND, CompiledRule
+from app.rules.trends import _trend_and_sparkline
+
+# Inputs compared against thresholds; flag rules only need truthiness.
+_NUMERIC_KEYS = [key for c in COMPILED if c.rule.flag_value is None for key in c.keys]
+_NUMERIC_KEY_SET = frozenset(_NUMERIC_KEYS)
+_FLAG_KEYS = [c.rule.id for c in COMPILED if c.rule.flag_value is not None]
+
+_EFFECT_FIELDS = ("risks", "recommendations", "doctor_flags")
+# Every risk/recommendation/flag the rules can emit, sorted so a row's hits come out in output order.
+_EFFECT_NAMES: Dict[str, List[str]] = {
+    field: sorted({e for c in COMPILED for band in c.bands for e in getattr(band, field)})
+    for field in _EFFECT_FIELDS
+}
+_EFFECT_INDEX: Dict[str, Dict[str, int]] = {
+    field: {name: i for i, name in enumerate(names)} for field, names in _EFFECT_NAMES.items()
+}
+
+
+def _segments(edges: List[float], values: np.ndarray) -> np.ndarray:
+    """Vectorized registry._segment over a float column."""
+    if not edges:
+        return np.where(np.isnan(values), 1, 0)
+    e = np.asarray(edges, dtype=float)
+    i = np.searchsorted(e, values, side="left")
+    on_edge = e[np.minimum(i, e.size - 1)] == values
+    segments = 2 * i + on_edge
+    segments[np.isnan(values)] = 2 * e.size + 1
+    return segments
+
+
+def _bands(compiled: CompiledRule, columns: Dict[str, np.ndarray]) -> np.ndarray:
+    idx = np.zeros(len(next(iter(columns.values()))), dtype=np.int64)
+    for key, edges, stride in zip(compiled.keys, compiled.edges, compiled.strides):
+        idx += _segments(edges, columns[key]) * stride
+    return np.asarray(compiled.grid, dtype=np.int64)[idx]
+
+
+class _Columns:
+    """Raw health states converted once into per-key columns."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.values: Dict[str, Any] = {k: [np.nan] * n for k in _NUMERIC_KEYS}
+        self.raw: Dict[str, List[Any]] = {k: [None] * n for k in _NUMERIC_KEYS}
+        self.present: Dict[str, np.ndarray] = {}
+        self.flags: Dict[str, Any] = {k: [False] * n for k in _FLAG_KEYS}
+        self.history: List[Any] = [{}] * n
+        # Rows with non-numeric inputs take the scalar path so errors surface identically.
+        self.fallback: Any = [False] * n
+
+    def set(self, key: str, i: int, value: Any):
+        if value is None:
+            return
+        self.raw[key][i] = value
+        if isinstance(value, (int, float, np.number)):
+            self.values[key][i] = value
+        else:
+            self.fallback[i] = True
+
+    def finalize(self) -> "_Columns":
+        for key in _NUMERIC_KEYS:
+            if key not in self.present:
+                self.values[key] = np.array(self.values[key], dtype=float)
+                self.present[key] = np.array([v is not None for v in self.raw[key]], dtype=bool)
+        self.flags = {k: np.asarray(v, dtype=bool) for k, v in self.flags.items()}
+        self.fallback = np.asarray(self.fallback, dtype=bool)
+        # Non-numeric cells were left as NaN above; keep them out of the vectorized pass.
+        for key in _NUMERIC_KEYS:
+            self.present[key] &= ~self.fallback
+        return self
+
+    def row(self, i: int) -> Dict[str, Any]:
+        raw = {k: self.raw[k][i] for k in _NUMERIC_KEYS if self.raw[k][i] is not None}
+        raw.update({k: bool(self.flags[k][i]) for k in _FLAG_KEYS})
+        raw["history"] = self.history[i]
+        return raw
+
+
+def _columns_from_rows(rows: Sequence[Mapping[str, Any]]) -> Tuple[_Columns, List[Mapping[str, Any]]]:
+    cols = _Columns(len(rows))
+    values, raws, flags, fallback = cols.values, cols.raw, cols.flags, cols.fallback
+    for i, raw in enumerate(rows):
+        for key, value in raw.items():
+            if key in _NUMERIC_KEY_SET and value is not None:
+                raws[key][i] = value
+                if isinstance(value, (int, float, np.number)):
+                    values[key][i] = value
+                else:
+                    fallback[i] = True
+        for key in _FLAG_KEYS:
+            if raw.get(key):
+                flags[key][i] = True
+        history = raw.get("history")
+        if isinstance(history, dict):
+            cols.history[i] = history
+    return cols.finalize(), list(rows)
+
+
+def _columns_from_mapping(columns: Mapping[str, Sequence[Any]]) -> Tuple[_Columns, None]:
+    lengths = {len(v) for v in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("All columns must have the same length")
+    n = lengths.pop() if lengths else 0
+    cols = _Columns(n)
+    for key in _NUMERIC_KEYS:
+        column = columns.get(key)
+        if column is None:
+            continue
+        arr = np.asarray(column)
+        if arr.dtype.kind in "biuf":
+            # Numeric arrays: NaN marks a missing entry.
+            values = arr.astype(float)
+            present = ~np.isnan(values)
+            cols.values[key] = values
+            cols.present[key] = present
+            cols.raw[key] = [v if p else None for v, p in zip(arr.tolist(), present.tolist())]
+        else:
+            for i, value in enumerate(column):
+                if not (isinstance(value, float) and value != value):
+                    cols.set(key, i, value)
+    for key in _FLAG_KEYS:
+        if key in columns:
+            cols.flags[key] = [bool(v) for v in columns[key]]
+    if "history" in columns:
+        cols.history = [h if isinstance(h, dict) else {} for h in columns["history"]]
+    return cols.finalize(), None
+
+
+@contextmanager
+def _gc_paused():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def evaluate_health_batch(
+    states: Union[Sequence[Mapping[str, Any]], Mapping[str, Sequence[Any]]],
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate many users at once. Returns the same facts evaluate_health would for each row.
+    Accepts a list of raw dicts, or a mapping of key -> column (NumPy arrays or lists).
+    In columnar input, None or NaN marks a missing entry.
+    Bands and risks/recommendations/doctor flags are resolved with vectorized lookups
+    over whole columns; only signal entries and trends are built row by row.
+    """
+    # Building facts for a cohort allocates many small acyclic dicts; pausing the cyclic
+    # collector avoids repeated full-heap scans while they are created.
+    with _gc_paused():
+        if isinstance(states, Mapping):
+            cols, rows = _columns_from_mapping(states)
+        else:
+            cols, rows = _columns_from_rows(states)
+        return _evaluate_columns(cols, rows)
+
+
+def _evaluate_columns(cols: _Columns, rows: Optional[List[Mapping[str, Any]]]) -> List[Dict[str, Any]]:
+    n = cols.n
+    signals: List[List[Dict[str, Any]]] = [[] for _ in range(n)]
+    effects = {field: np.zeros((n, len(names)), dtype=bool) for field, names in _EFFECT_NAMES.items()}
+
+    for compiled in COMPILED:
+        rule = compiled.rule
+        if rule.flag_value is not None:
+            mask = cols.flags[rule.id] & ~cols.fallback
+            bands = np.zeros(n, dtype=np.int64)
+        else:
+            mask = np.logical_and.reduce([cols.present[k] for k in compiled.keys])
+            if not mask.any():
+                continue
+            bands = _bands(compiled, {k: cols.values[k] for k in compiled.keys})
+        mask &= bands != NO_BAND
+        if not mask.any():
+            continue
+
+        for band_idx, band in enumerate(rule.bands):
+            hit = np.flatnonzero(mask & (bands == band_idx))
+            if not hit.size:
+                continue
+            for field in _EFFECT_FIELDS:
+                names = getattr(band, field)
+                if names:
+                    effects[field][np.ix_(hit, [_EFFECT_INDEX[field][name] for name in names])] = True
+
+        templates = compiled.templates
+        trended = rule.better_when_lower is not None
+        for i, band_idx in zip(np.flatnonzero(mask).tolist(), bands[mask].tolist()):
+            if rule.flag_value is not None:
+                value: Any = rule.flag_value
+            elif rule.value_fields:
+                value = {f: cols.raw[k][i] for f, k in zip(rule.value_fields, compiled.keys)}
+            else:
+                value = cols.raw[rule.id][i]
+            template = templates[band_idx]
+            entry = {**template, "value": value, "explanation": template["explanation"].copy()}
+            if trended and cols.history[i]:
+                trend, sparkline = _trend_and_sparkline(cols.history[i], rule.id, value, rule.better_when_lower)
+                if trend:
+                    entry["trend"] = trend
+                if sparkline:
+                    entry["sparkline"] = sparkline
+            signals[i].append(entry)
+
+    # Effect columns are in sorted name order, so each row's hits are already sorted.
+    per_row: Dict[str, List[List[str]]] = {}
+    for field, matrix in effects.items():
+        row_idx, col_idx = np.nonzero(matrix)
+        names = np.array(_EFFECT_NAMES[field], dtype=object)[col_idx].tolist()
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(row_idx, minlength=n)))).tolist()
+        per_row[field] = [names[bounds[i]:bounds[i + 1]] for i in range(n)]
+
+    results = []
+    for i in range(n):
+        if cols.fallback[i]:
+            results.append(evaluate_health(rows[i] if rows is not None else cols.row(i)))
+            continue
+        results.append(
+            {
+                "signals": signals[i],
+                "risks": per_row["risks"][i],
+                "recommendations": per_row["recommendations"][i],
+                "doctor_flags": per_row["doctor_flags"][i],
+            }
+        )
+    return results
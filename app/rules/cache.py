@@ -0,0 +1,142 @@
+from __future__ import annotations
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.config import FACTS_CACHE_SIZE, FACTS_CACHE_TTL_SECONDS
+from app.rules.engine import evaluate_health
+from app.rules.explain import resolve_explanations
+from app.rules.trends import TrendState
+
+
+def _canonical(obj: Any) -> Any:
+    """JSON-ready form of a raw payload; raises TypeError for values we cannot key on."""
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return {"__ndarray__": _canonical(obj.tolist())}
+    if isinstance(obj, TrendState):
+        return {"__trend_state__": _canonical(obj.to_dict())}
+    if isinstance(obj, (bool, np.bool_)):
+        return bool(obj)
+    if isinstance(obj, (int, np.integer)):
+        return int(obj)
+    if isinstance(obj, (float, np.floating)):
+        value = float(obj)
+        # Ints and floats stay distinct: the facts echo the raw value back (118 vs 118.0).
+        if math.isnan(value) or math.isinf(value):
+            return {"__float__": repr(value)}
+        return {"__float__": repr(value)} if value == int(value) else value
+    if obj is None or isinstance(obj, str):
+        return obj
+    raise TypeError(f"Unhashable health input: {type(obj).__name__}")
+
+
+def payload_key(raw: Dict[str, Any]) -> str:
+    canonical = json.dumps(_canonical(raw), sort_keys=True, separators=(",", ":"), allow_nan=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _copy_facts(obj: Any) -> Any:
+    # Facts are plain dicts/lists of scalars; a structural copy is much cheaper than deepcopy.
+    if isinstance(obj, dict):
+        return {k: _copy_facts(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_copy_facts(v) for v in obj]
+    return obj
+
+
+class FactsCache:
+    """
+    Bounded LRU + TTL cache of evaluate_health results keyed by a canonical payload hash.
+    Entries are stored privately and every hit returns a fresh copy, so callers may mutate
+    what they get back. Safe to share across the threadpool that runs sync endpoints.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = FACTS_CACHE_SIZE,
+        ttl: float = FACTS_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            facts = entry[1]
+        return _copy_facts(facts)
+
+    def put(self, key: str, facts: Dict[str, Any]):
+        stored = _copy_facts(facts)
+        with self._lock:
+            self._entries[key] = (self._clock(), stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+FACTS_CACHE = FactsCache()
+
+
+def cached_evaluate_health(
+    raw: Dict[str, Any], cache: Optional[FactsCache] = None, lazy_explanations: bool = False
+) -> Dict[str, Any]:
+    """
+    evaluate_health with memoization; payloads that cannot be keyed are evaluated directly.
+    Entries keep explanations as ids, which are resolved on the way out unless the caller
+    asks for lazy_explanations too (see evaluate_health).
+    """
+    cache = cache if cache is not None else FACTS_CACHE
+    if cache.maxsize <= 0:
+        return evaluate_health(raw, lazy_explanations)
+    try:
+        key = payload_key(raw)
+    except (TypeError, ValueError):
+        return evaluate_health(raw, lazy_explanations)
+    facts = cache.get(key)
+    if facts is None:
+        facts = evaluate_health(raw, lazy_explanations=True)
+        cache.put(key, facts)
+    return facts if lazy_explanations else resolve_explanations(facts)
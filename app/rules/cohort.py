@@ -0,0 +1,209 @@
+"""
+Score a cohort of raw health states offline.
+    python -m app.rules.cohort states.jsonl --out facts.jsonl --workers 4
+Input is JSONL (one raw health state per line) or CSV (one column per input key; a
+`history` column may hold a JSON object). Rows are read lazily, scored in chunks across a
+process pool with a bounded number of chunks in flight, and written back in input order as
+JSONL lines of {"row": n, "facts": {...}}. Throughput per worker is reported on stderr.
+"""
+from __future__ import annotations
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import IO, Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.rules.batch import evaluate_health_batch
+from app.rules.engine import evaluate_health
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def _parse_csv_value(text: str) -> Any:
+    text = text.strip()
+    if not text:
+        return None
+    lowered = text.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if text[0] in "{[":
+        return json.loads(text)
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def read_jsonl(stream: IO[str]) -> Iterator[Dict[str, Any]]:
+    for lineno, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        if not isinstance(row, dict):
+            raise ValueError(f"line {lineno}: expected a JSON object")
+        yield row
+
+
+def read_csv(stream: IO[str]) -> Iterator[Dict[str, Any]]:
+    for record in csv.DictReader(stream):
+        row = {}
+        for key, text in record.items():
+            value = _parse_csv_value(text or "")
+            if key and value is not None:
+                row[key] = value
+        yield row
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_chunk(start: int, rows: List[Dict[str, Any]], id_field: Optional[str] = None) -> Tuple[int, float, List[str]]:
+    """
+    Score one chunk and return (pid, seconds, JSONL lines). Lines are serialized in the
+    worker so only strings cross the process boundary.
+    """
+    began = time.perf_counter()
+    try:
+        results: List[Any] = evaluate_health_batch(rows)
+    except Exception:
+        # One bad row should not sink the chunk; score rows individually to isolate it.
+        results = []
+        for raw in rows:
+            try:
+                results.append(evaluate_health(raw))
+            except Exception as exc:
+                results.append(exc)
+    lines = []
+    for offset, (raw, facts) in enumerate(zip(rows, results)):
+        record: Dict[str, Any] = {"row": start + offset}
+        if id_field and id_field in raw:
+            record[id_field] = raw[id_field]
+        if isinstance(facts, Exception):
+            record["error"] = f"{type(facts).__name__}: {facts}"
+        else:
+            record["facts"] = facts
+        lines.append(json.dumps(record, ensure_ascii=True))
+    return os.getpid(), time.perf_counter() - began, lines
+
+
+class WorkerStats:
+    """Rows and busy seconds per worker process."""
+
+    def __init__(self):
+        self.rows: Dict[int, int] = {}
+        self.seconds: Dict[int, float] = {}
+
+    def add(self, pid: int, rows: int, seconds: float):
+        self.rows[pid] = self.rows.get(pid, 0) + rows
+        self.seconds[pid] = self.seconds.get(pid, 0.0) + seconds
+
+    def report(self, elapsed: float) -> str:
+        lines = []
+        for pid in sorted(self.rows):
+            rate = self.rows[pid] / self.seconds[pid] if self.seconds[pid] else 0.0
+            lines.append(f"worker {pid}: {self.rows[pid]} rows, {rate:,.0f} rows/sec")
+        total = sum(self.rows.values())
+        overall = total / elapsed if elapsed else 0.0
+        lines.append(f"total: {total} rows in {elapsed:.2f}s, {overall:,.0f} rows/sec")
+        return "\n".join(lines)
+
+
+def score_stream(
+    rows: Iterable[Dict[str, Any]],
+    out: IO[str],
+    workers: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_pending: Optional[int] = None,
+    id_field: Optional[str] = None,
+) -> WorkerStats:
+    """
+    Score `rows` and write JSONL to `out` in input order. With workers=0 chunks are scored
+    in this process; otherwise at most `max_pending` chunks (default 2 per worker) are
+    queued at once, so memory is bounded by chunk_size * max_pending rows.
+    """
+    stats = WorkerStats()
+    chunks = _chunks(rows, chunk_size)
+
+    def write(result: Tuple[int, float, List[str]]):
+        pid, seconds, lines = result
+        stats.add(pid, len(lines), seconds)
+        for line in lines:
+            out.write(line + "\n")
+
+    start = 0
+    if workers <= 0:
+        for chunk in chunks:
+            write(score_chunk(start, chunk, id_field))
+            start += len(chunk)
+        return stats
+
+    limit = max_pending or 2 * workers
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks:
+            if len(pending) >= limit:
+                write(pending.popleft().result())
+            pending.append(pool.submit(score_chunk, start, chunk, id_field))
+            start += len(chunk)
+        while pending:
+            write(pending.popleft().result())
+    return stats
+
+
+def _open_input(path: str) -> IO[str]:
+    return sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.rules.cohort", description="Score raw health states offline.")
+    parser.add_argument("input", help="JSONL or CSV of raw health states, or - for stdin")
+    parser.add_argument("--out", default="-", help="Output JSONL path (default: stdout)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="Input format (default: from file extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes; 0 scores inline")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per work unit")
+    parser.add_argument("--max-pending", type=int, default=None, help="Chunks in flight (default: 2 per worker)")
+    parser.add_argument("--id-field", default="user_id", help="Input field copied to each output line when present")
+    args = parser.parse_args(argv)
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+
+    fmt = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+    source = _open_input(args.input)
+    sink = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    began = time.perf_counter()
+    try:
+        rows = read_csv(source) if fmt == "csv" else read_jsonl(source)
+        stats = score_stream(
+            rows,
+            sink,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            max_pending=args.max_pending,
+            id_field=args.id_field,
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    print(stats.report(time.perf_counter() - began), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.rules.engine import evaluate_health
+from app.rules.registry import COMPILED, CompiledRule
+
+_MISSING = object()
+
+
+def _history(raw: Dict[str, Any]) -> Dict[str, Any]:
+    history = raw.get("history")
+    return history if isinstance(history, dict) else {}
+
+
+def _inputs_changed(compiled: CompiledRule, old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+    for key in compiled.keys:
+        if old.get(key, _MISSING) != new.get(key, _MISSING):
+            return True
+    return False
+
+
+def _band_of(compiled: CompiledRule, entry: Dict[str, Any]) -> Optional[int]:
+    """Band that produced a previous signal entry, or None if it cannot be recognized."""
+    for i, template in enumerate(compiled.templates):
+        if (
+            template["status"] == entry.get("status")
+            and template["details"] == entry.get("details")
+            and template["explanation"] == entry.get("explanation")
+        ):
+            return i
+    return None
+
+
+def evaluate_health_delta(
+    previous_raw: Dict[str, Any],
+    previous_facts: Dict[str, Any],
+    new_raw: Dict[str, Any],
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Re-evaluate only the rules whose inputs (or trend history) differ between previous_raw
+    and new_raw, reusing the other signals from previous_facts. Returns (facts, changes);
+    facts equal evaluate_health(new_raw), and changes lists each signal that was added,
+    removed or updated as {"signal", "name", "change", "previous", "current"}.
+    previous_raw must be the payload previous_facts were computed from, and must not have
+    been mutated since.
+    """
+    old_history = _history(previous_raw)
+    new_history = _history(new_raw)
+    previous_by_name = {sig.get("name"): sig for sig in previous_facts.get("signals", [])}
+
+    reused: Dict[int, Tuple[Dict[str, Any], int]] = {}
+    rerun: List[CompiledRule] = []
+    for compiled in COMPILED:
+        rule = compiled.rule
+        previous = previous_by_name.get(rule.name)
+        changed = _inputs_changed(compiled, previous_raw, new_raw)
+        if rule.better_when_lower is not None and not changed:
+            changed = old_history.get(rule.id, _MISSING) != new_history.get(rule.id, _MISSING)
+        if not changed:
+            if previous is None:
+                continue
+            band = _band_of(compiled, previous)
+            if band is not None:
+                reused[compiled.order] = (previous, band)
+                continue
+        rerun.append(compiled)
+
+    fresh: Dict[str, Dict[str, Any]] = {}
+    if rerun:
+        subset = {k: new_raw[k] for compiled in rerun for k in compiled.keys if k in new_raw}
+        if new_history:
+            subset["history"] = new_history
+        fresh = {sig["name"]: sig for sig in evaluate_health(subset)["signals"]}
+
+    signals: List[Dict[str, Any]] = []
+    fired: List[Any] = []
+    changes: List[Dict[str, Any]] = []
+    rerun_orders = {compiled.order for compiled in rerun}
+    for compiled in COMPILED:
+        name = compiled.rule.name
+        if compiled.order in reused:
+            previous, band = reused[compiled.order]
+            signals.append(dict(previous))
+            if compiled.effects[band]:
+                fired.append(compiled.effects[band])
+            continue
+        if compiled.order not in rerun_orders:
+            continue
+        previous = previous_by_name.get(name)
+        current = fresh.get(name)
+        if current is not None:
+            signals.append(current)
+            band = _band_of(compiled, current)
+            if compiled.effects[band]:
+                fired.append(compiled.effects[band])
+        if previous == current:
+            continue
+        change = "updated" if previous is not None and current is not None else "added" if current is not None else "removed"
+        changes.append(
+            {
+                "signal": compiled.rule.id,
+                "name": name,
+                "change": change,
+                "previous": previous,
+                "current": current,
+            }
+        )
+
+    facts = {
+        "signals": signals,
+        "risks": sorted({r for e in fired for r in e[0]}),
+        "recommendations": sorted({r for e in fired for r in e[1]}),
+        "doctor_flags": sorted({f for e in fired for f in e[2]}),
+    }
+    return facts, changes
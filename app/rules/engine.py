@@ -0,0 +1,77 @@
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Any, Dict, List
+
+from app.rules.registry import COMPILED, NO_BAND, RULE_INDEX_BY_KEY, SCALAR_PLAN
+from app.rules.trends import _trend_and_sparkline
+
+
+def evaluate_health(raw: Dict[str, Any], lazy_explanations: bool = False) -> Dict[str, Any]:
+    """
+    Deterministic rules engine for V1 with explainability and optional trends.
+    Accepts a raw dict of health inputs. Keys are optional; rules only fire when present.
+    Rules come from the declarative table in app/rules/table.py.
+    With lazy_explanations, signals carry `explanation_id` instead of an explanation dict;
+    read it with explain.explanation_of or turn it into text with resolve_explanations.
+    """
+    signals: List[Dict[str, Any]] = []
+    # Effect tuples of the bands that fired; merged once at the end.
+    fired: List[Any] = []
+
+    history_data = raw.get("history") if isinstance(raw.get("history"), dict) else {}
+
+    # Visit only rules whose inputs appear in the payload, in table order.
+    for order in sorted({RULE_INDEX_BY_KEY[k] for k in raw if k in RULE_INDEX_BY_KEY}):
+        rule_id, key, edges, grid, templates, lazy_templates, effects, better_when_lower = SCALAR_PLAN[order]
+        if key is not None:
+            value = raw[key]
+            if value is None:
+                continue
+            # Inline of registry._segment: bisect to the gap or edge the value falls on.
+            if value != value:
+                band = grid[-1]
+            else:
+                i = bisect_left(edges, value)
+                band = grid[2 * i + 1 if i < len(edges) and edges[i] == value else 2 * i]
+        else:
+            compiled = COMPILED[order]
+            rule = compiled.rule
+            if rule.flag_value is not None:
+                if not raw.get(rule_id):
+                    continue
+                band = 0
+                value = rule.flag_value
+            else:
+                values = [raw.get(k) for k in compiled.keys]
+                if any(v is None for v in values):
+                    continue
+                band = compiled.lookup(values)
+                value = dict(zip(rule.value_fields, values))
+        if band == NO_BAND:
+            continue
+
+        if effects[band]:
+            fired.append(effects[band])
+
+        if lazy_explanations:
+            entry = lazy_templates[band].copy()
+            entry["value"] = value
+        else:
+            template = templates[band]
+            entry = template.copy()
+            entry["value"] = value
+            entry["explanation"] = template["explanation"].copy()
+        if better_when_lower is not None and history_data:
+            trend, sparkline = _trend_and_sparkline(history_data, rule_id, value, better_when_lower)
+            if trend:
+                entry["trend"] = trend
+            if sparkline:
+                entry["sparkline"] = sparkline
+        signals.append(entry)
+
+    return {
+        "signals": signals,
+        "risks": sorted({r for e in fired for r in e[0]}),
+        "recommendations": sorted({r for e in fired for r in e[1]}),
+        "doctor_flags": sorted({f for e in fired for f in e[2]}),
+    }
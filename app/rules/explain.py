@@ -0,0 +1,40 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Tuple
+
+# Interned explanation text; unresolved facts refer to entries by position (explanation_id).
+EXPLANATION_TEXT: List[Dict[str, str]] = []
+_IDS: Dict[Tuple[Tuple[str, str], ...], int] = {}
+
+
+def intern_explanation(text: Dict[str, str]) -> int:
+    """Id of `text` in EXPLANATION_TEXT, adding it on first sight."""
+    key = tuple(text.items())
+    if key not in _IDS:
+        _IDS[key] = len(EXPLANATION_TEXT)
+        EXPLANATION_TEXT.append(dict(text))
+    return _IDS[key]
+
+
+def explanation_of(signal: Dict[str, Any]) -> Dict[str, str]:
+    """A signal's explanation text, whether resolved or still carried as `explanation_id`.
+    The text of an unresolved signal is the shared interned dict; do not modify it."""
+    if "explanation_id" in signal:
+        return EXPLANATION_TEXT[signal["explanation_id"]]
+    return signal.get("explanation") or {}
+
+
+def resolve_explanations(facts: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace each signal's `explanation_id` with its own copy of the text, in place.
+    Keys keep their positions, so resolved facts equal evaluate_health's output."""
+    signals = facts.get("signals")
+    if signals:
+        facts["signals"] = [
+            {
+                ("explanation" if k == "explanation_id" else k): (EXPLANATION_TEXT[v].copy() if k == "explanation_id" else v)
+                for k, v in sig.items()
+            }
+            if "explanation_id" in sig
+            else sig
+            for sig in signals
+        ]
+    return facts
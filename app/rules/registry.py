@@ -0,0 +1,132 @@
+from __future__ import annotations
+from bisect import bisect_left
+from itertools import product
+from typing import Any, Dict, List, Sequence, Tuple
+
+from app.rules.explain import EXPLANATION_TEXT, intern_explanation
+from app.rules.schema import AllOf, AnyOf, Band, Range, SignalRule
+from app.rules.table import RULES
+
+NO_BAND = -1
+
+
+def _segment(edges: List[float], value: Any) -> int:
+    """
+    Position of `value` among sorted edges: 2*i for the gap below edges[i], 2*i + 1 for
+    edges[i] itself, 2*len(edges) above the last edge and 2*len(edges) + 1 for NaN.
+    """
+    if value != value:
+        return 2 * len(edges) + 1
+    i = bisect_left(edges, value)
+    if i < len(edges) and edges[i] == value:
+        return 2 * i + 1
+    return 2 * i
+
+
+def _representatives(edges: List[float]) -> List[float]:
+    """One sample value per segment, in segment order."""
+    samples = [edges[0] - 1 if edges else 0.0]
+    for i, edge in enumerate(edges):
+        samples.append(edge)
+        samples.append((edge + edges[i + 1]) / 2 if i + 1 < len(edges) else edge + 1)
+    samples.append(float("nan"))
+    return samples
+
+
+def _ranges_for(band: Band, key: str) -> List[Range]:
+    when = band.when
+    if isinstance(when, Range):
+        return [when]
+    if isinstance(when, (AllOf, AnyOf)):
+        return [when.ranges[key]] if key in when.ranges else []
+    return []
+
+
+class CompiledRule:
+    """
+    A SignalRule flattened into a lookup grid. Each input key's thresholds split the number
+    line into segments; every combination of segments maps to the first band that matches,
+    so evaluating a value is a bisect per key plus one list index.
+    """
+
+    def __init__(self, rule: SignalRule, order: int):
+        self.rule = rule
+        self.order = order
+        self.keys = rule.input_keys
+        self.bands = rule.bands
+        self.edges: List[List[float]] = [
+            sorted({e for band in rule.bands for r in _ranges_for(band, key) for e in r.edges()})
+            for key in self.keys
+        ]
+        sizes = [2 * len(edges) + 2 for edges in self.edges]
+        self.strides: List[int] = []
+        stride = 1
+        for size in reversed(sizes):
+            self.strides.insert(0, stride)
+            stride *= size
+        self.grid: List[int] = [
+            self._first_match(dict(zip(self.keys, sample)))
+            for sample in product(*(_representatives(edges) for edges in self.edges))
+        ]
+        self.templates: List[Dict[str, Any]] = []
+        # Same entries with the explanation left as its interned id, for lazy evaluation.
+        self.lazy_templates: List[Dict[str, Any]] = []
+        for band in rule.bands:
+            explanation_id = intern_explanation(band.explanation)
+            base = {
+                "name": rule.name,
+                "value": None,
+                "status": band.status,
+                "severity": band.severity,
+                "details": band.details,
+            }
+            self.templates.append({**base, "explanation": EXPLANATION_TEXT[explanation_id]})
+            self.lazy_templates.append({**base, "explanation_id": explanation_id})
+        # (risks, recommendations, doctor_flags) per band, None when a band adds nothing
+        self.effects: List[Any] = [
+            (band.risks, band.recommendations, band.doctor_flags)
+            if band.risks or band.recommendations or band.doctor_flags
+            else None
+            for band in rule.bands
+        ]
+
+    def _first_match(self, values: Dict[str, Any]) -> int:
+        for i, band in enumerate(self.bands):
+            if band.matches(values):
+                return i
+        return NO_BAND
+
+    def lookup(self, values: Sequence[Any]) -> int:
+        """Band index for the given input values (in `keys` order), or NO_BAND."""
+        if len(values) == 1:
+            return self.grid[_segment(self.edges[0], values[0])]
+        idx = 0
+        for edges, stride, value in zip(self.edges, self.strides, values):
+            idx += _segment(edges, value) * stride
+        return self.grid[idx]
+
+
+COMPILED: List[CompiledRule] = [CompiledRule(rule, i) for i, rule in enumerate(RULES)]
+
+# Raw input key -> position of the rule that reads it, so evaluation only visits present keys.
+RULE_INDEX_BY_KEY: Dict[str, int] = {key: c.order for c in COMPILED for key in c.keys}
+
+# Flattened per-rule fields for the scalar hot path:
+# (id, single input key or None, edges of that key, grid, templates, effects, better_when_lower)
+SCALAR_PLAN: List[Tuple[Any, ...]] = [
+    (
+        c.rule.id,
+        c.keys[0] if len(c.keys) == 1 and c.rule.flag_value is None else None,
+        c.edges[0],
+        c.grid,
+        c.templates,
+        c.lazy_templates,
+        c.effects,
+        c.rule.better_when_lower,
+    )
+    for c in COMPILED
+]
+
+TREND_RULES: Dict[str, bool] = {
+    rule.id: rule.better_when_lower for rule in RULES if rule.better_when_lower is not None
+}
@@ -0,0 +1,99 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+@dataclass(frozen=True)
+class Range:
+    """Numeric interval on a single input; unset bounds are open-ended."""
+    gt: Optional[float] = None
+    ge: Optional[float] = None
+    lt: Optional[float] = None
+    le: Optional[float] = None
+
+    def contains(self, value: Any) -> bool:
+        # Mirrors chained comparisons: NaN never satisfies a bound.
+        if self.gt is not None and not value > self.gt:
+            return False
+        if self.ge is not None and not value >= self.ge:
+            return False
+        if self.lt is not None and not value < self.lt:
+            return False
+        if self.le is not None and not value <= self.le:
+            return False
+        return True
+
+    def edges(self) -> Tuple[float, ...]:
+        return tuple(b for b in (self.gt, self.ge, self.lt, self.le) if b is not None)
+
+
+@dataclass(frozen=True)
+class AllOf:
+    """Matches when every keyed range matches (for rules over several inputs)."""
+    ranges: Dict[str, Range]
+
+    def __init__(self, **ranges: Range):
+        object.__setattr__(self, "ranges", ranges)
+
+    def matches(self, values: Dict[str, Any]) -> bool:
+        return all(r.contains(values[k]) for k, r in self.ranges.items())
+
+
+@dataclass(frozen=True)
+class AnyOf:
+    """Matches when at least one keyed range matches."""
+    ranges: Dict[str, Range]
+
+    def __init__(self, **ranges: Range):
+        object.__setattr__(self, "ranges", ranges)
+
+    def matches(self, values: Dict[str, Any]) -> bool:
+        return any(r.contains(values[k]) for k, r in self.ranges.items())
+
+
+Condition = Union[Range, AllOf, AnyOf, None]
+
+
+@dataclass(frozen=True)
+class Band:
+    """
+    One outcome of a signal rule. Bands are tried in declaration order and the first
+    whose `when` matches wins; a band without `when` is the catch-all.
+    """
+    status: str
+    severity: str
+    explanation: Dict[str, str]
+    when: Condition = None
+    details: str = ""
+    risks: Tuple[str, ...] = ()
+    recommendations: Tuple[str, ...] = ()
+    doctor_flags: Tuple[str, ...] = ()
+
+    def matches(self, values: Dict[str, Any]) -> bool:
+        if self.when is None:
+            return True
+        if isinstance(self.when, Range):
+            (value,) = values.values()
+            return self.when.contains(value)
+        return self.when.matches(values)
+
+
+@dataclass(frozen=True)
+class SignalRule:
+    """
+    Declarative rule for one signal.
+    `keys` are the raw inputs the rule reads (all must be present). When several keys are
+    read, `value_fields` names them in the reported value. A rule with `flag_value` fires
+    on any truthy input and reports that value instead of the raw one.
+    """
+    id: str
+    name: str
+    bands: Tuple[Band, ...]
+    keys: Tuple[str, ...] = ()
+    value_fields: Tuple[str, ...] = ()
+    better_when_lower: Optional[bool] = None  # None: no trend for this signal
+    flag_value: Optional[str] = None
+    input_keys: Tuple[str, ...] = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "input_keys", self.keys or (self.id,))
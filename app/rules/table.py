@@ -0,0 +1,689 @@
+from __future__ import annotations
+from typing import Dict, List
+
+from app.rules.schema import AllOf, AnyOf, Band, Range, SignalRule
+
+
+def _explanation(rule: str, threshold: str, why: str) -> Dict[str, str]:
+    return {
+        "rule": rule,
+        "threshold": threshold,
+        "why_it_matters": why,
+    }
+
+
+# Declarative rule table. Order here is the order signals appear in the facts.
+# Within a rule, bands are tried top to bottom exactly like an if/elif chain;
+# a band without `when` is the trailing else.
+RULES: List[SignalRule] = [
+    # --- Metabolic: Fasting glucose ---
+    SignalRule(
+        "fasting_glucose",
+        "Fasting Glucose",
+        better_when_lower=True,
+        bands=(
+            Band(
+                "normal", "low",
+                _explanation(
+                    "Fasting glucose is normal when below 100 mg/dL after an overnight fast.",
+                    "<100 mg/dL fasting",
+                    "Normal fasting glucose suggests low current risk for insulin resistance.",
+                ),
+                when=Range(lt=100),
+            ),
+            Band(
+                "prediabetes_range", "moderate",
+                _explanation(
+                    "Prediabetes is flagged when fasting glucose is between 100 and 125 mg/dL.",
+                    "100-125 mg/dL fasting",
+                    "Elevated fasting glucose over time can indicate insulin resistance.",
+                ),
+                when=Range(ge=100, le=125),
+                risks=("insulin_resistance",),
+                recommendations=("Light physical activity after meals", "Reduce refined sugar intake"),
+            ),
+            Band(
+                "diabetes_range", "high",
+                _explanation(
+                    "Diabetes-range fasting glucose is 126 mg/dL or higher.",
+                    ">=126 mg/dL fasting",
+                    "Sustained high fasting glucose is linked to diabetes complications.",
+                ),
+                risks=("type_2_diabetes_risk",),
+                recommendations=("Schedule medical review for glucose",),
+                doctor_flags=("Consult a doctor for diabetes evaluation",),
+            ),
+        ),
+    ),
+    # --- Cardiovascular: Blood pressure ---
+    SignalRule(
+        "blood_pressure",
+        "Blood Pressure",
+        keys=("bp_systolic", "bp_diastolic"),
+        value_fields=("systolic", "diastolic"),
+        bands=(
+            Band(
+                "normal", "low",
+                _explanation(
+                    "Normal blood pressure is below 120 systolic and 80 diastolic.",
+                    "<120/<80 mmHg",
+                    "Healthy blood pressure reduces strain on the heart and arteries.",
+                ),
+                when=AllOf(bp_systolic=Range(lt=120), bp_diastolic=Range(lt=80)),
+                details="Below 120/80",
+            ),
+            Band(
+                "elevated", "low",
+                _explanation(
+                    "Elevated blood pressure is 120-129 systolic with diastolic below 80.",
+                    "120-129 / <80 mmHg",
+                    "Early elevation can progress; monitoring and lifestyle can help control it.",
+                ),
+                when=AllOf(bp_systolic=Range(ge=120, le=129), bp_diastolic=Range(lt=80)),
+                details="120-129 systolic, diastolic <80",
+                recommendations=("Monitor blood pressure and reduce sodium",),
+            ),
+            Band(
+                "stage_1_hypertension", "moderate",
+                _explanation(
+                    "Stage 1 hypertension is 130-139 systolic or 80-89 diastolic.",
+                    "130-139 or 80-89 mmHg",
+                    "Higher pressures raise heart and vessel strain; lifestyle can reduce risk.",
+                ),
+                when=AnyOf(bp_systolic=Range(ge=130, le=139), bp_diastolic=Range(ge=80, le=89)),
+                details="130-139 systolic or 80-89 diastolic",
+                risks=("cardiovascular_risk",),
+                recommendations=("Lifestyle changes for blood pressure (salt, activity, weight)",),
+            ),
+            Band(
+                "stage_2_hypertension", "high",
+                _explanation(
+                    "Stage 2 hypertension is 140-180 systolic or 90-120 diastolic.",
+                    "140-180 or 90-120 mmHg",
+                    "Sustained high pressure meaningfully increases cardiovascular risk.",
+                ),
+                when=AnyOf(bp_systolic=Range(ge=140, le=180), bp_diastolic=Range(ge=90, le=120)),
+                details="140-180 systolic or 90-120 diastolic",
+                risks=("cardiovascular_risk",),
+                recommendations=("Consistent home BP monitoring",),
+                doctor_flags=("Discuss blood pressure management with a clinician",),
+            ),
+            Band(
+                "hypertensive_crisis", "critical",
+                _explanation(
+                    "Hypertensive crisis is when systolic is over 180 or diastolic over 120.",
+                    ">180 or >120 mmHg",
+                    "This level can cause organ damage; urgent care is recommended.",
+                ),
+                when=AnyOf(bp_systolic=Range(gt=180), bp_diastolic=Range(gt=120)),
+                details=">180 systolic or >120 diastolic",
+                risks=("cardiovascular_risk",),
+                doctor_flags=("Seek urgent care for severe blood pressure reading",),
+            ),
+            # Readings that fall between the published bands keep the healthy default.
+            Band(
+                "normal", "low",
+                _explanation(
+                    "Normal blood pressure is below 120 systolic and 80 diastolic.",
+                    "<120/<80 mmHg",
+                    "Healthy blood pressure reduces strain on the heart and arteries.",
+                ),
+                details="Blood pressure in healthy range",
+            ),
+        ),
+    ),
+    # --- Lipids ---
+    SignalRule(
+        "total_cholesterol",
+        "Total Cholesterol",
+        better_when_lower=True,
+        bands=(
+            Band(
+                "desirable", "low",
+                _explanation(
+                    "Desirable total cholesterol is below 200 mg/dL.",
+                    "<200 mg/dL",
+                    "Lower total cholesterol is generally linked to lower cardiovascular risk.",
+                ),
+                when=Range(lt=200),
+            ),
+            Band(
+                "borderline_high", "moderate",
+                _explanation(
+                    "Borderline high total cholesterol is 200-239 mg/dL.",
+                    "200-239 mg/dL",
+                    "Elevated cholesterol can contribute to plaque buildup over time.",
+                ),
+                when=Range(ge=200, le=239),
+                risks=("cardiovascular_risk",),
+                recommendations=("Increase soluble fiber and reduce saturated fat",),
+            ),
+            Band(
+                "high", "high",
+                _explanation(
+                    "High total cholesterol is 240 mg/dL or higher.",
+                    ">=240 mg/dL",
+                    "High cholesterol increases cardiovascular risk and may need treatment.",
+                ),
+                risks=("cardiovascular_risk",),
+                recommendations=("Review lipid profile with a clinician",),
+            ),
+        ),
+    ),
+    SignalRule(
+        "ldl",
+        "LDL",
+        better_when_lower=True,
+        bands=(
+            Band(
+                "optimal", "low",
+                _explanation(
+                    "Optimal LDL is below 100 mg/dL.",
+                    "<100 mg/dL",
+                    "Lower LDL means less LDL available to form arterial plaque.",
+                ),
+                when=Range(lt=100),
+            ),
+            Band(
+                "near_optimal", "low",
+                _explanation(
+                    "Near-optimal LDL is 100-129 mg/dL.",
+                    "100-129 mg/dL",
+                    "Staying below 130 keeps LDL-related risk lower.",
+                ),
+                when=Range(ge=100, le=129),
+            ),
+            Band(
+                "borderline_high", "moderate",
+                _explanation(
+                    "Borderline high LDL is 130-159 mg/dL.",
+                    "130-159 mg/dL",
+                    "Higher LDL can accelerate plaque buildup over time.",
+                ),
+                when=Range(ge=130, le=159),
+                risks=("cardiovascular_risk",),
+                recommendations=("Dietary adjustments to lower LDL",),
+            ),
+            Band(
+                "high", "high",
+                _explanation(
+                    "High LDL is 160-189 mg/dL.",
+                    "160-189 mg/dL",
+                    "High LDL is linked to higher cardiovascular risk; review with a clinician.",
+                ),
+                when=Range(ge=160, le=189),
+                risks=("cardiovascular_risk",),
+                doctor_flags=("Consider medical review for high LDL",),
+            ),
+            Band(
+                "very_high", "high",
+                _explanation(
+                    "Very high LDL is 190 mg/dL or above.",
+                    ">=190 mg/dL",
+                    "Very high LDL carries significant cardiovascular risk.",
+                ),
+                risks=("cardiovascular_risk",),
+                doctor_flags=("High LDL requires medical follow-up",),
+            ),
+        ),
+    ),
+    SignalRule(
+        "hdl",
+        "HDL",
+        better_when_lower=False,
+        bands=(
+            Band(
+                "low", "moderate",
+                _explanation(
+                    "Low HDL is below 40 mg/dL.",
+                    "<40 mg/dL",
+                    "Lower HDL means less protective cholesterol transport.",
+                ),
+                when=Range(lt=40),
+                details="Low protective HDL",
+                risks=("cardiovascular_risk",),
+                recommendations=("Increase physical activity to raise HDL",),
+            ),
+            Band(
+                "protective", "low",
+                _explanation(
+                    "HDL of 60 mg/dL or higher is considered protective.",
+                    ">=60 mg/dL",
+                    "Higher HDL helps remove cholesterol from arteries.",
+                ),
+                when=Range(ge=60),
+            ),
+            Band(
+                "acceptable", "low",
+                _explanation(
+                    "Acceptable HDL is between 40 and 59 mg/dL.",
+                    "40-59 mg/dL",
+                    "HDL in this range provides some protective effect.",
+                ),
+            ),
+        ),
+    ),
+    SignalRule(
+        "triglycerides",
+        "Triglycerides",
+        better_when_lower=True,
+        bands=(
+            Band(
+                "normal", "low",
+                _explanation(
+                    "Normal triglycerides are below 150 mg/dL.",
+                    "<150 mg/dL",
+                    "Normal triglycerides are linked to lower cardiovascular risk.",
+                ),
+                when=Range(lt=150),
+            ),
+            Band(
+                "borderline_high", "moderate",
+                _explanation(
+                    "Borderline high triglycerides are 150-199 mg/dL.",
+                    "150-199 mg/dL",
+                    "Higher triglycerides can contribute to metabolic and cardiovascular risk.",
+                ),
+                when=Range(ge=150, le=199),
+                recommendations=("Reduce refined carbs and alcohol",),
+            ),
+            Band(
+                "high", "high",
+                _explanation(
+                    "High triglycerides are 200-499 mg/dL.",
+                    "200-499 mg/dL",
+                    "Elevated triglycerides increase cardiovascular risk and may need treatment.",
+                ),
+                when=Range(ge=200, le=499),
+                risks=("cardiovascular_risk",),
+                doctor_flags=("High triglycerides - discuss with clinician",),
+            ),
+            Band(
+                "very_high", "critical",
+                _explanation(
+                    "Very high triglycerides are 500 mg/dL or higher.",
+                    ">=500 mg/dL",
+                    "Very high triglycerides raise pancreatitis and cardiovascular risk.",
+                ),
+                risks=("cardiovascular_risk",),
+                doctor_flags=("Very high triglycerides - seek medical review",),
+            ),
+        ),
+    ),
+    # --- Sleep ---
+    SignalRule(
+        "sleep_hours",
+        "Sleep Duration",
+        bands=(
+            Band(
+                "severe_sleep_debt", "high",
+                _explanation(
+                    "Severe sleep debt when sleep is under 5 hours.",
+                    "<5 hours",
+                    "Very short sleep impairs cognition, metabolism, and cardiovascular health.",
+                ),
+                when=Range(lt=5),
+                risks=("sleep_deprivation_risk",),
+                recommendations=("Prioritize sleep extension and consistent schedule",),
+            ),
+            Band(
+                "insufficient_sleep", "moderate",
+                _explanation(
+                    "Sleep under 7 hours is considered insufficient for most adults.",
+                    "5-6 hours",
+                    "Insufficient sleep can affect mood, glucose, and blood pressure.",
+                ),
+                when=Range(ge=5, lt=7),
+                recommendations=("Aim for 7-9 hours with consistent bedtime",),
+            ),
+            Band(
+                "optimal", "low",
+                _explanation(
+                    "Optimal sleep for most adults is 7-9 hours.",
+                    "7-9 hours",
+                    "Adequate sleep supports recovery, mood, and metabolic health.",
+                ),
+                when=Range(ge=7, le=9),
+            ),
+            Band(
+                "long_sleep", "context",
+                _explanation(
+                    "Long sleep is above 9 hours for most adults.",
+                    ">9 hours",
+                    "Long sleep can be normal for some but may signal underlying issues if new.",
+                ),
+                recommendations=("Review long sleep if accompanied by fatigue",),
+            ),
+        ),
+    ),
+    # --- Activity ---
+    SignalRule(
+        "activity_minutes",
+        "Activity",
+        bands=(
+            Band(
+                "sedentary", "moderate",
+                _explanation(
+                    "Sedentary when activity is under ~20 minutes per day.",
+                    "<20 minutes/day",
+                    "Very low activity can worsen metabolic and cardiovascular health.",
+                ),
+                when=Range(lt=20),
+                recommendations=("Light walks after meals",),
+            ),
+            Band(
+                "light", "moderate",
+                _explanation(
+                    "Light activity around 20-39 minutes per day.",
+                    "20-39 minutes/day",
+                    "Gradually increasing activity improves cardiovascular and metabolic health.",
+                ),
+                when=Range(ge=20, lt=40),
+                recommendations=("Build toward 40-60 minutes most days",),
+            ),
+            Band(
+                "moderate", "low",
+                _explanation(
+                    "Moderate activity around 40-60 minutes per day.",
+                    "40-60 minutes/day",
+                    "Consistent moderate activity supports heart and glucose health.",
+                ),
+                when=Range(ge=40, le=60),
+            ),
+            Band(
+                "active", "low",
+                _explanation(
+                    "Active when exceeding ~60 minutes per day.",
+                    ">60 minutes/day",
+                    "Higher activity levels generally support cardiovascular health.",
+                ),
+            ),
+        ),
+    ),
+    # --- Nutrition / labs ---
+    SignalRule(
+        "bmi",
+        "BMI",
+        better_when_lower=True,
+        bands=(
+            Band(
+                "underweight", "context",
+                _explanation(
+                    "BMI under 18.5 is considered underweight.",
+                    "<18.5",
+                    "Underweight BMI can be associated with nutrient gaps and low reserves.",
+                ),
+                when=Range(lt=18.5),
+                recommendations=("Discuss nutrition to reach healthy weight",),
+            ),
+            Band(
+                "normal", "low",
+                _explanation(
+                    "BMI 18.5-24.9 is considered normal weight range.",
+                    "18.5-24.9",
+                    "Normal BMI is linked with lower cardiometabolic risk on average.",
+                ),
+                when=Range(ge=18.5, lt=25),
+            ),
+            Band(
+                "overweight", "moderate",
+                _explanation(
+                    "BMI 25-29.9 is categorized as overweight.",
+                    "25-29.9",
+                    "Higher BMI can increase cardiometabolic risk over time.",
+                ),
+                when=Range(ge=25, lt=30),
+                recommendations=("Focus on gradual weight loss and activity",),
+            ),
+            Band(
+                "obesity", "high",
+                _explanation(
+                    "BMI 30 or higher is categorized as obesity.",
+                    ">=30",
+                    "Obesity is linked with higher cardiometabolic risk; structured support helps.",
+                ),
+                risks=("cardiometabolic_risk",),
+                recommendations=("Structured weight plan with clinician input",),
+            ),
+        ),
+    ),
+    SignalRule(
+        "vitamin_d",
+        "Vitamin D",
+        bands=(
+            Band(
+                "deficient", "moderate",
+                _explanation(
+                    "Vitamin D deficiency is below 20 ng/mL.",
+                    "<20 ng/mL",
+                    "Low vitamin D can affect bone health and immunity; supplementation may help.",
+                ),
+                when=Range(lt=20),
+                recommendations=("Discuss supplementation with clinician",),
+            ),
+            Band(
+                "insufficient", "moderate",
+                _explanation(
+                    "Vitamin D insufficiency is 20-29 ng/mL.",
+                    "20-29 ng/mL",
+                    "Raising vitamin D can support bone and immune health.",
+                ),
+                when=Range(ge=20, lt=30),
+                recommendations=("Increase safe sunlight or dietary vitamin D",),
+            ),
+            Band(
+                "adequate", "low",
+                _explanation(
+                    "Vitamin D of 30 ng/mL or higher is generally adequate.",
+                    ">=30 ng/mL",
+                    "Adequate vitamin D supports bone and immune function.",
+                ),
+            ),
+        ),
+    ),
+    SignalRule(
+        "vitamin_b12",
+        "Vitamin B12",
+        bands=(
+            Band(
+                "deficient", "moderate",
+                _explanation(
+                    "Vitamin B12 deficiency is below 200 pg/mL.",
+                    "<200 pg/mL",
+                    "Very low B12 can cause anemia and neurologic symptoms.",
+                ),
+                when=Range(lt=200),
+                recommendations=("Assess B12 intake or absorption with clinician",),
+            ),
+            Band(
+                "borderline_low", "moderate",
+                _explanation(
+                    "Borderline low B12 is 200-299 pg/mL.",
+                    "200-299 pg/mL",
+                    "Borderline B12 can precede deficiency; monitoring is helpful.",
+                ),
+                when=Range(ge=200, lt=300),
+                recommendations=("Increase B12 sources and recheck",),
+            ),
+            Band(
+                "adequate", "low",
+                _explanation(
+                    "Vitamin B12 of 300 pg/mL or higher is generally adequate.",
+                    ">=300 pg/mL",
+                    "Adequate B12 supports red blood cells and nerve health.",
+                ),
+            ),
+        ),
+    ),
+    SignalRule(
+        "ferritin",
+        "Ferritin",
+        bands=(
+            Band(
+                "low", "moderate",
+                _explanation(
+                    "Ferritin below 30 ng/mL can indicate low iron stores.",
+                    "<30 ng/mL",
+                    "Low ferritin may reflect iron deficiency, affecting energy and hair/skin.",
+                ),
+                when=Range(lt=30),
+                risks=("iron_deficiency_risk",),
+                recommendations=("Check iron intake and discuss with clinician",),
+            ),
+            Band(
+                "high", "moderate",
+                _explanation(
+                    "Ferritin above 400 ng/mL is higher than typical reference ranges.",
+                    ">400 ng/mL",
+                    "High ferritin can indicate inflammation or iron overload and needs review.",
+                ),
+                when=Range(gt=400),
+                doctor_flags=("High ferritin - consider clinical evaluation",),
+            ),
+            Band(
+                "normal", "low",
+                _explanation(
+                    "Ferritin between 30 and 400 ng/mL is within common reference ranges.",
+                    "30-400 ng/mL",
+                    "Ferritin in range suggests adequate iron stores.",
+                ),
+            ),
+        ),
+    ),
+    # --- Reproductive health ---
+    SignalRule(
+        "cycle_length_days",
+        "Menstrual Cycle",
+        bands=(
+            Band(
+                "very_short_cycle", "moderate",
+                _explanation(
+                    "Very short cycles are under 21 days.",
+                    "<21 days",
+                    "Short cycles can be normal for some but may reflect hormonal shifts.",
+                ),
+                when=Range(lt=21),
+                recommendations=("Track cycles; consider clinician review",),
+            ),
+            Band(
+                "regular_cycle_range", "low",
+                _explanation(
+                    "Regular cycle range is typically 21-35 days.",
+                    "21-35 days",
+                    "Cycles in this range are common for many menstruating people.",
+                ),
+                when=Range(ge=21, le=35),
+            ),
+            Band(
+                "long_cycle", "moderate",
+                _explanation(
+                    "Long cycles are over 35 days.",
+                    ">35 days",
+                    "Long cycles can be normal for some but may warrant review if persistent.",
+                ),
+                when=Range(gt=35),
+                recommendations=("Irregular or long cycles - monitor and consult if persistent",),
+            ),
+        ),
+    ),
+    SignalRule(
+        "periods_missed",
+        "Periods Missed",
+        bands=(
+            Band(
+                "missed_cycles", "moderate",
+                _explanation(
+                    "Missing two or more cycles in a row should be evaluated.",
+                    ">=2 missed cycles",
+                    "Missed cycles can have many causes including pregnancy or hormonal changes.",
+                ),
+                when=Range(ge=2),
+                doctor_flags=("Multiple missed cycles - consider medical evaluation",),
+            ),
+        ),
+    ),
+    SignalRule(
+        "cycle_irregular",
+        "Cycle Regularity",
+        flag_value="irregular",
+        bands=(
+            Band(
+                "irregular_cycles", "moderate",
+                _explanation(
+                    "Irregular cycles vary significantly month to month.",
+                    "Irregular pattern",
+                    "Cycle irregularity can stem from stress, weight changes, or medical causes.",
+                ),
+                recommendations=("Track cycles and discuss patterns with clinician",),
+            ),
+        ),
+    ),
+    # --- Mental / lifestyle ---
+    SignalRule(
+        "stress_level",
+        "Stress",
+        bands=(
+            Band(
+                "high_stress", "moderate",
+                _explanation(
+                    "High self-reported stress when above 7/10.",
+                    ">7/10",
+                    "High stress can affect sleep, blood pressure, and glucose control.",
+                ),
+                when=Range(gt=7),
+                recommendations=("Short daily stress-reduction practice",),
+            ),
+            Band(
+                "moderate_stress", "moderate",
+                _explanation(
+                    "Moderate stress self-rating between 5 and 7/10.",
+                    "5-7/10",
+                    "Sustained moderate stress can accumulate; coping strategies help.",
+                ),
+                when=Range(ge=5, le=7),
+            ),
+            Band(
+                "manageable_stress", "low",
+                _explanation(
+                    "Manageable stress when reported under 5/10.",
+                    "<5/10",
+                    "Lower stress reports suggest current coping is effective.",
+                ),
+            ),
+        ),
+    ),
+    SignalRule(
+        "mood_variability",
+        "Mood Variability",
+        bands=(
+            Band(
+                "high_variability", "moderate",
+                _explanation(
+                    "High mood variability when swings are above 7/10.",
+                    ">7/10 variability",
+                    "Large mood swings can affect functioning; tracking helps spot patterns.",
+                ),
+                when=Range(gt=7),
+                recommendations=("Keep a brief mood log and seek support if worsening",),
+            ),
+            Band(
+                "some_variability", "context",
+                _explanation(
+                    "Some mood variability when swings are 4-7/10.",
+                    "4-7/10 variability",
+                    "Moderate swings can be normal but worth observing over time.",
+                ),
+                when=Range(ge=4, le=7),
+            ),
+            Band(
+                "stable", "low",
+                _explanation(
+                    "Stable mood when variability is under 4/10.",
+                    "<4/10 variability",
+                    "Stable moods suggest current routines are supporting mental health.",
+                ),
+            ),
+        ),
+    ),
+
+]
@@ -0,0 +1,295 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import TREND_STATE_MAX_POINTS
+
+TOLERANCE = 1  # buffer to ignore very small changes
+
+# Below this many points the plain loop beats NumPy's per-call overhead; scripts/bench_trend.py
+# puts the crossover at about 60 points, and the kernel is steadily ahead from 80.
+VECTOR_MIN_POINTS = 80
+
+
+def _format_series(values: Sequence[Any]) -> str:
+    return " -> ".join(str(v) for v in values)
+
+
+def _direction(weighted_change: float, better_when_lower: bool) -> str:
+    if better_when_lower:
+        if weighted_change < -TOLERANCE:
+            return "improving"
+        if weighted_change > TOLERANCE:
+            return "worsening"
+        return "stable"
+    if weighted_change > TOLERANCE:
+        return "improving"
+    if weighted_change < -TOLERANCE:
+        return "worsening"
+    return "stable"
+
+
+def _primary_sign(direction: str, better_when_lower: bool) -> int:
+    if direction == "improving":
+        return -1 if better_when_lower else 1
+    if direction == "worsening":
+        return 1 if better_when_lower else -1
+    return 0
+
+
+def _trend_result(
+    series: Sequence[Any],
+    weighted_change: float,
+    direction: str,
+    consistency_ratio: float,
+) -> Dict[str, Any]:
+    # Confidence factors
+    data_factor = min(len(series), 5) / 5 * 40  # up to 40 for more points
+    consistency_factor = consistency_ratio * 40  # up to 40 for consistent direction
+    magnitude_factor = min(abs(weighted_change) / (TOLERANCE * 3), 1) * 20  # up to 20 for larger moves
+    confidence = round(min(100, max(10, data_factor + consistency_factor + magnitude_factor)))
+
+    explanation = (
+        f"Recent readings weighted more; values: {_format_series(series)}; "
+        f"weighted change {round(weighted_change, 1)}"
+    )
+
+    return {
+        "direction": direction,
+        "confidence": confidence,
+        "explanation": explanation,
+    }
+
+
+def _loop_trend(series: List[Any], better_when_lower: bool) -> Dict[str, Any]:
+    diffs = []
+    weights = []
+    # Weight recent deltas more (linear ramp up to 1.0)
+    for i in range(len(series) - 1):
+        diff = series[i + 1] - series[i]
+        weight = (i + 1) / (len(series) - 1)
+        diffs.append(diff)
+        weights.append(weight)
+
+    weighted_change = sum(d * w for d, w in zip(diffs, weights))
+    direction = _direction(weighted_change, better_when_lower)
+
+    # Consistency: how aligned the diffs are with overall direction
+    primary_sign = _primary_sign(direction, better_when_lower)
+    valid_diffs = [d for d in diffs if abs(d) > TOLERANCE]
+    if valid_diffs and primary_sign != 0:
+        aligned = sum(1 for d in valid_diffs if (d > 0 and primary_sign > 0) or (d < 0 and primary_sign < 0))
+        consistency_ratio = aligned / len(valid_diffs)
+    else:
+        consistency_ratio = 0.5  # neutral when limited signal
+
+    return _trend_result(series, weighted_change, direction, consistency_ratio)
+
+
+def trend_kernel(
+    series: Sequence[Any],
+    better_when_lower: bool,
+    window: Optional[int] = None,
+    decay: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    NumPy trend over a full series (history followed by the current value).
+    window: only the last `window` points are considered.
+    decay: per-step weight multiplier in (0, 1]; the latest change has weight 1.0, the one
+    before it `decay`, then `decay**2`, and so on. Without it the linear ramp of
+    _compute_trend is used.
+    """
+    if window is not None:
+        if window < 2:
+            raise ValueError("window must cover at least two points")
+        series = series[-window:]
+    if decay is not None and not 0 < decay <= 1:
+        raise ValueError("decay must be in (0, 1]")
+    if len(series) < 2:
+        return None
+
+    values = np.asarray(series, dtype=float)
+    diffs = np.diff(values)
+    if decay is None:
+        # Same products as _loop_trend, summed left to right like its sum(), so the two agree
+        # to the last bit (NumPy's pairwise sum could move round-half ties in the text).
+        weights = np.arange(1, diffs.size + 1, dtype=float) / diffs.size
+        weighted_change = sum((diffs * weights).tolist())
+    else:
+        weights = decay ** np.arange(diffs.size - 1, -1, -1, dtype=float)
+        weighted_change = float(weights @ diffs)
+    direction = _direction(weighted_change, better_when_lower)
+
+    primary_sign = _primary_sign(direction, better_when_lower)
+    valid = np.abs(diffs) > TOLERANCE
+    n_valid = int(np.count_nonzero(valid))
+    if n_valid and primary_sign != 0:
+        aligned = int(np.count_nonzero(valid & (np.sign(diffs) == primary_sign)))
+        consistency_ratio = aligned / n_valid
+    else:
+        consistency_ratio = 0.5  # neutral when limited signal
+
+    return _trend_result(series, weighted_change, direction, consistency_ratio)
+
+
+def _compute_trend(
+    history_values: Sequence[Any],
+    current_value: Any,
+    better_when_lower: bool,
+    window: Optional[int] = None,
+    decay: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Trend with deterministic confidence and recency weighting.
+    More recent differences carry higher weight; tiny changes within tolerance are treated as stable.
+    Long histories, windows and decay weighting go through the NumPy kernel.
+    """
+    if len(history_values) == 0:
+        return None
+
+    series = list(history_values) + [current_value]
+    if len(series) < 2:
+        return None
+
+    if window is not None or decay is not None or len(series) >= VECTOR_MIN_POINTS:
+        return trend_kernel(series, better_when_lower, window=window, decay=decay)
+    return _loop_trend(series, better_when_lower)
+
+
+@dataclass
+class TrendState:
+    """
+    Per-user trend accumulator for one signal, updated in O(1) per reading. The linear recency
+    ramp telescopes to `current - mean(history)`, so the running total and count give the
+    weighted change, and counts of rising and falling steps beyond TOLERANCE give the
+    consistency; neither rescans the history. The last `max_points` readings are kept only for
+    the explanation text and sparkline, which list them.
+
+    The closed form is the exact weighted change, while the list path adds its ramp term by
+    term in floating point. They can part in the last bits, which only shows when the change
+    sits exactly on a TOLERANCE edge or on a rounding tie of the explanation's one decimal.
+    """
+    count: int = 0
+    total: float = 0.0
+    last: Optional[float] = None
+    rising: int = 0
+    falling: int = 0
+    values: List[Any] = field(default_factory=list)
+    max_points: int = TREND_STATE_MAX_POINTS
+
+    @classmethod
+    def from_values(cls, values: Sequence[Any], max_points: int = TREND_STATE_MAX_POINTS) -> "TrendState":
+        state = cls(max_points=max_points)
+        for value in values:
+            state.push(value)
+        return state
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_points: int = TREND_STATE_MAX_POINTS) -> "TrendState":
+        values = list(data.get("values") or [])
+        if "total" not in data:
+            # Rows written without running totals are rebuilt from the readings they kept.
+            return cls.from_values(values[-max_points:], max_points)
+        return cls(
+            count=int(data["count"]),
+            total=data["total"],
+            last=data.get("last"),
+            rising=int(data.get("rising", 0)),
+            falling=int(data.get("falling", 0)),
+            values=values[-max_points:],
+            max_points=max_points,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "last": self.last,
+            "rising": self.rising,
+            "falling": self.falling,
+            "values": list(self.values),
+        }
+
+    def push(self, value: Any):
+        if self.count:
+            step = value - self.last
+            self.rising += step > TOLERANCE
+            self.falling += step < -TOLERANCE
+        self.count += 1
+        self.total += value
+        self.last = value
+        self.values.append(value)
+        if len(self.values) > self.max_points:
+            del self.values[: len(self.values) - self.max_points]
+
+    def drop_last(self) -> "TrendState":
+        """A copy without the most recent reading (empty if it cannot be taken back)."""
+        if self.count < 2 or len(self.values) < 2:
+            return TrendState(max_points=self.max_points)
+        previous = self.values[-2]
+        step = self.last - previous
+        return TrendState(
+            count=self.count - 1,
+            total=self.total - self.last,
+            last=previous,
+            rising=self.rising - (step > TOLERANCE),
+            falling=self.falling - (step < -TOLERANCE),
+            values=self.values[:-1],
+            max_points=self.max_points,
+        )
+
+    def trend(self, current_value: Any, better_when_lower: bool) -> Optional[Dict[str, Any]]:
+        """_compute_trend over every reading so far plus `current_value`, without rescanning them."""
+        if not self.count:
+            return None
+        weighted_change = current_value - self.total / self.count
+        direction = _direction(weighted_change, better_when_lower)
+
+        step = current_value - self.last
+        rising = self.rising + (step > TOLERANCE)
+        falling = self.falling + (step < -TOLERANCE)
+        primary_sign = _primary_sign(direction, better_when_lower)
+        if rising + falling and primary_sign != 0:
+            consistency_ratio = (rising if primary_sign > 0 else falling) / (rising + falling)
+        else:
+            consistency_ratio = 0.5  # neutral when limited signal
+
+        return _trend_result(self.values + [current_value], weighted_change, direction, consistency_ratio)
+
+    def sparkline(self, current_value: Any) -> Optional[Dict[str, Any]]:
+        return _sparkline(self.values, current_value) if self.values else None
+
+
+def _sparkline(history_values: List[Any], current_value: Any) -> Dict[str, Any]:
+    values = history_values + [current_value]
+    if values[-1] < values[0]:
+        direction = "down"
+    elif values[-1] > values[0]:
+        direction = "up"
+    else:
+        direction = "flat"
+    return {"values": values, "direction": direction}
+
+
+def _history_values(history_data: Any, key: str) -> List[Any]:
+    values = history_data.get(key) if isinstance(history_data, dict) else None
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iuf":
+        # Backfilled wearable series arrive as numeric arrays; no per-item filtering needed.
+        return values.tolist()
+    if isinstance(values, (list, tuple)):
+        return [v for v in values if isinstance(v, (int, float))]
+    return []
+
+
+def _trend_and_sparkline(
+    history_data: Any, key: str, value: Any, better_when_lower: bool
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    state = history_data.get(key) if isinstance(history_data, dict) else None
+    if isinstance(state, TrendState):
+        return state.trend(value, better_when_lower), state.sparkline(value)
+    hist = _history_values(history_data, key)
+    trend = _compute_trend(hist, value, better_when_lower)
+    sparkline = _sparkline(hist, value) if hist else None
+    return trend, sparkline
@@ -52,15 +52,61 @@ def check_missing_data(question: str, facts: Dict[str, Any]) -> Tuple[bool, str]
     return False, ""
 
 
+# Words that make a reply fall back to the safe message wherever they appear.
+RED_FLAGS = frozenset({"cancer", "stroke", "medication", "dose", "emergency"})
+
+
 def response_mentions_unknown_terms(reply: str, facts: Dict[str, Any]) -> bool:
     # Allowed terms include known signal names; block certain red-flag words regardless.
     allowed_terms = {s.get("name", "").lower() for s in facts.get("signals", [])}
-    red_flags = {"cancer", "stroke", "medication", "dose", "emergency"}
-    if any(flag in reply.lower() for flag in red_flags):
+    if any(flag in reply.lower() for flag in RED_FLAGS):
         return True
     # If the reply mentions a health term not in allowed terms, we treat it cautiously.
     for word in reply.lower().split():
         clean = re.sub(r"[^a-z]", "", word)
-        if clean and clean not in allowed_terms and clean in red_flags:
+        if clean and clean not in allowed_terms and clean in RED_FLAGS:
             return True
     return False
+
+
+class StreamingTermsCheck:
+    """
+    response_mentions_unknown_terms for a reply that arrives in pieces. feed() returns the
+    text that is safe to show so far; the last few characters are held back so a red flag
+    split across pieces is caught before any of it is released. Once `tripped`, nothing
+    more is released and the caller should replace the output with the safe fallback.
+    """
+
+    HOLD = max(len(flag) for flag in RED_FLAGS) - 1
+
+    def __init__(self, facts: Dict[str, Any]):
+        self.facts = facts
+        self.text = ""
+        self.released = 0
+        self.checked = 0
+        self.tripped = False
+
+    def _scan(self) -> bool:
+        # Only text not yet checked, plus enough overlap to catch a flag spanning the seam.
+        window = self.text[max(0, self.checked - self.HOLD):].lower()
+        self.checked = len(self.text)
+        self.tripped = any(flag in window for flag in RED_FLAGS)
+        return self.tripped
+
+    def feed(self, piece: str) -> str:
+        if self.tripped or not piece:
+            return ""
+        self.text += piece
+        if self._scan():
+            return ""
+        end = max(self.released, len(self.text) - self.HOLD)
+        safe, self.released = self.text[self.released:end], end
+        return safe
+
+    def finish(self) -> str:
+        """Release the held-back tail once the reply is complete."""
+        if self.tripped or response_mentions_unknown_terms(self.text, self.facts):
+            self.tripped = True
+            return ""
+        safe, self.released = self.text[self.released:], len(self.text)
+        return safe
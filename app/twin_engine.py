@@ -1,5 +1,7 @@
 import json
-import ollama
+
+from app import llm
+from app.llm.scheduler import Priority
 
 class TwinEngine:
     def explain_health(self, health_state: dict) -> str:
@@ -13,9 +15,7 @@ Health data:
 {json.dumps(health_state, indent=2)}
 """
 
-        response = ollama.chat(
-            model="llama3",
-            messages=[{"role": "user", "content": prompt}]
+        # Summaries are background work: they queue behind users waiting on a chat reply.
+        return llm.scheduled_chat_sync(
+            [{"role": "user", "content": prompt}], "llama3", priority=Priority.BACKGROUND
         )
-
-        return response["message"]["content"]
\ No newline at end of file
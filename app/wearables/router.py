@@ -11,6 +11,7 @@ from app.auth.database import SessionLocal, engine
 from app.auth.security import decode_token
 from app.wearables.models import Base, WearableConnection, WearableSyncLog
 from app.wearables.snapshots import UserHealthStateSnapshot
+from app.wearables.trend_states import record_readings
 from app.wearables.adapters import ADAPTERS, FitbitAdapter
 from app.consent.repo import get_consent_map
 from app.consent.utils import ALL_SCOPES
@@ -173,6 +174,8 @@ def sync(payload: SyncRequest, authorization: str = Header(None), db: Session =
         log.last_sync_at = datetime.utcnow()
         log.status = "ok"
     db.commit()
+    if data:
+        record_readings(db, user_id, data)
 
     # normalize: ensure ts/value/source for each entry
     normalized = data or {}
@@ -200,4 +203,6 @@ def ingest(payload: IngestRequest, authorization: str = Header(None), db: Sessio
     )
     db.add(snapshot)
     db.commit()
+    # Keep per-signal trend accumulators current so later evaluations skip the history rescan
+    record_readings(db, user_id, payload.health_state)
     return {"status": "stored", "provider": payload.provider}
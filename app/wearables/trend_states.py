@@ -0,0 +1,90 @@
+from __future__ import annotations
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, UniqueConstraint
+from sqlalchemy.orm import Session
+
+from app.auth.models import Base
+from app.consent.utils import scopes_for_health_state
+from app.rules import TREND_RULES, TrendState
+
+
+class UserTrendState(Base):
+    __tablename__ = "user_trend_states"
+    __table_args__ = (UniqueConstraint("user_id", "signal", name="uq_user_signal"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    signal = Column(String, nullable=False)
+    state_json = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+def record_readings(db: Session, user_id: int, health_state: Dict[str, Any]):
+    """Fold new numeric readings for trended signals into the user's stored accumulators."""
+    readings = {
+        k: v for k, v in health_state.items()
+        if k in TREND_RULES and isinstance(v, (int, float)) and not isinstance(v, bool)
+    }
+    if not readings:
+        return
+    rows = {
+        r.signal: r
+        for r in db.query(UserTrendState).filter(
+            UserTrendState.user_id == user_id, UserTrendState.signal.in_(list(readings))
+        )
+    }
+    for signal, value in readings.items():
+        row = rows.get(signal)
+        state = TrendState.from_dict(json.loads(row.state_json)) if row else TrendState()
+        state.push(value)
+        if row is None:
+            row = UserTrendState(user_id=user_id, signal=signal)
+            db.add(row)
+        row.state_json = json.dumps(state.to_dict())
+    db.commit()
+
+
+def load_trend_history(db: Session, user_id: int) -> Dict[str, TrendState]:
+    """Stored accumulators keyed by signal; usable as the `history` entry for evaluate_health."""
+    rows = db.query(UserTrendState).filter(UserTrendState.user_id == user_id).all()
+    return {r.signal: TrendState.from_dict(json.loads(r.state_json)) for r in rows}
+
+
+def with_stored_history(
+    db: Session, user_id: int, health_state: Dict[str, Any], consent_map: Optional[Dict[str, bool]] = None
+) -> Dict[str, Any]:
+    """
+    `health_state` with the user's stored trend histories filled in for the trended signals it
+    carries. Histories sent by the client win; signals whose data scopes are not granted in
+    `consent_map` (when given) are left alone.
+    """
+    if not isinstance(health_state, dict):
+        return health_state
+    provided = health_state.get("history") if isinstance(health_state.get("history"), dict) else {}
+    signals = [
+        k for k, v in health_state.items()
+        if k in TREND_RULES and k not in provided and isinstance(v, (int, float)) and not isinstance(v, bool)
+    ]
+    if consent_map is not None:
+        signals = [k for k in signals if all(consent_map.get(s, False) for s in scopes_for_health_state({k: True}))]
+    if not signals:
+        return health_state
+    rows = db.query(UserTrendState).filter(
+        UserTrendState.user_id == user_id, UserTrendState.signal.in_(signals)
+    ).all()
+    if not rows:
+        return health_state
+    history = dict(provided)
+    for row in rows:
+        state = TrendState.from_dict(json.loads(row.state_json))
+        if state.last == health_state[row.signal]:
+            # The payload is normally the snapshot that stored this reading; count it once.
+            state = state.drop_last()
+        if state.count:
+            history[row.signal] = state
+    if len(history) == len(provided):
+        return health_state
+    return {**health_state, "history": history}
@@ -0,0 +1,62 @@
+"""
+ANN vs exact search for the RAG index.
+    python scripts/bench_ann.py --rows 5000 50000 --dim 768 --k 5 --nprobe 4 8 16
+Reports recall@k against exact search and mean query latency on synthetic clustered
+embeddings, so nprobe/nlist can be tuned before the corpus grows.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.rag.ann import ExactSearch, IVFSearch  # noqa: E402
+from app.rag.index import normalize_rows  # noqa: E402
+
+
+def make_corpus(n: int, dim: int, clusters: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    rows = centers[rng.integers(clusters, size=n)] + 0.5 * rng.normal(size=(n, dim))
+    matrix = normalize_rows(rows.astype(np.float32))
+    queries = matrix[rng.integers(n, size=200)] + 0.2 * rng.normal(size=(200, dim)).astype(np.float32)
+    return matrix, normalize_rows(queries)
+
+
+def time_queries(search, queries, k):
+    start = time.perf_counter()
+    results = [search(q, k) for q in queries]
+    return results, (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[5000, 50000], help="Corpus sizes")
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension")
+    parser.add_argument("--clusters", type=int, default=50, help="Topic clusters in the synthetic corpus")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16], help="IVF lists probed per query")
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} | {'index':>12} | {'recall@k':>8} | {'query us':>9} | {'build s':>7}")
+    for n in args.rows:
+        matrix, queries = make_corpus(n, args.dim, args.clusters)
+        exact = ExactSearch(matrix)
+        truth, exact_us = time_queries(exact.search, queries, args.k)
+        print(f"{n:>7} | {'exact':>12} | {1.0:>8.3f} | {exact_us:>9.1f} | {0.0:>7.2f}")
+        start = time.perf_counter()
+        ivf = IVFSearch.train(matrix)
+        build_s = time.perf_counter() - start
+        for nprobe in args.nprobe:
+            ivf.nprobe = nprobe
+            found, ivf_us = time_queries(ivf.search, queries, args.k)
+            recall = np.mean([len(set(t.tolist()) & set(f.tolist())) / args.k for t, f in zip(truth, found)])
+            print(f"{n:>7} | {f'ivf/{nprobe}':>12} | {recall:>8.3f} | {ivf_us:>9.1f} | {build_s:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
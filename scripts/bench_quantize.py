@@ -0,0 +1,74 @@
+"""
+Embedding storage benchmark: Python float lists vs float32 vs float16/int8 with rescoring.
+    python scripts/bench_quantize.py --rows 5000 --dim 768 --k 5
+Reports resident bytes of the scanned embeddings, mean query latency and recall@k against
+exact float32 search. The float-list row is the old per-doc DOCS representation.
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.rag.index import DocIndex  # noqa: E402
+
+
+def list_bytes(rows: np.ndarray) -> int:
+    tracemalloc.start()
+    lists = [row.tolist() for row in rows]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del lists
+    return size
+
+
+def loop_search(lists, query, k):
+    scores = [(float(np.dot(query, emb)), i) for i, emb in enumerate(lists)]
+    scores.sort(reverse=True)
+    return [i for _, i in scores[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000, help="Corpus size")
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--queries", type=int, default=50, help="Queries timed per variant")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = rng.normal(size=(args.rows, args.dim)).astype(np.float32)
+    queries = rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+    docs = [{"title": str(i), "parent": str(i), "text": "", "embedding": row} for i, row in enumerate(rows)]
+
+    lists = [row.tolist() for row in rows]
+    start = time.perf_counter()
+    for q in queries:
+        loop_search(lists, q, args.k)
+    loop_us = (time.perf_counter() - start) / len(queries) * 1e6
+    print(f"{'storage':>12} | {'scan MB':>8} | {'query us':>9} | {'recall@k':>8}")
+    print(f"{'float lists':>12} | {list_bytes(rows) / 1e6:>8.1f} | {loop_us:>9.1f} | {'-':>8}")
+
+    exact = DocIndex(kind="exact", quantize="none")
+    exact.build(docs)
+    truth = [exact.top_k(q, args.k) for q in queries]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for kind in ("none", "float16", "int8"):
+            index = DocIndex(kind="exact", quantize=kind, cache_dir=cache_dir)
+            index.build(docs)
+            start = time.perf_counter()
+            found = [index.top_k(q, args.k) for q in queries]
+            us = (time.perf_counter() - start) / len(queries) * 1e6
+            recall = np.mean([len(set(t) & set(f)) / args.k for t, f in zip(truth, found)])
+            label = "float32" if kind == "none" else kind
+            print(f"{label:>12} | {index.memory_bytes()['scan'] / 1e6:>8.1f} | {us:>9.1f} | {recall:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
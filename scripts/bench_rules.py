@@ -0,0 +1,181 @@
+"""
+Micro-benchmarks for the deterministic hot path, with a regression gate.
+    python scripts/bench_rules.py --save            # record scripts/bench_rules_baseline.json
+    python scripts/bench_rules.py --threshold 0.25  # fail if any case is >25% slower
+    python scripts/bench_rules.py --check           # as above, and fail if a case has no baseline
+Covers evaluate_health, _compute_trend, classify_intent, is_forbidden_question,
+response_mentions_unknown_terms and build_prompt on synthetic inputs of several sizes.
+Reports median microseconds per call; exits 1 when a case regresses past the threshold.
+The committed baseline was recorded on the reference dev box; re-record it with --save when
+the hardware or an intended speed change moves the numbers.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.intent.classifier import classify_intent  # noqa: E402
+from app.prompt.adapter import build_prompt  # noqa: E402
+from app.rules import evaluate_health  # noqa: E402
+from app.rules.registry import COMPILED, TREND_RULES  # noqa: E402
+from app.rules.trends import _compute_trend  # noqa: E402
+from app.safety import is_forbidden_question, response_mentions_unknown_terms  # noqa: E402
+
+BASELINE_PATH = ROOT_DIR / "scripts" / "bench_rules_baseline.json"
+DEFAULT_THRESHOLD = 0.25
+
+
+def make_series(n: int, seed: int = 42) -> List[float]:
+    rng = random.Random(seed)
+    value = 110.0
+    series = []
+    for _ in range(n):
+        value += rng.uniform(-3, 2.5)
+        series.append(round(value, 1))
+    return series
+
+
+def make_payload(n_signals: int, history_len: int = 0, seed: int = 7) -> Dict[str, Any]:
+    """Raw health state touching the first n_signals rules, optionally with trend history."""
+    rng = random.Random(seed)
+    raw: Dict[str, Any] = {}
+    for compiled in COMPILED[:n_signals]:
+        if compiled.rule.flag_value is not None:
+            raw[compiled.rule.id] = True
+            continue
+        for key, edges in zip(compiled.keys, compiled.edges):
+            raw[key] = rng.choice(edges) if edges else 1
+    if history_len:
+        raw["history"] = {rule_id: make_series(history_len) for rule_id in TREND_RULES if rule_id in raw}
+    return raw
+
+
+QUESTION_SHORT = "How is my fasting glucose doing?"
+QUESTION_LONG = " ".join(
+    ["I slept badly this week and my LDL test came back higher, is my trend getting better or worse?"] * 20
+)
+REPLY_SHORT = "Your fasting glucose looks steady and your sleep is close to the recommended range."
+REPLY_LONG = " ".join([REPLY_SHORT] * 50)
+
+
+def cases() -> List[Tuple[str, Callable[[], Any]]]:
+    small = make_payload(1)
+    full = make_payload(len(COMPILED))
+    full_history = make_payload(len(COMPILED), history_len=30)
+    long_history = make_payload(len(COMPILED), history_len=2000)
+    facts_full = evaluate_health(full)
+    intent = classify_intent(QUESTION_SHORT, full)
+    docs_few = ["Fasting glucose reference text. " * 10] * 2
+    docs_many = ["Reference paragraph about lipids and sleep. " * 20] * 20
+    series = {n: make_series(n) for n in (10, 100, 10000)}
+    return [
+        ("evaluate_health/1_signal", lambda: evaluate_health(small)),
+        ("evaluate_health/all_signals", lambda: evaluate_health(full)),
+        ("evaluate_health/all_signals_history_30", lambda: evaluate_health(full_history)),
+        ("evaluate_health/all_signals_history_2000", lambda: evaluate_health(long_history)),
+        ("_compute_trend/10", lambda: _compute_trend(series[10], 100.0, True)),
+        ("_compute_trend/100", lambda: _compute_trend(series[100], 100.0, True)),
+        ("_compute_trend/10000", lambda: _compute_trend(series[10000], 100.0, True)),
+        ("classify_intent/short", lambda: classify_intent(QUESTION_SHORT, small)),
+        ("classify_intent/long", lambda: classify_intent(QUESTION_LONG, full)),
+        ("is_forbidden_question/short", lambda: is_forbidden_question(QUESTION_SHORT)),
+        ("is_forbidden_question/long", lambda: is_forbidden_question(QUESTION_LONG)),
+        ("response_mentions_unknown_terms/short", lambda: response_mentions_unknown_terms(REPLY_SHORT, facts_full)),
+        ("response_mentions_unknown_terms/long", lambda: response_mentions_unknown_terms(REPLY_LONG, facts_full)),
+        ("build_prompt/few_docs", lambda: build_prompt(QUESTION_SHORT, facts_full, intent, docs_few, [], [], "")),
+        (
+            "build_prompt/many_docs",
+            lambda: build_prompt(QUESTION_LONG, facts_full, intent, docs_many, ["summary"] * 5, ["memory"] * 5, ""),
+        ),
+    ]
+
+
+def measure(fn: Callable[[], Any], rounds: int, min_time: float) -> float:
+    """Median microseconds per call over `rounds` rounds of at least `min_time` seconds each."""
+    fn()  # warm up caches and lazy imports
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            break
+        number *= 2
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+    return statistics.median(samples)
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """Names of cases slower than baseline by more than `threshold` (a fraction)."""
+    return [
+        name
+        for name, us in results.items()
+        if name in baseline and baseline[name] > 0 and us > baseline[name] * (1 + threshold)
+    ]
+
+
+def missing_cases(results: Dict[str, float], baseline: Dict[str, float]) -> List[str]:
+    """Names of cases that ran but have no usable baseline to compare against."""
+    return [name for name in results if baseline.get(name, 0) <= 0]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown, e.g. 0.25 = 25%%")
+    parser.add_argument("--rounds", type=int, default=7, help="Timed rounds per case")
+    parser.add_argument("--min-time", type=float, default=0.02, help="Minimum seconds per round")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--check", action="store_true", help="Fail when the baseline or a case in it is missing")
+    args = parser.parse_args(argv)
+
+    baseline: Dict[str, float] = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())["cases"]
+
+    results: Dict[str, float] = {}
+    print(f"{'case':<45} | {'median us':>10} | {'baseline us':>11} | {'change':>7}")
+    for name, fn in cases():
+        if args.filter not in name:
+            continue
+        us = measure(fn, args.rounds, args.min_time)
+        results[name] = us
+        if name in baseline:
+            change = f"{(us / baseline[name] - 1) * 100:+6.1f}%"
+            print(f"{name:<45} | {us:>10.1f} | {baseline[name]:>11.1f} | {change:>7}")
+        else:
+            print(f"{name:<45} | {us:>10.1f} | {'-':>11} | {'-':>7}")
+
+    if args.save:
+        merged = {**baseline, **results}
+        args.baseline.write_text(json.dumps({"unit": "us_per_call", "cases": merged}, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("No baseline found; run with --save to record one.")
+        return 1 if args.check else 0
+    missing = missing_cases(results, baseline)
+    for name in missing:
+        print(f"NO BASELINE: {name}")
+    regressed = compare(results, baseline, args.threshold)
+    for name in regressed:
+        print(f"REGRESSION: {name} {results[name]:.1f}us vs baseline {baseline[name]:.1f}us")
+    return 1 if regressed or (args.check and missing) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,58 @@
+"""
+Trend kernel benchmark: plain-Python loop vs NumPy kernel.
+    python scripts/bench_trend.py --sizes 10 40 80 100 1000 10000 --repeat 50
+Reports mean microseconds per call for each history length; the loop/kernel crossover
+sets VECTOR_MIN_POINTS in app/rules/trends.py.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.rules.trends import _loop_trend, trend_kernel  # noqa: E402
+
+
+def make_series(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    value = 110.0
+    series = []
+    for _ in range(n):
+        value += rng.uniform(-3, 2.5)
+        series.append(round(value, 1))
+    return series
+
+
+def time_call(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 40, 80, 100, 1000, 10000], help="Series lengths")
+    parser.add_argument("--repeat", type=int, default=50, help="Calls per measurement")
+    parser.add_argument("--window", type=int, default=90, help="Window size for the bounded variant")
+    parser.add_argument("--decay", type=float, default=0.95, help="Decay factor for the decay variant")
+    args = parser.parse_args()
+
+    print(f"{'points':>8} | {'loop us':>10} | {'kernel us':>10} | {'speedup':>7} | {'window us':>10} | {'decay us':>10}")
+    for n in args.sizes:
+        series = make_series(n)
+        loop_us = time_call(lambda: _loop_trend(series, True), args.repeat)
+        kernel_us = time_call(lambda: trend_kernel(series, True), args.repeat)
+        window_us = time_call(lambda: trend_kernel(series, True, window=args.window), args.repeat)
+        decay_us = time_call(lambda: trend_kernel(series, True, decay=args.decay), args.repeat)
+        print(
+            f"{n:>8} | {loop_us:>10.1f} | {kernel_us:>10.1f} | {loop_us / kernel_us:>6.1f}x | "
+            f"{window_us:>10.1f} | {decay_us:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
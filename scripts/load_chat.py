@@ -0,0 +1,144 @@
+"""
+Concurrent load test for the chat pipeline against a stand-in Ollama server.
+    python scripts/load_chat.py --concurrency 1 8 32 --delay 0.25
+Starts a fake Ollama HTTP server that answers /api/chat after `--delay` seconds, then runs
+the same questions through the old blocking path (the pipeline and a blocking ollama.chat
+call inside a coroutine, as /twin/chat used to) and through process_chat_async, at each
+concurrency level.
+Reports throughput, p50/p99 latency and scheduler rejections per mode; no real model is
+needed. The reply cache is off unless --cache is given; --slots overrides LLM_CONCURRENCY.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+SAMPLE_PAYLOADS = [
+    {"question": "How is my fasting glucose doing?", "health_state": {"fasting_glucose": 118}},
+    {"question": "How did I sleep?", "health_state": {"sleep_hours": 6}},
+    {"question": "What should I do next?", "health_state": {"bp_systolic": 130, "bp_diastolic": 85}},
+]
+
+
+def make_payload(i: int) -> Dict[str, Any]:
+    """A sample question with values shifted by `i`, so requests are neither cached nor coalesced."""
+    sample = SAMPLE_PAYLOADS[i % len(SAMPLE_PAYLOADS)]
+    health_state = {key: value + i // len(SAMPLE_PAYLOADS) for key, value in sample["health_state"].items()}
+    return {"question": sample["question"], "health_state": health_state}
+
+
+def start_fake_ollama(delay: float) -> str:
+    """Serve /api/chat on a free local port in a background thread; returns its base URL."""
+    import uvicorn
+    from fastapi import FastAPI
+
+    fake = FastAPI()
+
+    @fake.post("/api/chat")
+    async def chat(body: Dict[str, Any]):
+        await asyncio.sleep(delay)
+        return {"model": body.get("model"), "message": {"role": "assistant", "content": "Your values look steady."}, "done": True}
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(fake, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+async def run_level(handle: Callable, concurrency: int, requests: int) -> Dict[str, float]:
+    from app.llm import QueueFull
+
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    rejected = 0
+
+    async def one(i: int):
+        nonlocal rejected
+        async with gate:
+            began = time.perf_counter()
+            try:
+                await handle(make_payload(i))
+            except QueueFull:
+                rejected += 1
+                return
+            latencies.append((time.perf_counter() - began) * 1000)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - began
+    latencies = sorted(latencies) or [0.0]
+    return {
+        "rps": (requests - rejected) / elapsed,
+        "rejected": rejected,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))],
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Requests in flight")
+    parser.add_argument("--requests", type=int, default=0, help="Requests per level (default: 4 x concurrency)")
+    parser.add_argument("--delay", type=float, default=0.25, help="Seconds the fake model takes per reply")
+    parser.add_argument("--cache", action="store_true", help="Keep the reply cache on for the async path")
+    parser.add_argument("--slots", type=int, default=0, help="LLM scheduler concurrency (default: LLM_CONCURRENCY)")
+    args = parser.parse_args(argv)
+
+    # The ollama clients read OLLAMA_HOST when created, so point them at the fake first.
+    os.environ["OLLAMA_HOST"] = start_fake_ollama(args.delay)
+    import ollama  # noqa: E402
+    from app import chat  # noqa: E402
+    from app import llm  # noqa: E402
+    from app.logging import events  # noqa: E402
+
+    events.LOG_PATH = Path(tempfile.mkdtemp()) / "events.jsonl"
+    if not args.cache:
+        # Runs repeat across modes and levels, so the reply cache would hide the generation cost.
+        llm.RESPONSE_CACHE.maxsize = 0
+    if args.slots:
+        llm.SCHEDULER.concurrency = args.slots
+    print(f"LLM scheduler: {llm.SCHEDULER.concurrency} slots, queue of {llm.SCHEDULER.max_queue}")
+
+    async def blocking(body):
+        turn = chat.prepare_chat(1, chat.ChatRequest.model_validate(body))
+        if turn.reply is not None:
+            return {"reply": turn.reply}
+        resp = ollama.chat(model=chat.CHAT_MODEL, messages=turn.messages(), options=chat.CHAT_OPTIONS)
+        return {"reply": chat.finish_chat(turn, resp["message"]["content"])}
+
+    async def pooled(body):
+        return await chat.process_chat_async(1, chat.ChatRequest.model_validate(body))
+
+    async def run_all():
+        rows = []
+        for concurrency in args.concurrency:
+            n = args.requests or 4 * concurrency
+            for mode, handle in (("blocking", blocking), ("async", pooled)):
+                rows.append((mode, concurrency, await run_level(handle, concurrency, n)))
+        return rows
+
+    print(f"{'mode':>9} | {'concurrency':>11} | {'req/s':>7} | {'p50 ms':>8} | {'p99 ms':>8} | {'429s':>5}")
+    for mode, concurrency, row in asyncio.run(run_all()):
+        print(
+            f"{mode:>9} | {concurrency:>11} | {row['rps']:>7.1f} | {row['p50_ms']:>8.1f}"
+            f" | {row['p99_ms']:>8.1f} | {row['rejected']:>5}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())